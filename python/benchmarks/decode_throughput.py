@@ -0,0 +1,67 @@
+'''
+Measures how many model objects per second are decoded from response bytes.
+
+    python benchmarks/decode_throughput.py [count]
+
+Each payload carries three tags. Every model class is decoded with the json
+module and with ground.decode (orjson when installed), with and without tags,
+and the best of five runs is reported.
+'''
+import gc
+import json
+import sys
+import time
+
+import ground.common.model as model
+import ground.decode as decode
+
+
+def get_tags(id):
+    return {key: {'id': id, 'key': key, 'value': id, 'type': 'integer'} for key in ('a', 'b', 'c')}
+
+
+def get_contents(count):
+    rich_version = {'structureVersionId': -1, 'reference': 'http://example.com', 'referenceParameters': {}}
+    return [
+        (model.core.node.Node, [{'id': id, 'name': 'node', 'sourceKey': 'node', 'tags': get_tags(id)}
+                                for id in range(count)]),
+        (model.core.node_version.NodeVersion, [dict(rich_version, id=id, nodeId=1, tags=get_tags(id))
+                                               for id in range(count)]),
+        (model.core.edge_version.EdgeVersion, [dict(rich_version, id=id, edgeId=1, fromNodeVersionStartId=id,
+                                                     toNodeVersionStartId=id + 1, tags=get_tags(id))
+                                               for id in range(count)]),
+    ]
+
+
+def json_decode(model_class, content, tags):
+    return [model_class(json_payload) for json_payload in json.loads(content)]
+
+
+def measure(function, model_class, content, tags, repeat=5):
+    # the best of repeat runs, without the collector kicking in part way through
+    best = 0
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            objects = function(model_class, content, tags)
+            best = max(best, len(objects) / (time.perf_counter() - start))
+            del objects
+    finally:
+        gc.enable()
+    return best
+
+
+def main(count=100000):
+    print("ground.decode backend: " + decode.get_backend())
+    for model_class, payloads in get_contents(count):
+        content = json.dumps(payloads).encode()
+        for name, function, tags in (("json", json_decode, True),
+                                     ("ground.decode", decode.decode, True),
+                                     ("ground.decode, no tags", decode.decode, False)):
+            rate = measure(function, model_class, content, tags)
+            print("%-12s %-24s %12.0f objects/s" % (model_class.__name__, name, rate))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
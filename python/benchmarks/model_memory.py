@@ -0,0 +1,81 @@
+'''
+Measures the memory held by model objects built from typical server payloads.
+
+    python benchmarks/model_memory.py [count]
+
+Prints the bytes per object for each model class, as allocated by the model
+itself (the payload dicts are built up front and not counted), next to the same
+for the layout the models had before __slots__: the same fields in a per-object
+__dict__, with a new dict for every empty tags, parameters or attributes map.
+'''
+import sys
+import tracemalloc
+
+import ground.common.model as model
+from ground.common.model.version.version import EMPTY_MAP
+
+
+class DictModel:
+    '''
+    The fields of a model held the way they were before __slots__.
+    '''
+
+    def __init__(self, model_object):
+        for model_class in type(model_object).__mro__:
+            for name in getattr(model_class, '__slots__', ()):
+                value = getattr(model_object, name)
+                setattr(self, name, {} if value is EMPTY_MAP else value)
+
+
+def get_payloads(count):
+    item = {'name': 'item', 'sourceKey': 'item', 'tags': {}}
+    rich_version = {'structureVersionId': -1, 'reference': None, 'referenceParameters': {}, 'tags': {}}
+    return [
+        (model.core.node.Node, [dict(item, id=id) for id in range(count)]),
+        (model.core.node_version.NodeVersion, [dict(rich_version, id=id, nodeId=1) for id in range(count)]),
+        (model.core.edge.Edge, [dict(item, id=id, fromNodeId=1, toNodeId=2) for id in range(count)]),
+        (model.core.edge_version.EdgeVersion, [dict(rich_version, id=id, edgeId=1, fromNodeVersionStartId=id,
+                                                     toNodeVersionStartId=id + 1) for id in range(count)]),
+        (model.core.graph.Graph, [dict(item, id=id) for id in range(count)]),
+        (model.core.graph_version.GraphVersion, [dict(rich_version, id=id, graphId=1, edgeVersionIds=[])
+                                                 for id in range(count)]),
+        (model.core.structure.Structure, [dict(item, id=id) for id in range(count)]),
+        (model.core.structure_version.StructureVersion, [{'id': id, 'structureId': 1, 'attributes': {}}
+                                                         for id in range(count)]),
+        (model.usage.lineage_edge.LineageEdge, [dict(item, id=id) for id in range(count)]),
+        (model.usage.lineage_edge_version.LineageEdgeVersion, [dict(rich_version, id=id, lineageEdgeId=1,
+                                                                    fromId=id, toId=id + 1)
+                                                               for id in range(count)]),
+        (model.usage.lineage_graph.LineageGraph, [dict(item, id=id) for id in range(count)]),
+        (model.usage.lineage_graph_version.LineageGraphVersion, [dict(rich_version, id=id, lineageGraphId=1)
+                                                                 for id in range(count)]),
+    ]
+
+
+def measure(build, payloads):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(payload) for payload in payloads]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # the list holding the objects is not part of their cost
+    return (after - before - sys.getsizeof(objects)) / len(objects)
+
+
+def get_dict_model_builder(model_class):
+    # a class of its own per model, so instances share their dict keys as the old classes' did
+    dict_model_class = type(model_class.__name__, (DictModel,), {})
+    return lambda payload: dict_model_class(model_class(payload))
+
+
+def main(count=100000):
+    print("%-24s %12s %12s %8s" % ("bytes/object", "__dict__", "__slots__", "change"))
+    for model_class, payloads in get_payloads(count):
+        before = measure(get_dict_model_builder(model_class), payloads)
+        after = measure(model_class, payloads)
+        print("%-24s %12.1f %12.1f %+7.0f%%" % (model_class.__name__, before, after, (after - before) / before * 100))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,266 @@
+'''
+Runs the client benchmarks against an in-process FakeGroundServer and writes
+the results as JSON, or compares two such result files.
+
+    python benchmarks/suite.py run [--quick] [--only name ...] [--latency seconds] [--output file]
+    python benchmarks/suite.py compare baseline.json current.json [--threshold fraction]
+
+run measures create throughput, get_*_version latency percentiles, the decode
+rate of every model class, the memory held by 1M EdgeVersions, and the cost of
+VersionHistoryDag queries at 10k and 100k versions. --quick shrinks every
+benchmark so the suite finishes in seconds, scaling memory up to 1M objects.
+
+compare prints the change in every metric and exits with status 1 if any got
+worse by more than the threshold (0.1, i.e. 10%, by default).
+'''
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import ground.client as client
+import ground.common.model as model
+import ground.decode as decode
+from ground.common.model.version.version_history_dag import VersionHistoryDag
+from ground.testing import FakeGroundServer, FakeTransport
+
+# benchmarks is not a package, so its other scripts are found next to this one
+# wherever it is run or imported from
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from model_memory import get_payloads
+
+
+def metric(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def best_of(repeat, function, *args):
+    # the fastest of repeat runs, without the collector kicking in part way through
+    gc.collect()
+    gc.disable()
+    try:
+        return min(timed(function, *args) for _ in range(repeat))
+    finally:
+        gc.enable()
+
+
+def percentile(samples, percent):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100.0))]
+
+
+def get_client(latency):
+    return client.GroundClient(transport=FakeTransport(FakeGroundServer(latency=latency)))
+
+
+'''
+BENCHMARKS
+'''
+
+
+def bench_create(options):
+    # each create is sent once the previous one has returned, so this is the cost of
+    # one call through the client
+    count = 200 if options.quick else 5000
+    with get_client(options.latency) as ground_client:
+        nodes = []
+        seconds = timed(nodes.extend, (ground_client.create_node("node" + str(index), "node")
+                                       for index in range(count)))
+        results = {"create_node.throughput": metric(count / seconds, "ops/s", True)}
+
+        node_versions = []
+        seconds = timed(node_versions.extend, (ground_client.create_node_version(node.get_id()) for node in nodes))
+        results["create_node_version.throughput"] = metric(count / seconds, "ops/s", True)
+
+        edge = ground_client.create_edge("edge", "edge", nodes[0].get_id(), nodes[1].get_id())
+        pairs = list(zip(node_versions, node_versions[1:]))
+        seconds = timed(list, (ground_client.create_edge_version(edge.get_id(), from_version.get_id(),
+                                                                 to_version.get_id())
+                               for from_version, to_version in pairs))
+        results["create_edge_version.throughput"] = metric(len(pairs) / seconds, "ops/s", True)
+    return results
+
+
+def bench_get_latency(options):
+    count = 200 if options.quick else 5000
+    results = {}
+    with get_client(options.latency) as ground_client:
+        node = ground_client.create_node("node", "node")
+        node_version_ids = [ground_client.create_node_version(node.get_id()).get_id() for _ in range(count)]
+        edge = ground_client.create_edge("edge", "edge", node.get_id(), node.get_id())
+        edge_version_ids = [ground_client.create_edge_version(edge.get_id(), id, id).get_id()
+                            for id in node_version_ids]
+
+        for name, get, ids in (("get_node_version", ground_client.get_node_version, node_version_ids),
+                               ("get_edge_version", ground_client.get_edge_version, edge_version_ids)):
+            samples = [timed(get, id) * 1e6 for id in ids]
+            for percent in (50, 95, 99):
+                results[name + ".p" + str(percent)] = metric(percentile(samples, percent), "us", False)
+    return results
+
+
+def bench_decode(options):
+    count = 10000 if options.quick else 100000
+    results = {}
+    for model_class, payloads in get_payloads(count):
+        content = json.dumps(payloads).encode()
+        seconds = best_of(3 if options.quick else 5, decode.decode, model_class, content)
+        results["decode." + model_class.__name__] = metric(count / seconds, "objects/s", True)
+    return results
+
+
+def bench_edge_version_memory(options):
+    count = 100000 if options.quick else 1000000
+
+    def get_payload(id):
+        return {'id': id, 'edgeId': 1, 'fromNodeVersionStartId': id, 'toNodeVersionStartId': id + 1,
+                'structureVersionId': -1, 'reference': None, 'referenceParameters': {}, 'tags': {}}
+
+    # payloads are made one at a time, so only what the models keep is counted
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [model.core.edge_version.EdgeVersion(get_payload(id)) for id in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    per_object = (after - before - sys.getsizeof(objects)) / len(objects)
+    return {"edge_version.memory_per_1m": metric(per_object * 1000000 / 2 ** 20, "MiB", False)}
+
+
+def get_history_dag(count):
+    # a main line, where every tenth version also merges in the one five back, plus a
+    # dead-end branch off every hundredth
+    dag = VersionHistoryDag(1, [])
+    dag.add_edge(0, 1, None)
+    for id in range(2, count + 1):
+        dag.add_edge(id - 1, id, None)
+        if id % 10 == 0 and id > 5:
+            dag.add_edge(id - 5, id, None)
+        if id % 100 == 0:
+            dag.add_edge(id, count + id, None)
+    return dag
+
+
+def bench_history_dag(options):
+    results = {}
+    for count in (10000, 100000):
+        size = str(count // 1000) + "k"
+        repeat = 1 if options.quick else 3
+        results["history_dag." + size + ".build"] = metric(best_of(repeat, get_history_dag, count), "s", False)
+
+        dag = get_history_dag(count)
+        leaf = count
+        middle = count // 2
+        for name, function, args in (("get_leaves", dag.get_leaves, ()),
+                                     ("get_ancestors", dag.get_ancestors, (leaf,)),
+                                     ("get_descendants", dag.get_descendants, (1,)),
+                                     ("get_topological_order", dag.get_topological_order, ()),
+                                     ("get_lowest_common_ancestor", dag.get_lowest_common_ancestor, (leaf, middle)),
+                                     ("get_versions_between", dag.get_versions_between, (middle, leaf))):
+            results["history_dag." + size + "." + name] = metric(best_of(repeat, function, *args), "s", False)
+    return results
+
+
+BENCHMARKS = {
+    "create": bench_create,
+    "get_latency": bench_get_latency,
+    "decode": bench_decode,
+    "edge_version_memory": bench_edge_version_memory,
+    "history_dag": bench_history_dag,
+}
+
+
+'''
+RUN AND COMPARE
+'''
+
+
+def run(options):
+    results = {}
+    for name in options.only or BENCHMARKS:
+        print("running " + name + "...", file=sys.stderr)
+        results.update(BENCHMARKS[name](options))
+
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "decode_backend": decode.get_backend(),
+            "quick": options.quick,
+            "latency": options.latency,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    '''
+    Returns (name, baseline value, current value, relative change, regressed) for
+    every metric in both runs. The change is positive when the metric improved.
+    '''
+    rows = []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before = baseline["results"][name]
+        after = current["results"][name]
+        if before["value"] == 0:
+            continue
+
+        change = (after["value"] - before["value"]) / before["value"]
+        if not before["higher_is_better"]:
+            change = -change
+        rows.append((name, before["value"], after["value"], change, change < -threshold))
+    return rows
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Ground client benchmarks")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--quick", action="store_true")
+    run_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    run_parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake server takes per request")
+    run_parser.add_argument("--output", help="file to write the results to instead of stdout")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    options = parser.parse_args(args)
+    if options.command == "run":
+        output = json.dumps(run(options), indent=2, sort_keys=True)
+        if options.output:
+            with open(options.output, "w") as output_file:
+                output_file.write(output + "\n")
+        else:
+            print(output)
+        return 0
+
+    if options.command == "compare":
+        with open(options.baseline) as baseline_file, open(options.current) as current_file:
+            rows = compare(json.load(baseline_file), json.load(current_file), options.threshold)
+
+        for name, before, after, change, regressed in rows:
+            print("%-48s %14.6g %14.6g %+8.1f%%%s" % (name, before, after, change * 100,
+                                                       "  REGRESSION" if regressed else ""))
+        return 1 if any(row[4] for row in rows) else 0
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,663 @@
+import asyncio
+
+import ground.common.model as model
+from ground.batch import run_batch_async
+from ground.client import STREAM_CHUNK_SIZE, BaseGroundClient
+from ground.coalesce import AsyncSingleFlight
+from ground.dedup import get_content_hash, get_duplicate_candidates
+from ground.deadline import check_deadline, start_deadline, wait_within
+from ground.history import iter_entry_successors
+from ground.instrumentation import NULL_TIMER
+from ground.lazy_graph import AsyncLazyGraphVersion
+from ground.lineage import AsyncLineageTraversal
+from ground.stream import JsonStreamParser
+from ground.transport import AiohttpTransport
+
+
+class AsyncGroundClient(BaseGroundClient):
+    '''
+    The asyncio version of GroundClient. Every public method of GroundClient is
+    available here as a coroutine with the same arguments and return value,
+    except load_graph, which uses the thread-based GraphLoader, and the spool
+    methods get_spool and resolve_id, as a spool only works with GroundClient.
+
+    max_concurrency bounds the number of requests in flight at once across all
+    tasks sharing this client. connect_timeout and read_timeout, in seconds, are
+    passed on to the AiohttpTransport it creates when none is given.
+    '''
+
+    def __init__(self, hostname="localhost", port=9000, transport=None, pool_size=100, max_concurrency=100,
+                 version_cache_size=0, lookup_cache_ttl=None, lookup_cache_size=10000, coalesce_gets=False,
+                 decode_tags=True, retry_policy=None, circuit_breaker=None, connect_timeout=None, read_timeout=None,
+                 instrumentation=None, dedup_versions=False):
+        super().__init__(hostname, port, version_cache_size, lookup_cache_ttl, lookup_cache_size, decode_tags,
+                         retry_policy, circuit_breaker, instrumentation, dedup_versions)
+
+        # concurrent identical GETs share one request when this is set
+        self._single_flight = AsyncSingleFlight() if coalesce_gets else None
+
+        # a transport handed in by the caller is theirs to close
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = AiohttpTransport(pool_size=pool_size, connect_timeout=connect_timeout,
+                                         read_timeout=read_timeout)
+        self._transport = transport
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def get_transport(self):
+        return self._transport
+
+    def get_single_flight(self):
+        return self._single_flight
+
+    async def close(self):
+        if self._owns_transport:
+            await self._transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    '''
+    HELPER METHODS
+    '''
+
+    async def _make_get_request(self, endpoint, return_json=True):
+        if self._single_flight is None or not return_json:
+            return await self._send_get_request(endpoint, return_json)
+        return await self._single_flight.do(endpoint, lambda: self._send_get_request(endpoint))
+
+    def _time_request(self, method, endpoint):
+        if self._instrumentation is None:
+            return NULL_TIMER
+        return self._instrumentation.time_async_request(method, endpoint)
+
+    async def _send_get_request(self, endpoint, return_json=True):
+        with self._time_request("GET", endpoint) as timer:
+            request = await self._send_request("GET", endpoint, lambda: self._transport.get(self.url + endpoint))
+            timer.received(request.status_code, len(request.content))
+            return timer.decode(self._parse_response, request, return_json)
+
+    async def _send_request(self, method, endpoint, send, reconcile=None):
+        # each attempt takes its own max_concurrency slot, so none is held while
+        # backing off
+        attempt = 0
+        while True:
+            check_deadline()
+            self._check_circuit(method, endpoint)
+            try:
+                async with self._semaphore:
+                    response = await send()
+            except Exception as error:
+                delay = self._get_retry_delay(method, endpoint, attempt, error=error)
+                if delay is None:
+                    raise
+            except BaseException:
+                # cancelled, so the attempt has no outcome to record
+                self._abandon_attempt()
+                raise
+            else:
+                delay = self._get_retry_delay(method, endpoint, attempt, response=response)
+                if delay is None:
+                    return response
+
+                # streamed responses close asynchronously, buffered ones do not, and
+                # plain get and post responses need not have close() at all
+                close = getattr(response, "close", None)
+                closed = close() if close is not None else None
+                if asyncio.iscoroutine(closed):
+                    await closed
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+            if reconcile is not None:
+                response = await self._reconcile(reconcile)
+                if response is not None:
+                    return response
+
+    async def _reconcile(self, endpoint):
+        try:
+            async with self._semaphore:
+                response = await self._transport.get(self.url + endpoint)
+        except Exception as error:
+            if not self._transport.is_transient_error(error):
+                raise
+            return None
+
+        if response.status_code < 300:
+            self._retry_policy.record_reconciled()
+            return response
+
+    async def _iter_get_request(self, endpoint):
+        # only opening the stream counts against max_concurrency, so a caller working
+        # through a long stream can still make other requests
+        with self._time_request("GET", endpoint) as timer:
+            response = await self._send_request("GET", endpoint,
+                                                lambda: self._transport.get_stream(self.url + endpoint))
+            timer.received(response.status_code)
+            try:
+                if response.status_code >= 400:
+                    return
+
+                parser = JsonStreamParser()
+                async for chunk in timer.iter_chunks(response.iter_content(STREAM_CHUNK_SIZE)):
+                    for entry in timer.decode(self._parse_stream, parser, chunk):
+                        yield entry
+                for entry in timer.decode(self._parse_stream, parser):
+                    yield entry
+            finally:
+                await response.close()
+
+    async def _make_post_request(self, endpoint, body, return_json=True, reconcile=None):
+        with self._time_request("POST", endpoint) as timer:
+            request = await self._send_request("POST", endpoint,
+                                               lambda: self._transport.post(self.url + endpoint, body), reconcile)
+            timer.received(request.status_code, len(request.content))
+            return timer.decode(self._parse_response, request, return_json)
+
+    async def _create_item(self, item_type, source_key, name, tags):
+        body = self._get_item_json(source_key, name, tags)
+        return await self._make_post_request("/" + item_type, body, reconcile="/" + item_type + "/" + source_key)
+
+    async def _get_or_create_item(self, item_type, source_key, model_class, create):
+        item = self._get_indexed_item(item_type, source_key)
+        if item is None:
+            item = await self._get_item_model(item_type, source_key, model_class)
+        if item is None:
+            item = await create()
+        if item is None:
+            # someone else created it since the lookup
+            item = await self._get_item_model(item_type, source_key, model_class)
+        return item
+
+    async def _get_item(self, item_type, source_key):
+        return await self._make_get_request("/" + item_type + "/" + source_key)
+
+    async def _get_item_model(self, item_type, source_key, model_class):
+        item = self._get_cached_lookup(item_type, ("item", source_key))
+        if item is None:
+            response = await self._get_item(item_type, source_key)
+            item = self._cache_item(item_type, self._to_model(model_class, response,
+                                                               "/" + item_type + "/" + source_key))
+        return item
+
+    async def _get_item_latest_versions(self, item_type, source_key):
+        latest = self._get_cached_lookup(item_type, ("latest", source_key))
+        if latest is None:
+            response = await self._make_get_request("/" + item_type + "/" + source_key + "/latest")
+            latest = self._cache_latest_versions(item_type, source_key, response)
+        return latest
+
+    async def _get_item_history(self, item_type, source_key):
+        return await self._make_get_request("/" + item_type + "/" + source_key + "/history")
+
+    async def _iter_item_latest_versions(self, item_type, source_key):
+        latest = self._get_cached_lookup(item_type, ("latest", source_key))
+        if latest is None:
+            latest = self._iter_get_request("/" + item_type + "/" + source_key + "/latest")
+            async for id in latest:
+                yield id
+        else:
+            for id in latest:
+                yield id
+
+    async def _iter_item_history(self, item_type, source_key):
+        async for entry in self._iter_get_request("/" + item_type + "/" + source_key + "/history"):
+            for successor in iter_entry_successors([entry]):
+                yield successor
+
+    async def _get_item_history_dag(self, item_type, source_key, model_class):
+        item = await self._get_item_model(item_type, source_key, model_class)
+        if item is not None:
+            dag = model.version.version_history_dag.VersionHistoryDag(item.get_id(), [])
+            async for successor in self._iter_item_history(item_type, source_key):
+                dag.add_edge(successor.get_from_id(), successor.get_to_id(), successor.get_id())
+            return dag
+
+    async def _get_version(self, item_type, id):
+        return await self._make_get_request("/versions/" + item_type + "/" + str(id))
+
+    async def _get_version_model(self, item_type, id, model_class):
+        version = self._get_cached_version(item_type, id)
+        if version is None:
+            response = await self._get_version(item_type, id)
+            version = self._to_version_model(item_type, id, model_class, response)
+        return version
+
+    async def _get_version_models(self, item_type, ids, model_class, deadline=None):
+        versions, missing = self._get_cached_versions(item_type, ids)
+
+        async def fetch(id):
+            response = await self._get_version(item_type, id)
+            return self._to_version_model(item_type, id, model_class, response)
+
+        async def fetch_missing():
+            return await asyncio.gather(*[fetch(id) for id in missing])
+
+        if missing:
+            versions.update(zip(missing, await wait_within(start_deadline(deadline), fetch_missing())))
+        return versions
+
+    async def _create_version(self, item_type, item_id, body, model_class):
+        content_hash = None
+        if self._version_hashes is not None:
+            content_hash = get_content_hash(body)
+            version = await self._find_duplicate_version(item_type, item_id, body.get("parentIds"), content_hash,
+                                                         model_class)
+            if version is not None:
+                return version
+
+        response = await self._make_post_request("/versions/" + item_type, body)
+        version = self._to_model(model_class, response, "/versions/" + item_type)
+        self._version_hash_created(version, content_hash)
+        return self._version_created(item_type, item_id, version)
+
+    async def _find_duplicate_version(self, item_type, item_id, parent_ids, content_hash, model_class):
+        source_key = self._get_indexed_source_key(item_type, item_id)
+        if source_key is None:
+            return None
+
+        for id in get_duplicate_candidates(await self._get_item_history(item_type, source_key), parent_ids):
+            version_hash = self._version_hashes.get(id)
+            if version_hash is not None:
+                if version_hash == content_hash:
+                    return await self._get_version_model(item_type, id, model_class)
+                continue
+
+            response = await self._get_version(item_type, id)
+            if response is not None and self._hash_version(id, response) == content_hash:
+                return self._to_version_model(item_type, id, model_class, response)
+
+    '''
+    EDGE METHODS
+    '''
+
+    async def create_edge(self, source_key, name, from_node_id, to_node_id, tags=None):
+        body = self._get_edge_json(source_key, name, from_node_id, to_node_id, tags)
+        response = await self._make_post_request("/edges", body, reconcile="/edges/" + source_key)
+        return self._cache_item("edges", self._to_model(model.core.edge.Edge, response, "/edges"))
+
+    async def get_or_create_edge(self, source_key, name, from_node_id, to_node_id, tags=None):
+        def create():
+            return self.create_edge(source_key, name, from_node_id, to_node_id, tags)
+
+        return await self._get_or_create_item("edges", source_key, model.core.edge.Edge, create)
+
+    async def create_edge_version(self,
+                                  edge_id,
+                                  from_node_version_start_id,
+                                  to_node_version_start_id,
+                                  from_node_version_end_id=-1,
+                                  to_node_version_end_id=-1,
+                                  reference=None,
+                                  reference_parameters=None,
+                                  tags=None,
+                                  structure_version_id=-1,
+                                  parent_ids=None):
+
+        body = self._get_edge_version_json(edge_id, from_node_version_start_id, to_node_version_start_id,
+                                           from_node_version_end_id, to_node_version_end_id, reference,
+                                           reference_parameters, tags, structure_version_id, parent_ids)
+
+        return await self._create_version("edges", edge_id, body, model.core.edge_version.EdgeVersion)
+
+    async def get_edge(self, source_key):
+        return await self._get_item_model("edges", source_key, model.core.edge.Edge)
+
+    async def get_edge_latest_versions(self, source_key):
+        return await self._get_item_latest_versions("edges", source_key)
+
+    async def get_edge_history(self, source_key):
+        return await self._get_item_history("edges", source_key)
+
+    async def get_edge_history_dag(self, source_key):
+        return await self._get_item_history_dag("edges", source_key, model.core.edge.Edge)
+
+    def iter_edge_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("edges", source_key)
+
+    def iter_edge_history(self, source_key):
+        return self._iter_item_history("edges", source_key)
+
+    async def get_edge_version(self, id):
+        return await self._get_version_model("edges", id, model.core.edge_version.EdgeVersion)
+
+    async def get_edge_versions(self, ids, deadline=None):
+        return await self._get_version_models("edges", ids, model.core.edge_version.EdgeVersion, deadline)
+
+    async def get_edge_version_table(self, ids, deadline=None):
+        versions, missing = self._get_cached_versions("edges", ids)
+
+        async def fetch_missing():
+            return await asyncio.gather(*[self._get_version("edges", id) for id in missing])
+
+        payloads = {}
+        if missing:
+            payloads = dict(zip(missing, await wait_within(start_deadline(deadline), fetch_missing())))
+        return self._build_edge_version_table(ids, versions, payloads)
+
+    '''
+    GRAPH METHODS
+    '''
+
+    async def create_graph(self, source_key, name, tags=None):
+        response = await self._create_item("graphs", source_key, name, tags)
+        return self._cache_item("graphs", self._to_model(model.core.graph.Graph, response, "/graphs"))
+
+    async def get_or_create_graph(self, source_key, name, tags=None):
+        return await self._get_or_create_item("graphs", source_key, model.core.graph.Graph,
+                                              lambda: self.create_graph(source_key, name, tags))
+
+    async def create_graph_version(self,
+                                   graph_id,
+                                   edge_version_ids,
+                                   reference=None,
+                                   reference_parameters=None,
+                                   tags=None,
+                                   structure_version_id=-1,
+                                   parent_ids=None):
+
+        body = self._get_graph_version_json(graph_id, edge_version_ids, reference, reference_parameters,
+                                            tags, structure_version_id, parent_ids)
+
+        return await self._create_version("graphs", graph_id, body, model.core.graph_version.GraphVersion)
+
+    async def get_graph(self, source_key):
+        return await self._get_item_model("graphs", source_key, model.core.graph.Graph)
+
+    async def get_graph_latest_versions(self, source_key):
+        return await self._get_item_latest_versions("graphs", source_key)
+
+    async def get_graph_history(self, source_key):
+        return await self._get_item_history("graphs", source_key)
+
+    async def get_graph_history_dag(self, source_key):
+        return await self._get_item_history_dag("graphs", source_key, model.core.graph.Graph)
+
+    def iter_graph_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("graphs", source_key)
+
+    def iter_graph_history(self, source_key):
+        return self._iter_item_history("graphs", source_key)
+
+    async def get_graph_version(self, id):
+        return await self._get_version_model("graphs", id, model.core.graph_version.GraphVersion)
+
+    async def get_graph_versions(self, ids, deadline=None):
+        return await self._get_version_models("graphs", ids, model.core.graph_version.GraphVersion, deadline)
+
+    async def get_lazy_graph_version(self, id, batch_size=100, prefetch=True):
+        graph_version = await self.get_graph_version(id)
+        if graph_version is not None:
+            return AsyncLazyGraphVersion(self, graph_version, batch_size, prefetch)
+
+    '''
+    NODE METHODS
+    '''
+
+    async def create_node(self, source_key, name, tags=None):
+        response = await self._create_item("nodes", source_key, name, tags)
+        return self._cache_item("nodes", self._to_model(model.core.node.Node, response, "/nodes"))
+
+    async def get_or_create_node(self, source_key, name, tags=None):
+        return await self._get_or_create_item("nodes", source_key, model.core.node.Node,
+                                              lambda: self.create_node(source_key, name, tags))
+
+    async def create_node_version(self,
+                                  node_id,
+                                  reference=None,
+                                  reference_parameters=None,
+                                  tags=None,
+                                  structure_version_id=-1,
+                                  parent_ids=None):
+
+        body = self._get_node_version_json(node_id, reference, reference_parameters, tags,
+                                           structure_version_id, parent_ids)
+
+        return await self._create_version("nodes", node_id, body, model.core.node_version.NodeVersion)
+
+    async def get_node(self, source_key):
+        return await self._get_item_model("nodes", source_key, model.core.node.Node)
+
+    async def get_node_latest_versions(self, source_key):
+        return await self._get_item_latest_versions("nodes", source_key)
+
+    async def get_node_history(self, source_key):
+        return await self._get_item_history("nodes", source_key)
+
+    async def get_node_history_dag(self, source_key):
+        return await self._get_item_history_dag("nodes", source_key, model.core.node.Node)
+
+    def iter_node_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("nodes", source_key)
+
+    def iter_node_history(self, source_key):
+        return self._iter_item_history("nodes", source_key)
+
+    async def get_node_version(self, id):
+        return await self._get_version_model("nodes", id, model.core.node_version.NodeVersion)
+
+    async def get_node_versions(self, ids, deadline=None):
+        return await self._get_version_models("nodes", ids, model.core.node_version.NodeVersion, deadline)
+
+    async def get_node_version_adjacent_lineage(self, id):
+        return await self._make_get_request("/versions/nodes/adjacent/lineage/" + str(id))
+
+    '''
+    LINEAGE TRAVERSAL METHODS
+
+    upstream and downstream generate (version id, depth, LineageEdgeVersion) for
+    every rich version reached, breadth first; path returns the shortest list of
+    version ids leading downstream from one version to another, or None.
+    '''
+
+    def upstream(self, id, depth=None, max_nodes=None, deadline=None):
+        return AsyncLineageTraversal(self, deadline=deadline).upstream(id, depth, max_nodes)
+
+    def downstream(self, id, depth=None, max_nodes=None, deadline=None):
+        return AsyncLineageTraversal(self, deadline=deadline).downstream(id, depth, max_nodes)
+
+    async def path(self, from_id, to_id, max_depth=None, deadline=None):
+        return await AsyncLineageTraversal(self, deadline=deadline).path(from_id, to_id, max_depth)
+
+    '''
+    STRUCTURE METHODS
+    '''
+
+    async def create_structure(self, source_key, name, tags=None):
+        response = await self._create_item("structures", source_key, name, tags)
+        return self._cache_item("structures", self._to_model(model.core.structure.Structure, response, "/structures"))
+
+    async def get_or_create_structure(self, source_key, name, tags=None):
+        return await self._get_or_create_item("structures", source_key, model.core.structure.Structure,
+                                              lambda: self.create_structure(source_key, name, tags))
+
+    async def create_structure_version(self,
+                                       structure_id,
+                                       attributes,
+                                       parent_ids=None):
+
+        body = self._get_structure_version_json(structure_id, attributes, parent_ids)
+
+        model_class = model.core.structure_version.StructureVersion
+        return await self._create_version("structures", structure_id, body, model_class)
+
+    async def get_structure(self, source_key):
+        return await self._get_item_model("structures", source_key, model.core.structure.Structure)
+
+    async def get_structure_latest_versions(self, source_key):
+        return await self._get_item_latest_versions("structures", source_key)
+
+    async def get_structure_history(self, source_key):
+        return await self._get_item_history("structures", source_key)
+
+    async def get_structure_history_dag(self, source_key):
+        return await self._get_item_history_dag("structures", source_key, model.core.structure.Structure)
+
+    def iter_structure_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("structures", source_key)
+
+    def iter_structure_history(self, source_key):
+        return self._iter_item_history("structures", source_key)
+
+    async def get_structure_version(self, id):
+        return await self._get_version_model("structures", id, model.core.structure_version.StructureVersion)
+
+    async def get_structure_versions(self, ids, deadline=None):
+        model_class = model.core.structure_version.StructureVersion
+        return await self._get_version_models("structures", ids, model_class, deadline)
+
+    '''
+    LINEAGE EDGE METHODS
+    '''
+
+    async def create_lineage_edge(self, source_key, name, tags=None):
+        response = await self._create_item("lineage_edges", source_key, name, tags)
+        lineage_edge = self._to_model(model.usage.lineage_edge.LineageEdge, response, "/lineage_edges")
+        return self._cache_item("lineage_edges", lineage_edge)
+
+    async def get_or_create_lineage_edge(self, source_key, name, tags=None):
+        return await self._get_or_create_item("lineage_edges", source_key, model.usage.lineage_edge.LineageEdge,
+                                              lambda: self.create_lineage_edge(source_key, name, tags))
+
+    async def create_lineage_edge_version(self,
+                                          edge_id,
+                                          to_rich_version_id,
+                                          from_rich_version_id,
+                                          reference=None,
+                                          reference_parameters=None,
+                                          tags=None,
+                                          structure_version_id=-1,
+                                          parent_ids=None):
+
+        body = self._get_lineage_edge_version_json(edge_id, to_rich_version_id, from_rich_version_id, reference,
+                                                   reference_parameters, tags, structure_version_id, parent_ids)
+
+        model_class = model.usage.lineage_edge_version.LineageEdgeVersion
+        return await self._create_version("lineage_edges", edge_id, body, model_class)
+
+    async def get_lineage_edge(self, source_key):
+        return await self._get_item_model("lineage_edges", source_key, model.usage.lineage_edge.LineageEdge)
+
+    async def get_lineage_edge_latest_versions(self, source_key):
+        return await self._get_item_latest_versions("lineage_edges", source_key)
+
+    async def get_lineage_edge_history(self, source_key):
+        return await self._get_item_history("lineage_edges", source_key)
+
+    async def get_lineage_edge_history_dag(self, source_key):
+        return await self._get_item_history_dag("lineage_edges", source_key, model.usage.lineage_edge.LineageEdge)
+
+    def iter_lineage_edge_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("lineage_edges", source_key)
+
+    def iter_lineage_edge_history(self, source_key):
+        return self._iter_item_history("lineage_edges", source_key)
+
+    async def get_lineage_edge_version(self, id):
+        return await self._get_version_model("lineage_edges", id, model.usage.lineage_edge_version.LineageEdgeVersion)
+
+    async def get_lineage_edge_versions(self, ids, deadline=None):
+        model_class = model.usage.lineage_edge_version.LineageEdgeVersion
+        return await self._get_version_models("lineage_edges", ids, model_class, deadline)
+
+    '''
+    LINEAGE GRAPH METHODS
+    '''
+
+    async def create_lineage_graph(self, source_key, name, tags=None):
+        response = await self._create_item("lineage_graphs", source_key, name, tags)
+        lineage_graph = self._to_model(model.usage.lineage_graph.LineageGraph, response, "/lineage_graphs")
+        return self._cache_item("lineage_graphs", lineage_graph)
+
+    async def get_or_create_lineage_graph(self, source_key, name, tags=None):
+        return await self._get_or_create_item("lineage_graphs", source_key, model.usage.lineage_graph.LineageGraph,
+                                              lambda: self.create_lineage_graph(source_key, name, tags))
+
+    async def create_lineage_graph_version(self,
+                                           lineage_graph_id,
+                                           lineage_edge_version_ids,
+                                           reference=None,
+                                           reference_parameters=None,
+                                           tags=None,
+                                           structure_version_id=-1,
+                                           parent_ids=None):
+
+        body = self._get_lineage_graph_version_json(lineage_graph_id, lineage_edge_version_ids, reference,
+                                                    reference_parameters, tags, structure_version_id, parent_ids)
+
+        model_class = model.usage.lineage_graph_version.LineageGraphVersion
+        return await self._create_version("lineage_graphs", lineage_graph_id, body, model_class)
+
+    async def get_lineage_graph(self, source_key):
+        return await self._get_item_model("lineage_graphs", source_key, model.usage.lineage_graph.LineageGraph)
+
+    async def get_lineage_graph_latest_versions(self, source_key):
+        return await self._get_item_latest_versions("lineage_graphs", source_key)
+
+    async def get_lineage_graph_history(self, source_key):
+        return await self._get_item_history("lineage_graphs", source_key)
+
+    async def get_lineage_graph_history_dag(self, source_key):
+        return await self._get_item_history_dag("lineage_graphs", source_key, model.usage.lineage_graph.LineageGraph)
+
+    def iter_lineage_graph_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("lineage_graphs", source_key)
+
+    def iter_lineage_graph_history(self, source_key):
+        return self._iter_item_history("lineage_graphs", source_key)
+
+    async def get_lineage_graph_version(self, id):
+        model_class = model.usage.lineage_graph_version.LineageGraphVersion
+        return await self._get_version_model("lineage_graphs", id, model_class)
+
+    async def get_lineage_graph_versions(self, ids, deadline=None):
+        model_class = model.usage.lineage_graph_version.LineageGraphVersion
+        return await self._get_version_models("lineage_graphs", ids, model_class, deadline)
+
+    '''
+    BULK METHODS
+
+    Each takes a list of calls to the matching create_* method, as for GroundClient,
+    runs them concurrently within max_concurrency and returns a BatchResult.
+    '''
+
+    async def create_edges(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_edge, items))
+
+    async def create_edge_versions(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_edge_version, items))
+
+    async def create_graphs(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_graph, items))
+
+    async def create_graph_versions(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_graph_version, items))
+
+    async def create_nodes(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_node, items))
+
+    async def create_node_versions(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_node_version, items))
+
+    async def create_structures(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_structure, items))
+
+    async def create_structure_versions(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_structure_version, items))
+
+    async def create_lineage_edges(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_lineage_edge, items))
+
+    async def create_lineage_edge_versions(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_lineage_edge_version, items))
+
+    async def create_lineage_graphs(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_lineage_graph, items))
+
+    async def create_lineage_graph_versions(self, items, deadline=None):
+        return await wait_within(start_deadline(deadline), run_batch_async(self.create_lineage_graph_version, items))
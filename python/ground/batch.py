@@ -0,0 +1,81 @@
+import asyncio
+
+
+class BatchItemError(RuntimeError):
+    pass
+
+
+class BatchResult:
+    '''
+    The outcome of a bulk call. Results are in input order, with None in place
+    of every item that failed; the reason for each failure is in get_errors(),
+    keyed by the item's index.
+    '''
+
+    def __init__(self, results, errors):
+        self._results = results
+        self._errors = errors
+
+    def get_results(self):
+        return self._results
+
+    def get_errors(self):
+        return self._errors
+
+    def is_successful(self):
+        return not self._errors
+
+    def __len__(self):
+        return len(self._results)
+
+    def __iter__(self):
+        return iter(self._results)
+
+    def __getitem__(self, index):
+        return self._results[index]
+
+
+def call_with_item(method, item):
+    # an item is either the keyword arguments or the positional arguments of one call
+    if isinstance(item, dict):
+        return method(**item)
+    return method(*item)
+
+
+def _collect(index, result, error, results, errors):
+    if error is None and result is None:
+        error = BatchItemError("Server returned no result for batch item " + str(index) + ".")
+    if error is not None:
+        errors[index] = error
+    results.append(result)
+
+
+def run_batch(executor, method, items):
+    futures = [executor.submit(call_with_item, method, item) for item in items]
+
+    results = []
+    errors = {}
+    for index, future in enumerate(futures):
+        try:
+            result, error = future.result(), None
+        except Exception as e:
+            result, error = None, e
+        _collect(index, result, error, results, errors)
+
+    return BatchResult(results, errors)
+
+
+async def run_batch_async(method, items):
+    outcomes = await asyncio.gather(*[call_with_item(method, item) for item in items], return_exceptions=True)
+
+    results = []
+    errors = {}
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            _collect(index, None, outcome, results, errors)
+        else:
+            _collect(index, outcome, None, results, errors)
+
+    return BatchResult(results, errors)
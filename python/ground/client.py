@@ -1,42 +1,271 @@
-import requests
+import threading
+import time
 
 import ground.common.model as model
+from ground.batch import run_batch
+from ground.cache import LRUCache, TTLCache
+from ground.coalesce import SingleFlight
+from ground.deadline import (ContextThreadPoolExecutor, DeadlineExceeded, check_deadline, deadline_scope,
+                             get_remaining)
+from ground.decode import loads, to_model
+from ground.dedup import get_content_hash, get_duplicate_candidates
+from ground.edge_table import EdgeVersionTable
+from ground.history import build_version_history_dag, iter_entry_successors
+from ground.instrumentation import NULL_TIMER, get_endpoint_template
+from ground.lazy_graph import LazyGraphVersion
+from ground.lineage import LineageTraversal
+from ground.loader import GraphLoader
+from ground.retry import CircuitOpenError, RetriesExhaustedError
+from ground.spool import TRANSIENT_STATUSES
+from ground.stream import JsonStreamParser
+from ground.transport import SessionTransport
+
+
+ITEM_TYPES = ("nodes", "edges", "graphs", "structures", "lineage_edges", "lineage_graphs")
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class BaseGroundClient:
+    '''
+    Request building and response handling shared by GroundClient and
+    AsyncGroundClient. Nothing in here performs I/O.
+    '''
 
-
-class GroundClient:
-
-    def __init__(self, hostname="localhost", port=9000):
+    def __init__(self, hostname="localhost", port=9000, version_cache_size=0, lookup_cache_ttl=None,
+                 lookup_cache_size=10000, decode_tags=True, retry_policy=None, circuit_breaker=None,
+                 instrumentation=None, dedup_versions=False):
         self.url = "http://" + hostname + ":" + str(port)
 
+        # requests and model building are only timed when this is set
+        self._instrumentation = instrumentation
+
+        # without a RetryPolicy every request is sent once, and without a CircuitBreaker
+        # requests are sent however often the server has failed
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
+
+        # models are built without their tags when this is off, so bulk reads that never
+        # look at tags do not hold on to them
+        self._decode_tags = decode_tags
+
+        # versions never change once they have an id, so cached ones never go stale
+        self._version_cache = None
+        if version_cache_size > 0:
+            self._version_cache = LRUCache(version_cache_size)
+
+        # items and their latest versions can change under us, so they are only kept
+        # for a while; lookup_cache_ttl is either seconds for every item type or a
+        # dict of item type -> seconds
+        self._lookup_caches = {}
+        if lookup_cache_ttl is not None:
+            for item_type in ITEM_TYPES:
+                if isinstance(lookup_cache_ttl, dict):
+                    ttl = lookup_cache_ttl.get(item_type)
+                else:
+                    ttl = lookup_cache_ttl
+                if ttl:
+                    self._lookup_caches[item_type] = TTLCache(ttl, lookup_cache_size)
+
+        # an item's id never changes once its source key has one, so the get_or_create_*
+        # methods only ask the server about source keys this client has not seen yet
+        self._item_index = LRUCache(lookup_cache_size)
+
+        # with dedup_versions, a new version that holds exactly what the version it
+        # would follow holds is not written (see ground.dedup); these are the content
+        # hashes of versions this client has written or compared against
+        self._version_hashes = None
+        if dedup_versions:
+            self._version_hashes = LRUCache(lookup_cache_size)
+
+    def get_version_cache(self):
+        return self._version_cache
+
+    def get_item_index(self):
+        return self._item_index
+
+    def get_lookup_cache(self, item_type):
+        return self._lookup_caches.get(item_type)
+
+    def get_retry_policy(self):
+        return self._retry_policy
+
+    def get_circuit_breaker(self):
+        return self._circuit_breaker
+
+    def get_instrumentation(self):
+        return self._instrumentation
+
     '''
     HELPER METHODS
     '''
 
-    def _make_get_request(self, endpoint, return_json=True):
-        request = requests.get(self.url + endpoint)
-
+    def _parse_response(self, request, return_json=True):
         if return_json:
             try:
                 if request.status_code >= 400:
                     return None
-                return request.json()
+                return loads(request.content)
             except ValueError:
                 raise RuntimeError("Unexpected error: Could not decode JSON response from server. Response was " + str(request.status_code) + ".")
         else:
             pass
 
-    def _make_post_request(self, endpoint, body, return_json=True):
-        request = requests.post(self.url + endpoint, json=body)
+    def _check_circuit(self, method, endpoint):
+        if self._circuit_breaker is not None and not self._circuit_breaker.allow():
+            raise CircuitOpenError("Not sending " + method + " " + endpoint + ": the circuit breaker is open.")
+
+    def _abandon_attempt(self):
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record_abandoned()
+
+    def _get_retry_delay(self, method, endpoint, attempt, response=None, error=None):
+        '''
+        Records how an attempt went and returns the seconds to wait before the next
+        one, or None if there should not be one. Raises RetriesExhaustedError if the
+        last allowed attempt still got a retryable status, and DeadlineExceeded if
+        the deadline in effect would pass while waiting.
+        '''
+        if isinstance(error, DeadlineExceeded):
+            # running out of time says nothing about the server
+            self._abandon_attempt()
+            return None
 
-        if return_json:
-            try:
-                if request.status_code >= 400:
-                    return None
-                return request.json()
-            except ValueError:
-                raise RuntimeError("Unexpected error: Could not decode JSON response from server. Response was " + str(request.status_code) + ".")
+        failed = error is not None or response.status_code >= 500
+        if self._circuit_breaker is not None:
+            if failed:
+                self._circuit_breaker.record_failure()
+            else:
+                self._circuit_breaker.record_success()
+
+        policy = self._retry_policy
+        if not failed or policy is None:
+            return None
+
+        if error is None:
+            retryable = policy.is_retryable_status(method, response.status_code)
+        elif method == "GET":
+            retryable = self._transport.is_transient_error(error)
         else:
-            pass
+            retryable = self._transport.is_connect_error(error)
+
+        if not retryable:
+            return None
+        if attempt + 1 >= policy.get_max_attempts():
+            policy.record_exhausted()
+            if error is None:
+                raise RetriesExhaustedError(method, endpoint, response.status_code, attempt + 1)
+            return None
+
+        delay = policy.get_delay(attempt)
+        remaining = get_remaining()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded("The deadline for " + method + " " + endpoint + " would pass before it could be "
+                                   "retried.")
+
+        policy.record_retry(delay)
+        return delay
+
+    def _parse_stream(self, parser, chunk=None):
+        # the entries completed by chunk, or the last ones once the stream has ended
+        try:
+            if chunk is None:
+                return parser.close()
+            return parser.feed(chunk)
+        except ValueError:
+            raise RuntimeError("Unexpected error: Could not decode JSON response stream from server.")
+
+    def _to_model(self, model_class, response, endpoint):
+        # endpoint is the one response came from, which the model is attributed to
+        if response is not None:
+            if self._instrumentation is None:
+                return to_model(model_class, response, self._decode_tags)
+            return self._instrumentation.build_model(model_class, get_endpoint_template(endpoint), to_model,
+                                                     model_class, response, self._decode_tags)
+
+    def _get_cached_version(self, item_type, id):
+        if self._version_cache is not None:
+            return self._version_cache.get((item_type, id))
+
+    def _get_cached_versions(self, item_type, ids):
+        # returns every requested id mapped to its cached version or None, in input
+        # order, and the ids that still have to be fetched
+        versions = {}
+        missing = []
+        for id in ids:
+            if id not in versions:
+                versions[id] = self._get_cached_version(item_type, id)
+                if versions[id] is None:
+                    missing.append(id)
+        return versions, missing
+
+    def _build_edge_version_table(self, ids, versions, payloads):
+        # cached versions are copied in as they are, the rest straight from their payloads
+        table = EdgeVersionTable()
+        for id in ids:
+            if versions[id] is not None:
+                table.append(versions[id])
+            elif payloads.get(id) is not None:
+                table.append_json(payloads[id])
+        return table
+
+    def _to_version_model(self, item_type, id, model_class, response):
+        return self._cache_version(item_type, self._to_model(model_class, response,
+                                                             "/versions/" + item_type + "/" + str(id)))
+
+    def _cache_version(self, item_type, version):
+        if version is not None and self._version_cache is not None:
+            self._version_cache.put((item_type, version.get_id()), version)
+        return version
+
+    def _get_cached_lookup(self, item_type, key):
+        cache = self._lookup_caches.get(item_type)
+        if cache is not None:
+            return cache.get(key)
+
+    def _cache_item(self, item_type, item):
+        if item is not None:
+            self._item_index.put((item_type, "item", item.get_source_key()), item)
+            self._item_index.put((item_type, "source_key", item.get_id()), item.get_source_key())
+
+        cache = self._lookup_caches.get(item_type)
+        if item is not None and cache is not None:
+            cache.put(("item", item.get_source_key()), item)
+            cache.put(("source_key", item.get_id()), item.get_source_key())
+        return item
+
+    def _get_indexed_item(self, item_type, source_key):
+        return self._item_index.get((item_type, "item", source_key))
+
+    def _get_indexed_source_key(self, item_type, item_id):
+        return self._item_index.get((item_type, "source_key", item_id))
+
+    def _hash_version(self, id, payload):
+        # the content hash of a version payload, remembered for later comparisons
+        content_hash = get_content_hash(payload)
+        self._version_hashes.put(id, content_hash)
+        return content_hash
+
+    def _version_hash_created(self, version, content_hash):
+        if version is not None and content_hash is not None:
+            self._version_hashes.put(version.get_id(), content_hash)
+
+    def _cache_latest_versions(self, item_type, source_key, latest):
+        cache = self._lookup_caches.get(item_type)
+        if latest is not None and cache is not None:
+            cache.put(("latest", source_key), latest)
+        return latest
+
+    def _version_created(self, item_type, item_id, version):
+        cache = self._lookup_caches.get(item_type)
+        if cache is not None:
+            source_key = cache.get(("source_key", item_id))
+            if source_key is not None:
+                cache.invalidate(("latest", source_key))
+            else:
+                # without the item's source key, any latest lookup of this type may be stale
+                cache.invalidate_where(lambda key: key[0] == "latest")
+        return self._cache_version(item_type, version)
 
     def _get_rich_version_json(self, reference, reference_parameters, tags, structure_version_id, parent_ids):
         body = {}
@@ -58,43 +287,429 @@ class GroundClient:
 
         return body
 
-    def _create_item(self, item_type, source_key, name, tags):
-        endpoint = "/" + item_type
+    def _get_item_json(self, source_key, name, tags):
         body = {"sourceKey": source_key, "name": name}
 
         if tags:
             body["tags"] = tags
 
-        return self._make_post_request(endpoint, body)
+        return body
+
+    def _get_edge_json(self, source_key, name, from_node_id, to_node_id, tags):
+        body = self._get_item_json(source_key, name, tags)
+
+        body["fromNodeId"] = from_node_id
+        body["toNodeId"] = to_node_id
+
+        return body
+
+    def _get_edge_version_json(self,
+                               edge_id,
+                               from_node_version_start_id,
+                               to_node_version_start_id,
+                               from_node_version_end_id,
+                               to_node_version_end_id,
+                               reference,
+                               reference_parameters,
+                               tags,
+                               structure_version_id,
+                               parent_ids):
+
+        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
+
+        body["edgeId"] = edge_id
+        body["toNodeVersionStartId"] = to_node_version_start_id
+        body["fromNodeVersionStartId"] = from_node_version_start_id
+
+        if to_node_version_end_id > 0:
+            body["toNodeVersionEndId"] = to_node_version_end_id
+
+        if from_node_version_end_id > 0:
+            body["fromNodeVersionEndId"] = from_node_version_end_id
+
+        return body
+
+    def _get_graph_version_json(self,
+                                graph_id,
+                                edge_version_ids,
+                                reference,
+                                reference_parameters,
+                                tags,
+                                structure_version_id,
+                                parent_ids):
+
+        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
+
+        body["graphId"] = graph_id
+        body["edgeVersionIds"] = edge_version_ids
+
+        return body
+
+    def _get_node_version_json(self,
+                               node_id,
+                               reference,
+                               reference_parameters,
+                               tags,
+                               structure_version_id,
+                               parent_ids):
+
+        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
+
+        body["nodeId"] = node_id
+
+        return body
+
+    def _get_structure_version_json(self, structure_id, attributes, parent_ids):
+        if parent_ids is None:
+            parent_ids = []
+
+        return {
+            "structureId": structure_id,
+            "attributes": attributes,
+            "parentIds": parent_ids
+        }
+
+    def _get_lineage_edge_version_json(self,
+                                       edge_id,
+                                       to_rich_version_id,
+                                       from_rich_version_id,
+                                       reference,
+                                       reference_parameters,
+                                       tags,
+                                       structure_version_id,
+                                       parent_ids):
+
+        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
+
+        body["lineageEdgeId"] = edge_id
+        body["toRichVersionId"] = to_rich_version_id
+        body["fromRichVersionId"] = from_rich_version_id
+
+        return body
+
+    def _get_lineage_graph_version_json(self,
+                                        lineage_graph_id,
+                                        lineage_edge_version_ids,
+                                        reference,
+                                        reference_parameters,
+                                        tags,
+                                        structure_version_id,
+                                        parent_ids):
+
+        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
+
+        body["lineageGraphId"] = lineage_graph_id
+        body["lineageEdgeVersionIds"] = lineage_edge_version_ids
+
+        return body
+
+
+class GroundClient(BaseGroundClient):
+
+    def __init__(self, hostname="localhost", port=9000, transport=None, pool_size=10, pool_block=False, workers=10,
+                 version_cache_size=0, lookup_cache_ttl=None, lookup_cache_size=10000, coalesce_gets=False,
+                 decode_tags=True, retry_policy=None, circuit_breaker=None, connect_timeout=None, read_timeout=None,
+                 instrumentation=None, spool=None, dedup_versions=False):
+        super().__init__(hostname, port, version_cache_size, lookup_cache_ttl, lookup_cache_size, decode_tags,
+                         retry_policy, circuit_breaker, instrumentation, dedup_versions)
+
+        # concurrent identical GETs share one request when this is set
+        self._single_flight = SingleFlight() if coalesce_gets else None
+
+        # a transport handed in by the caller is theirs to close
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = SessionTransport(pool_maxsize=pool_size, pool_block=pool_block, connect_timeout=connect_timeout,
+                                         read_timeout=read_timeout)
+        self._transport = transport
+
+        self._workers = workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        # writes the server cannot take are kept in the spool and replayed in the
+        # background when this is set, including any left there by an earlier run
+        self._spool = spool
+        if spool is not None:
+            spool.start(self._post, self._is_replay_error_transient)
+
+    def get_transport(self):
+        return self._transport
+
+    def get_single_flight(self):
+        return self._single_flight
+
+    def get_spool(self):
+        return self._spool
+
+    def resolve_id(self, id):
+        # the server's id for one a spooled write returned, once the write was replayed
+        if self._spool is None:
+            return id
+        return self._spool.get_server_id(id)
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.stop()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    '''
+    HELPER METHODS
+    '''
+
+    def _make_get_request(self, endpoint, return_json=True):
+        if self._single_flight is None or not return_json:
+            return self._send_get_request(endpoint, return_json)
+        return self._single_flight.do(endpoint, lambda: self._send_get_request(endpoint))
+
+    def _time_request(self, method, endpoint):
+        if self._instrumentation is None:
+            return NULL_TIMER
+        return self._instrumentation.time_request(method, endpoint)
+
+    def _send_get_request(self, endpoint, return_json=True):
+        with self._time_request("GET", endpoint) as timer:
+            request = self._send_request("GET", endpoint, lambda: self._transport.get(self.url + endpoint))
+            timer.received(request.status_code, len(request.content))
+            return timer.decode(self._parse_response, request, return_json)
+
+    def _send_request(self, method, endpoint, send, reconcile=None):
+        # send makes one attempt. reconcile is an endpoint to look up before every
+        # retry; if it is found, the failed attempt took effect and that is returned.
+        attempt = 0
+        while True:
+            check_deadline()
+            self._check_circuit(method, endpoint)
+            try:
+                response = send()
+            except Exception as error:
+                delay = self._get_retry_delay(method, endpoint, attempt, error=error)
+                if delay is None:
+                    raise
+            except BaseException:
+                self._abandon_attempt()
+                raise
+            else:
+                delay = self._get_retry_delay(method, endpoint, attempt, response=response)
+                if delay is None:
+                    return response
+                close = getattr(response, "close", None)
+                if close is not None:
+                    close()
+
+            time.sleep(delay)
+            attempt += 1
+
+            if reconcile is not None:
+                response = self._reconcile(reconcile)
+                if response is not None:
+                    return response
+
+    def _reconcile(self, endpoint):
+        try:
+            response = self._transport.get(self.url + endpoint)
+        except Exception as error:
+            if not self._transport.is_transient_error(error):
+                raise
+            return None
+
+        if response.status_code < 300:
+            self._retry_policy.record_reconciled()
+            return response
+
+    def _iter_get_request(self, endpoint):
+        # generates the entries of the response's top level array or object as they
+        # are read, without ever holding the whole body
+        with self._time_request("GET", endpoint) as timer:
+            response = self._send_request("GET", endpoint, lambda: self._transport.get_stream(self.url + endpoint))
+            timer.received(response.status_code)
+            try:
+                if response.status_code >= 400:
+                    return
+
+                parser = JsonStreamParser()
+                for chunk in timer.iter_chunks(response.iter_content(STREAM_CHUNK_SIZE)):
+                    for entry in timer.decode(self._parse_stream, parser, chunk):
+                        yield entry
+                for entry in timer.decode(self._parse_stream, parser):
+                    yield entry
+            finally:
+                response.close()
+
+    def _make_post_request(self, endpoint, body, return_json=True, reconcile=None):
+        if self._spool is not None:
+            return self._make_spooled_post_request(endpoint, body, reconcile)
+        return self._post(endpoint, body, reconcile, return_json)[1]
+
+    def _post(self, endpoint, body, reconcile=None, return_json=True):
+        # returns the status code and the parsed response
+        with self._time_request("POST", endpoint) as timer:
+            request = self._send_request("POST", endpoint, lambda: self._transport.post(self.url + endpoint, body),
+                                         reconcile)
+            timer.received(request.status_code, len(request.content))
+            return request.status_code, timer.decode(self._parse_response, request, return_json)
+
+    def _make_spooled_post_request(self, endpoint, body, reconcile):
+        # writes are sent straight away unless earlier ones are still spooled, which
+        # they must not overtake; a spooled write returns its body under a provisional id
+        if self._spool.is_empty():
+            resolved = self._spool.resolve_body(body)
+            if resolved is not None:
+                try:
+                    status_code, response = self._post(endpoint, resolved, reconcile)
+                except (CircuitOpenError, RetriesExhaustedError, DeadlineExceeded):
+                    pass
+                except Exception as error:
+                    if not self._transport.is_connect_error(error):
+                        raise
+                else:
+                    if status_code not in TRANSIENT_STATUSES:
+                        return response
+
+        return dict(body, id=self._spool.append(endpoint, body, reconcile))
+
+    def _is_replay_error_transient(self, error):
+        # a spooled write failing with anything else would fail the same way every time
+        return (isinstance(error, (CircuitOpenError, RetriesExhaustedError, DeadlineExceeded))
+                or self._transport.is_transient_error(error))
+
+    def _get_executor(self):
+        # the worker pool behind the bulk methods is only started when one is first used
+        with self._executor_lock:
+            if self._executor is None:
+                # tasks run in the submitter's context, so they see its deadline
+                self._executor = ContextThreadPoolExecutor(max_workers=self._workers,
+                                                           thread_name_prefix="ground-client")
+            return self._executor
+
+    def _create_item(self, item_type, source_key, name, tags):
+        body = self._get_item_json(source_key, name, tags)
+        return self._make_post_request("/" + item_type, body, reconcile="/" + item_type + "/" + source_key)
+
+    def _get_or_create_item(self, item_type, source_key, model_class, create):
+        # an item this client has seen is returned without a request, and one the server
+        # already has with one; only a new item takes a lookup and a create
+        item = self._get_indexed_item(item_type, source_key)
+        if item is None:
+            item = self._get_item_model(item_type, source_key, model_class)
+        if item is None:
+            item = create()
+        if item is None:
+            # someone else created it since the lookup
+            item = self._get_item_model(item_type, source_key, model_class)
+        return item
 
     def _get_item(self, item_type, source_key):
         return self._make_get_request("/" + item_type + "/" + source_key)
 
+    def _get_item_model(self, item_type, source_key, model_class):
+        item = self._get_cached_lookup(item_type, ("item", source_key))
+        if item is None:
+            response = self._get_item(item_type, source_key)
+            item = self._cache_item(item_type, self._to_model(model_class, response,
+                                                               "/" + item_type + "/" + source_key))
+        return item
+
     def _get_item_latest_versions(self, item_type, source_key):
-        return self._make_get_request("/" + item_type + "/" + source_key + "/latest")
+        latest = self._get_cached_lookup(item_type, ("latest", source_key))
+        if latest is None:
+            response = self._make_get_request("/" + item_type + "/" + source_key + "/latest")
+            latest = self._cache_latest_versions(item_type, source_key, response)
+        return latest
 
     def _get_item_history(self, item_type, source_key):
         return self._make_get_request("/" + item_type + "/" + source_key + "/history")
 
+    def _iter_item_latest_versions(self, item_type, source_key):
+        latest = self._get_cached_lookup(item_type, ("latest", source_key))
+        if latest is not None:
+            return iter(latest)
+        return self._iter_get_request("/" + item_type + "/" + source_key + "/latest")
+
+    def _iter_item_history(self, item_type, source_key):
+        return iter_entry_successors(self._iter_get_request("/" + item_type + "/" + source_key + "/history"))
+
+    def _get_item_history_dag(self, item_type, source_key, model_class):
+        item = self._get_item_model(item_type, source_key, model_class)
+        if item is not None:
+            return build_version_history_dag(item.get_id(), self._iter_item_history(item_type, source_key))
+
     def _get_version(self, item_type, id):
         return self._make_get_request("/versions/" + item_type + "/" + str(id))
 
+    def _get_version_model(self, item_type, id, model_class):
+        version = self._get_cached_version(item_type, id)
+        if version is None:
+            response = self._get_version(item_type, id)
+            version = self._to_version_model(item_type, id, model_class, response)
+        return version
+
+    def _get_version_models(self, item_type, ids, model_class, deadline=None):
+        versions, missing = self._get_cached_versions(item_type, ids)
+
+        def fetch(id):
+            response = self._get_version(item_type, id)
+            return self._to_version_model(item_type, id, model_class, response)
+
+        if missing:
+            with deadline_scope(deadline):
+                versions.update(zip(missing, self._get_executor().map(fetch, missing)))
+        return versions
+
+    def _create_version(self, item_type, item_id, body, model_class):
+        content_hash = None
+        if self._version_hashes is not None:
+            content_hash = get_content_hash(body)
+            version = self._find_duplicate_version(item_type, item_id, body.get("parentIds"), content_hash,
+                                                   model_class)
+            if version is not None:
+                return version
+
+        response = self._make_post_request("/versions/" + item_type, body)
+        version = self._to_model(model_class, response, "/versions/" + item_type)
+        self._version_hash_created(version, content_hash)
+        return self._version_created(item_type, item_id, version)
+
+    def _find_duplicate_version(self, item_type, item_id, parent_ids, content_hash, model_class):
+        # the latest version of the item that already holds what is about to be written,
+        # if any; only items this client has seen can be checked, by their source key
+        source_key = self._get_indexed_source_key(item_type, item_id)
+        if source_key is None or (self._spool is not None and not self._spool.is_empty()):
+            return None
+
+        for id in get_duplicate_candidates(self._get_item_history(item_type, source_key), parent_ids):
+            version_hash = self._version_hashes.get(id)
+            if version_hash is not None:
+                if version_hash == content_hash:
+                    return self._get_version_model(item_type, id, model_class)
+                continue
+
+            response = self._get_version(item_type, id)
+            if response is not None and self._hash_version(id, response) == content_hash:
+                return self._to_version_model(item_type, id, model_class, response)
+
     '''
     EDGE METHODS
     '''
 
     def create_edge(self, source_key, name, from_node_id, to_node_id, tags=None):
-        endpoint = "/edges"
-        body = {"sourceKey": source_key, "name": name, "fromNodeId": from_node_id, "toNodeId": to_node_id}
+        body = self._get_edge_json(source_key, name, from_node_id, to_node_id, tags)
+        response = self._make_post_request("/edges", body, reconcile="/edges/" + source_key)
+        return self._cache_item("edges", self._to_model(model.core.edge.Edge, response, "/edges"))
 
-        if tags:
-            body["tags"] = tags
-
-        response = self._make_post_request(endpoint, body)
-        if response is None:
-            return None
-        else:
-            return model.core.edge.Edge(response)
+    def get_or_create_edge(self, source_key, name, from_node_id, to_node_id, tags=None):
+        return self._get_or_create_item("edges", source_key, model.core.edge.Edge,
+                                        lambda: self.create_edge(source_key, name, from_node_id, to_node_id, tags))
 
     def create_edge_version(self,
                             edge_id,
@@ -108,29 +723,14 @@ class GroundClient:
                             structure_version_id=-1,
                             parent_ids=None):
 
-        endpoint = "/versions/edges"
-        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
-
-        body["edgeId"] = edge_id
-        body["toNodeVersionStartId"] = to_node_version_start_id
-        body["fromNodeVersionStartId"] = from_node_version_start_id
-
-        if to_node_version_end_id > 0:
-            body["toNodeVersionEndId"] = to_node_version_end_id
-
-        if from_node_version_end_id > 0:
-            body["fromNodeVersionEndId"] = from_node_version_end_id
+        body = self._get_edge_version_json(edge_id, from_node_version_start_id, to_node_version_start_id,
+                                           from_node_version_end_id, to_node_version_end_id, reference,
+                                           reference_parameters, tags, structure_version_id, parent_ids)
 
-        response = self._make_post_request(endpoint, body)
-        if response is None:
-            return None
-        else:
-            return model.core.edge_version.EdgeVersion(response)
+        return self._create_version("edges", edge_id, body, model.core.edge_version.EdgeVersion)
 
     def get_edge(self, source_key):
-        response = self._get_item("edges", source_key)
-        if response is not None:
-            return model.core.edge.Edge(response)
+        return self._get_item_model("edges", source_key, model.core.edge.Edge)
 
     def get_edge_latest_versions(self, source_key):
         return self._get_item_latest_versions("edges", source_key)
@@ -138,10 +738,33 @@ class GroundClient:
     def get_edge_history(self, source_key):
         return self._get_item_history("edges", source_key)
 
+    def get_edge_history_dag(self, source_key):
+        return self._get_item_history_dag("edges", source_key, model.core.edge.Edge)
+
+    def iter_edge_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("edges", source_key)
+
+    def iter_edge_history(self, source_key):
+        return self._iter_item_history("edges", source_key)
+
     def get_edge_version(self, id):
-        response = self._get_version("edges", id)
-        if response is not None:
-            return model.core.edge_version.EdgeVersion(response)
+        return self._get_version_model("edges", id, model.core.edge_version.EdgeVersion)
+
+    def get_edge_versions(self, ids, deadline=None):
+        return self._get_version_models("edges", ids, model.core.edge_version.EdgeVersion, deadline)
+
+    def get_edge_version_table(self, ids, deadline=None):
+        # no EdgeVersion is built for what is fetched, and none is added to the version cache
+        versions, missing = self._get_cached_versions("edges", ids)
+
+        def fetch(id):
+            return self._get_version("edges", id)
+
+        payloads = {}
+        if missing:
+            with deadline_scope(deadline):
+                payloads = dict(zip(missing, self._get_executor().map(fetch, missing)))
+        return self._build_edge_version_table(ids, versions, payloads)
 
     '''
     GRAPH METHODS
@@ -149,8 +772,11 @@ class GroundClient:
 
     def create_graph(self, source_key, name, tags=None):
         response = self._create_item("graphs", source_key, name, tags)
-        if response is not None:
-            return model.core.graph.Graph(response)
+        return self._cache_item("graphs", self._to_model(model.core.graph.Graph, response, "/graphs"))
+
+    def get_or_create_graph(self, source_key, name, tags=None):
+        return self._get_or_create_item("graphs", source_key, model.core.graph.Graph,
+                                        lambda: self.create_graph(source_key, name, tags))
 
     def create_graph_version(self,
                              graph_id,
@@ -161,20 +787,13 @@ class GroundClient:
                              structure_version_id=-1,
                              parent_ids=None):
 
-        endpoint = "/versions/graphs"
-        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
-
-        body["graphId"] = graph_id
-        body["edgeVersionIds"] = edge_version_ids
+        body = self._get_graph_version_json(graph_id, edge_version_ids, reference, reference_parameters,
+                                            tags, structure_version_id, parent_ids)
 
-        response = self._make_post_request(endpoint, body)
-        if response is not None:
-            return model.core.graph_version.GraphVersion(response)
+        return self._create_version("graphs", graph_id, body, model.core.graph_version.GraphVersion)
 
     def get_graph(self, source_key):
-        response = self._get_item("graphs", source_key)
-        if response is not None:
-            return model.core.graph.Graph(response)
+        return self._get_item_model("graphs", source_key, model.core.graph.Graph)
 
     def get_graph_latest_versions(self, source_key):
         return self._get_item_latest_versions("graphs", source_key)
@@ -182,10 +801,25 @@ class GroundClient:
     def get_graph_history(self, source_key):
         return self._get_item_history("graphs", source_key)
 
+    def get_graph_history_dag(self, source_key):
+        return self._get_item_history_dag("graphs", source_key, model.core.graph.Graph)
+
+    def iter_graph_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("graphs", source_key)
+
+    def iter_graph_history(self, source_key):
+        return self._iter_item_history("graphs", source_key)
+
     def get_graph_version(self, id):
-        response = self._get_version("graphs", id)
-        if response is not None:
-            return model.core.graph_version.GraphVersion(response)
+        return self._get_version_model("graphs", id, model.core.graph_version.GraphVersion)
+
+    def get_graph_versions(self, ids, deadline=None):
+        return self._get_version_models("graphs", ids, model.core.graph_version.GraphVersion, deadline)
+
+    def get_lazy_graph_version(self, id, batch_size=100, prefetch=True):
+        graph_version = self.get_graph_version(id)
+        if graph_version is not None:
+            return LazyGraphVersion(self, graph_version, batch_size, prefetch)
 
     '''
     NODE METHODS
@@ -193,8 +827,11 @@ class GroundClient:
 
     def create_node(self, source_key, name, tags=None):
         response = self._create_item("nodes", source_key, name, tags)
-        if response is not None:
-            return model.core.node.Node(response)
+        return self._cache_item("nodes", self._to_model(model.core.node.Node, response, "/nodes"))
+
+    def get_or_create_node(self, source_key, name, tags=None):
+        return self._get_or_create_item("nodes", source_key, model.core.node.Node,
+                                        lambda: self.create_node(source_key, name, tags))
 
     def create_node_version(self,
                             node_id,
@@ -204,17 +841,13 @@ class GroundClient:
                             structure_version_id=-1,
                             parent_ids=None):
 
-        endpoint = "/versions/nodes"
-        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
-
-        body["nodeId"] = node_id
+        body = self._get_node_version_json(node_id, reference, reference_parameters, tags,
+                                           structure_version_id, parent_ids)
 
-        response = self._make_post_request(endpoint, body)
-        if response is not None:
-            return model.core.node_version.NodeVersion(response)
+        return self._create_version("nodes", node_id, body, model.core.node_version.NodeVersion)
 
     def get_node(self, source_key):
-        return model.core.node.Node(self._get_item("nodes", source_key))
+        return self._get_item_model("nodes", source_key, model.core.node.Node)
 
     def get_node_latest_versions(self, source_key):
         return self._get_item_latest_versions("nodes", source_key)
@@ -222,47 +855,64 @@ class GroundClient:
     def get_node_history(self, source_key):
         return self._get_item_history("nodes", source_key)
 
+    def get_node_history_dag(self, source_key):
+        return self._get_item_history_dag("nodes", source_key, model.core.node.Node)
+
+    def iter_node_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("nodes", source_key)
+
+    def iter_node_history(self, source_key):
+        return self._iter_item_history("nodes", source_key)
+
     def get_node_version(self, id):
-        response = self._get_version("nodes", id)
-        if response is not None:
-            return model.core.node_version.NodeVersion(response)
+        return self._get_version_model("nodes", id, model.core.node_version.NodeVersion)
+
+    def get_node_versions(self, ids, deadline=None):
+        return self._get_version_models("nodes", ids, model.core.node_version.NodeVersion, deadline)
 
     def get_node_version_adjacent_lineage(self, id):
         return self._make_get_request("/versions/nodes/adjacent/lineage/" + str(id))
 
+    '''
+    LINEAGE TRAVERSAL METHODS
+
+    upstream and downstream generate (version id, depth, LineageEdgeVersion) for
+    every rich version reached, breadth first; path returns the shortest list of
+    version ids leading downstream from one version to another, or None.
+    '''
+
+    def upstream(self, id, depth=None, max_nodes=None, deadline=None):
+        return LineageTraversal(self, deadline=deadline).upstream(id, depth, max_nodes)
+
+    def downstream(self, id, depth=None, max_nodes=None, deadline=None):
+        return LineageTraversal(self, deadline=deadline).downstream(id, depth, max_nodes)
+
+    def path(self, from_id, to_id, max_depth=None, deadline=None):
+        return LineageTraversal(self, deadline=deadline).path(from_id, to_id, max_depth)
+
     '''
     STRUCTURE METHODS
     '''
 
     def create_structure(self, source_key, name, tags=None):
         response = self._create_item("structures", source_key, name, tags)
-        if response is not None:
-            return model.core.structure.Structure(response)
+        return self._cache_item("structures", self._to_model(model.core.structure.Structure, response, "/structures"))
+
+    def get_or_create_structure(self, source_key, name, tags=None):
+        return self._get_or_create_item("structures", source_key, model.core.structure.Structure,
+                                        lambda: self.create_structure(source_key, name, tags))
 
     def create_structure_version(self,
                                  structure_id,
                                  attributes,
                                  parent_ids=None):
 
-        if parent_ids is None:
-            parent_ids = []
+        body = self._get_structure_version_json(structure_id, attributes, parent_ids)
 
-        endpoint = "/versions/structures"
-
-        body = {
-            "structureId": structure_id,
-            "attributes": attributes,
-            "parentIds": parent_ids
-        }
-
-        response = self._make_post_request(endpoint, body)
-        if response is not None:
-            return model.core.structure_version.StructureVersion(response)
+        return self._create_version("structures", structure_id, body, model.core.structure_version.StructureVersion)
 
     def get_structure(self, source_key):
-        response = self._get_item("structures", source_key)
-        if response is not None:
-            return model.core.structure.Structure(response)
+        return self._get_item_model("structures", source_key, model.core.structure.Structure)
 
     def get_structure_latest_versions(self, source_key):
         return self._get_item_latest_versions("structures", source_key)
@@ -270,10 +920,20 @@ class GroundClient:
     def get_structure_history(self, source_key):
         return self._get_item_history("structures", source_key)
 
+    def get_structure_history_dag(self, source_key):
+        return self._get_item_history_dag("structures", source_key, model.core.structure.Structure)
+
+    def iter_structure_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("structures", source_key)
+
+    def iter_structure_history(self, source_key):
+        return self._iter_item_history("structures", source_key)
+
     def get_structure_version(self, id):
-        response = self._get_version("structures", id)
-        if response is not None:
-            return model.core.structure_version.StructureVersion(response)
+        return self._get_version_model("structures", id, model.core.structure_version.StructureVersion)
+
+    def get_structure_versions(self, ids, deadline=None):
+        return self._get_version_models("structures", ids, model.core.structure_version.StructureVersion, deadline)
 
     '''
     LINEAGE EDGE METHODS
@@ -281,8 +941,12 @@ class GroundClient:
 
     def create_lineage_edge(self, source_key, name, tags=None):
         response = self._create_item("lineage_edges", source_key, name, tags)
-        if response is not None:
-            return model.usage.lineage_edge.LineageEdge(response)
+        lineage_edge = self._to_model(model.usage.lineage_edge.LineageEdge, response, "/lineage_edges")
+        return self._cache_item("lineage_edges", lineage_edge)
+
+    def get_or_create_lineage_edge(self, source_key, name, tags=None):
+        return self._get_or_create_item("lineage_edges", source_key, model.usage.lineage_edge.LineageEdge,
+                                        lambda: self.create_lineage_edge(source_key, name, tags))
 
     def create_lineage_edge_version(self,
                                     edge_id,
@@ -294,21 +958,13 @@ class GroundClient:
                                     structure_version_id=-1,
                                     parent_ids=None):
 
-        endpoint = "/versions/lineage_edges"
-        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
-
-        body["lineageEdgeId"] = edge_id
-        body["toRichVersionId"] = to_rich_version_id
-        body["fromRichVersionId"] = from_rich_version_id
+        body = self._get_lineage_edge_version_json(edge_id, to_rich_version_id, from_rich_version_id, reference,
+                                                   reference_parameters, tags, structure_version_id, parent_ids)
 
-        response = self._make_post_request(endpoint, body)
-        if response is not None:
-            return model.usage.lineage_edge_version.LineageEdgeVersion(response)
+        return self._create_version("lineage_edges", edge_id, body, model.usage.lineage_edge_version.LineageEdgeVersion)
 
     def get_lineage_edge(self, source_key):
-        response = self._get_item("lineage_edges", source_key)
-        if response is not None:
-            return model.usage.lineage_edge.LineageEdge(response)
+        return self._get_item_model("lineage_edges", source_key, model.usage.lineage_edge.LineageEdge)
 
     def get_lineage_edge_latest_versions(self, source_key):
         return self._get_item_latest_versions("lineage_edges", source_key)
@@ -316,10 +972,21 @@ class GroundClient:
     def get_lineage_edge_history(self, source_key):
         return self._get_item_history("lineage_edges", source_key)
 
+    def get_lineage_edge_history_dag(self, source_key):
+        return self._get_item_history_dag("lineage_edges", source_key, model.usage.lineage_edge.LineageEdge)
+
+    def iter_lineage_edge_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("lineage_edges", source_key)
+
+    def iter_lineage_edge_history(self, source_key):
+        return self._iter_item_history("lineage_edges", source_key)
+
     def get_lineage_edge_version(self, id):
-        response = self._get_version("lineage_edges", id)
-        if response is not None:
-            return model.usage.lineage_edge_version.LineageEdgeVersion(response)
+        return self._get_version_model("lineage_edges", id, model.usage.lineage_edge_version.LineageEdgeVersion)
+
+    def get_lineage_edge_versions(self, ids, deadline=None):
+        model_class = model.usage.lineage_edge_version.LineageEdgeVersion
+        return self._get_version_models("lineage_edges", ids, model_class, deadline)
 
     '''
     LINEAGE GRAPH METHODS
@@ -327,8 +994,12 @@ class GroundClient:
 
     def create_lineage_graph(self, source_key, name, tags=None):
         response = self._create_item("lineage_graphs", source_key, name, tags)
-        if response is not None:
-            return model.usage.lineage_graph.LineageGraph(response)
+        lineage_graph = self._to_model(model.usage.lineage_graph.LineageGraph, response, "/lineage_graphs")
+        return self._cache_item("lineage_graphs", lineage_graph)
+
+    def get_or_create_lineage_graph(self, source_key, name, tags=None):
+        return self._get_or_create_item("lineage_graphs", source_key, model.usage.lineage_graph.LineageGraph,
+                                        lambda: self.create_lineage_graph(source_key, name, tags))
 
     def create_lineage_graph_version(self,
                                      lineage_graph_id,
@@ -339,20 +1010,14 @@ class GroundClient:
                                      structure_version_id=-1,
                                      parent_ids=None):
 
-        endpoint = "/versions/lineage_graphs"
-        body = self._get_rich_version_json(reference, reference_parameters, tags, structure_version_id, parent_ids)
-
-        body["lineageGraphId"] = lineage_graph_id
-        body["lineageEdgeVersionIds"] = lineage_edge_version_ids
+        body = self._get_lineage_graph_version_json(lineage_graph_id, lineage_edge_version_ids, reference,
+                                                    reference_parameters, tags, structure_version_id, parent_ids)
 
-        response = self._make_post_request(endpoint, body)
-        if response is not None:
-            return model.usage.lineage_graph_version.LineageGraphVersion(response)
+        model_class = model.usage.lineage_graph_version.LineageGraphVersion
+        return self._create_version("lineage_graphs", lineage_graph_id, body, model_class)
 
     def get_lineage_graph(self, source_key):
-        response = self._get_item("lineage_graphs", source_key)
-        if response is not None:
-            return model.usage.lineage_graph.LineageGraph(response)
+        return self._get_item_model("lineage_graphs", source_key, model.usage.lineage_graph.LineageGraph)
 
     def get_lineage_graph_latest_versions(self, source_key):
         return self._get_item_latest_versions("lineage_graphs", source_key)
@@ -360,7 +1025,78 @@ class GroundClient:
     def get_lineage_graph_history(self, source_key):
         return self._get_item_history("lineage_graphs", source_key)
 
+    def get_lineage_graph_history_dag(self, source_key):
+        return self._get_item_history_dag("lineage_graphs", source_key, model.usage.lineage_graph.LineageGraph)
+
+    def iter_lineage_graph_latest_versions(self, source_key):
+        return self._iter_item_latest_versions("lineage_graphs", source_key)
+
+    def iter_lineage_graph_history(self, source_key):
+        return self._iter_item_history("lineage_graphs", source_key)
+
     def get_lineage_graph_version(self, id):
-        response = self._get_version("lineage_graphs", id)
-        if response is not None:
-            return model.usage.lineage_graph_version.LineageGraphVersion(response)
+        return self._get_version_model("lineage_graphs", id, model.usage.lineage_graph_version.LineageGraphVersion)
+
+    def get_lineage_graph_versions(self, ids, deadline=None):
+        model_class = model.usage.lineage_graph_version.LineageGraphVersion
+        return self._get_version_models("lineage_graphs", ids, model_class, deadline)
+
+    '''
+    BULK METHODS
+
+    Each takes a list of calls to the matching create_* method, given either as a
+    dict of keyword arguments or a tuple of positional arguments, runs them on the
+    client's worker pool and returns a BatchResult in input order.
+    '''
+
+    def create_edges(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_edge, items)
+
+    def create_edge_versions(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_edge_version, items)
+
+    def create_graphs(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_graph, items)
+
+    def create_graph_versions(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_graph_version, items)
+
+    def create_nodes(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_node, items)
+
+    def create_node_versions(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_node_version, items)
+
+    def create_structures(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_structure, items)
+
+    def create_structure_versions(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_structure_version, items)
+
+    def create_lineage_edges(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_lineage_edge, items)
+
+    def create_lineage_edge_versions(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_lineage_edge_version, items)
+
+    def create_lineage_graphs(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_lineage_graph, items)
+
+    def create_lineage_graph_versions(self, items, deadline=None):
+        with deadline_scope(deadline):
+            return run_batch(self._get_executor(), self.create_lineage_graph_version, items)
+
+    def load_graph(self, description, deadline=None):
+        with deadline_scope(deadline):
+            return GraphLoader(self).load(description)
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+from ground.deadline import DeadlineExceeded, get_remaining
+
+
+def _is_abandoned(error):
+    # failures that belong to the caller running the call rather than to the call
+    # itself: its deadline passing, or it being cancelled or interrupted
+    return isinstance(error, DeadlineExceeded) or not isinstance(error, Exception)
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+
+
+class SingleFlight:
+    '''
+    Collapses concurrent calls with the same key into one: the first caller runs
+    the function, and everyone who asks for the same key while it is running
+    waits for it and gets its result (or its exception). If the first caller
+    gives up on it, e.g. because its own deadline passed, one of the waiters
+    runs the function again instead.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._shared = 0
+
+    def do(self, key, function):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    self._shared += 1
+
+            if leader:
+                break
+
+            # waiters give up at their own deadline, whatever the caller running it has
+            if not call.done.wait(get_remaining()):
+                raise DeadlineExceeded("The deadline passed while waiting for a coalesced call.")
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            if _is_abandoned(e):
+                call.abandoned = True
+            else:
+                call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_shared_count(self):
+        return self._shared
+
+
+class AsyncSingleFlight:
+    '''
+    The asyncio version of SingleFlight, for calls made from one event loop. The
+    call runs as a task of its own, so cancelling any one caller, the first
+    included, never cancels it for the rest. The task runs under the first
+    caller's deadline; if that passes, the others run the call again under
+    their own.
+    '''
+
+    def __init__(self):
+        self._calls = {}
+        self._shared = 0
+
+    async def do(self, key, function):
+        while True:
+            task = self._calls.get(key)
+            leader = task is None
+            if leader:
+                task = self._start(key, function)
+            else:
+                self._shared += 1
+
+            try:
+                return await asyncio.shield(task)
+            except BaseException as e:
+                # only a call given up on by another caller is run again; this
+                # caller being cancelled leaves the task running
+                if leader or not task.done() or not _is_abandoned(e):
+                    raise
+
+    def _start(self, key, function):
+        task = self._calls[key] = asyncio.ensure_future(function())
+        task.add_done_callback(lambda _: self._finish(key, task))
+        return task
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # retrieve the exception so a call whose callers were all cancelled does not
+        # log a warning
+        if not task.cancelled():
+            task.exception()
+
+    def get_shared_count(self):
+        return self._shared
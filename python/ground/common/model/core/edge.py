@@ -3,6 +3,8 @@ from ground.common.model.version.item import Item
 
 class Edge(Item):
 
+    __slots__ = ('_name', '_from_node_id', '_to_node_id', '_source_key')
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
         self._name = json_payload.get('name', '')
@@ -42,3 +44,5 @@ class Edge(Item):
             and self._to_node_id == other._to_node_id
             and self.get_tags() == other.get_tags()
         )
+
+    __hash__ = Item.__hash__
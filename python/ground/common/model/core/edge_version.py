@@ -3,6 +3,14 @@ from ground.common.model.core.rich_version import RichVersion
 
 class EdgeVersion(RichVersion):
 
+    __slots__ = (
+        '_edge_id',
+        '_from_node_version_start_id',
+        '_from_node_version_end_id',
+        '_to_node_version_start_id',
+        '_to_node_version_end_id',
+    )
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
 
@@ -68,3 +76,5 @@ class EdgeVersion(RichVersion):
             and self._to_node_version_end_id == other._to_node_version_end_id
             and self.get_id() == other.get_id()
             and super().__eq__(other))
+
+    __hash__ = RichVersion.__hash__
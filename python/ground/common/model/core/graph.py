@@ -3,6 +3,8 @@ from ground.common.model.version.item import Item
 
 class Graph(Item):
 
+    __slots__ = ('_name', '_source_key')
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
 
@@ -33,5 +35,7 @@ class Graph(Item):
             and self.get_name() == other.get_name()
             and self.get_source_key() == other.get_source_key()
             and self.get_item_id() == other._id
-            and self.get_tags() == other._tags
+            and self.get_tags() == other.get_tags()
         )
+
+    __hash__ = Item.__hash__
@@ -3,6 +3,8 @@ from ground.common.model.core.rich_version import RichVersion
 
 class GraphVersion(RichVersion):
 
+    __slots__ = ('_graph_id', '_edge_version_ids')
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
 
@@ -40,3 +42,5 @@ class GraphVersion(RichVersion):
             and self.get_edge_version_ids() == other.get_edge_version_ids()
             and super().__eq__(other)
         )
+
+    __hash__ = RichVersion.__hash__
@@ -3,6 +3,8 @@ from ground.common.model.core.rich_version import RichVersion
 
 class NodeVersion(RichVersion):
 
+    __slots__ = ('_node_id',)
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
 
@@ -34,3 +36,5 @@ class NodeVersion(RichVersion):
             and self._node_id == other._node_id
             and super().__eq__(other)
         )
+
+    __hash__ = RichVersion.__hash__
@@ -1,12 +1,14 @@
-from ground.common.model.version.version import Version
+from ground.common.model.version.version import EMPTY_MAP, Version
 
 
 class RichVersion(Version):
 
+    __slots__ = ('_tags', '_structure_version_id', '_reference', '_parameters')
+
     def __init__(self, json_payload):
         super().__init__(json_payload['id'])
 
-        self._tags = json_payload.get('tags', {}) or {}
+        self._tags = json_payload.get('tags') or EMPTY_MAP
 
         svid = json_payload.get('structureVersionId')
         if svid is None or svid <= 0:
@@ -20,7 +22,7 @@ class RichVersion(Version):
         else:
             self._reference = reference
 
-        self._parameters = json_payload.get('referenceParameters', {}) or {}
+        self._parameters = json_payload.get('referenceParameters') or EMPTY_MAP
 
 
     @classmethod
@@ -34,7 +36,7 @@ class RichVersion(Version):
         })
 
     def get_tags(self):
-        return self._tags
+        return self._tags or {}
 
     def get_structure_version_id(self):
         return self._structure_version_id
@@ -43,7 +45,7 @@ class RichVersion(Version):
         return self._reference
 
     def get_parameters(self):
-        return self._parameters
+        return self._parameters or {}
 
     def __eq__(self, other):
         return (
@@ -54,3 +56,5 @@ class RichVersion(Version):
             and self._reference == other._reference
             and self._parameters == other._parameters
         )
+
+    __hash__ = Version.__hash__
@@ -1,13 +1,15 @@
-from ground.common.model.version.version import Version
+from ground.common.model.version.version import EMPTY_MAP, Version
 
 
 class StructureVersion(Version):
 
+    __slots__ = ('_structure_id', '_attributes')
+
     def __init__(self, json_payload):
         super(StructureVersion, self).__init__(json_payload['id'])
 
         self._structure_id = json_payload.get('structureId')
-        self._attributes = json_payload.get('attributes') or {}
+        self._attributes = json_payload.get('attributes') or EMPTY_MAP
 
     @classmethod
     def from_structure_version(cls, _id, other_structure_version):
@@ -30,7 +32,7 @@ class StructureVersion(Version):
         return self._structure_id
 
     def get_attributes(self):
-        return self._attributes
+        return self._attributes or {}
 
     def __eq__(self, other):
         return (
@@ -39,3 +41,5 @@ class StructureVersion(Version):
             and self.get_attributes() == other.get_attributes()
             and self.get_id() == other.get_id()
         )
+
+    __hash__ = Version.__hash__
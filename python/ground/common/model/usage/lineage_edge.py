@@ -3,6 +3,8 @@ from ground.common.model.version.item import Item
 
 class LineageEdge(Item):
 
+    __slots__ = ('_name', '_source_key')
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
         self._name = json_payload.get('name', '')
@@ -31,3 +33,5 @@ class LineageEdge(Item):
             and self.get_source_key() == other.get_source_key()
             and self.get_tags() == other.get_tags()
         )
+
+    __hash__ = Item.__hash__
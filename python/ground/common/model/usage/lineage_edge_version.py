@@ -3,11 +3,14 @@ from ground.common.model.core.rich_version import RichVersion
 
 class LineageEdgeVersion(RichVersion):
 
+    __slots__ = ('_lineage_edge_id', '_from_id', '_to_id')
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
         self._lineage_edge_id = json_payload.get('lineageEdgeId', 0)
-        self._from_id = json_payload.get('fromId', 0)
-        self._to_id = json_payload.get('toId', 0)
+        # the server writes these as fromRichVersionId/toRichVersionId
+        self._from_id = json_payload.get('fromId', json_payload.get('fromRichVersionId', 0))
+        self._to_id = json_payload.get('toId', json_payload.get('toRichVersionId', 0))
 
     @classmethod
     def from_lineage_version(cls, _id, other_lineage_version):
@@ -46,3 +49,5 @@ class LineageEdgeVersion(RichVersion):
             and self.get_id() == other.get_id()
             and super().__eq__(other)
         )
+
+    __hash__ = RichVersion.__hash__
@@ -3,6 +3,8 @@ from ground.common.model.core.rich_version import RichVersion
 
 class LineageGraphVersion(RichVersion):
 
+    __slots__ = ('_lineage_graph_id', '_lineage_edge_version_ids')
+
     def __init__(self, json_payload):
         super().__init__(json_payload)
         self._lineage_graph_id = json_payload.get('lineageGraphId', 0)
@@ -40,3 +42,5 @@ class LineageGraphVersion(RichVersion):
             and self._lineage_edge_version_ids == other._lineage_edge_version_ids
             and super().__eq__(other)
         )
+
+    __hash__ = RichVersion.__hash__
@@ -1,17 +1,26 @@
-from ground.common.model.version.tag import Tag
+from ground.common.model.version.tag import decode_tags
+from ground.common.model.version.version import EMPTY_MAP
 
 class Item:
 
+    __slots__ = ('_id', '_tags', '_tags_decoded')
+
     def __init__(self, json_payload):
         self._id   = json_payload.get('id') or 0
-        self._tags = json_payload.get('tags') or {}
 
-        for key, value in list(self._tags.items()):
-            if not isinstance(value, Tag):
-                self._tags[key] = Tag(value)
+        # kept as the raw payload until get_tags is first called
+        self._tags = json_payload.get('tags') or EMPTY_MAP
+        self._tags_decoded = False
 
     def get_id(self):
         return self._id
 
     def get_tags(self):
-        return self._tags
+        # a racing caller decodes the already decoded Tags again, which is harmless
+        if not self._tags_decoded:
+            self._tags = decode_tags(self._tags)
+            self._tags_decoded = True
+        return self._tags or {}
+
+    def __hash__(self):
+        return hash(self._id)
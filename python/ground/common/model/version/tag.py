@@ -1,5 +1,18 @@
+from ground.common.model.version.version import EMPTY_MAP
+
+
+def decode_tags(json_tags):
+    # tag payloads keyed by tag key -> Tags keyed the same way; Tags passed in are
+    # kept as they are, and json_tags itself is never changed
+    if not json_tags:
+        return EMPTY_MAP
+    return {key: value if isinstance(value, Tag) else Tag(value) for key, value in json_tags.items()}
+
+
 class Tag:
 
+    __slots__ = ('_id', '_key', '_val')
+
     def __init__(self, json_payload):
         self._id  = json_payload.get('id')
         self._key = json_payload.get('key')
@@ -14,6 +27,9 @@ class Tag:
     def get_value(self):
         return self._val
 
+    def __hash__(self):
+        return hash((self._id, self._key))
+
     def __eq__(self, other):
         return (
             isinstance(other, Tag)
@@ -1,7 +1,21 @@
+import types
+
+
+# shared by every model whose tags, parameters or attributes are empty, instead of a
+# new dict each; getters hand out a plain {} in its place, so what they return can
+# still be serialized or changed like any dict
+EMPTY_MAP = types.MappingProxyType({})
+
+
 class Version:
 
+    __slots__ = ('_id',)
+
     def __init__(self, id):
         self._id = id
 
     def get_id(self):
         return self._id
+
+    def __hash__(self):
+        return hash(self._id)
@@ -1,11 +1,25 @@
+import collections
+
+
 class VersionHistoryDag:
+    '''
+    The version history of one item. Parent -> children and child -> parents
+    adjacency are both indexed, and the set of leaves (versions with no children)
+    is kept up to date as edges are added, so parent, child and leaf lookups are
+    O(1) and ancestor/descendant walks are linear in what they return.
+    '''
 
     def __init__(self, item_id, edges):
         self._item_id = item_id
-        self._edge_ids = [edge.get_id() for edge in edges]
+        self._edge_ids = []
+
+        # dicts with None values, used as insertion-ordered sets
         self._parent_child_map = {}
+        self._child_parent_map = {}
+        self._leaves = {}
+
         for edge in edges:
-            self.add_to_parent_child_map(edge.get_from_id(), edge.get_to_id())
+            self.add_edge(edge.get_from_id(), edge.get_to_id(), edge.get_id())
 
     def get_item_id(self):
         return self._item_id
@@ -14,27 +28,95 @@ class VersionHistoryDag:
         return self._edge_ids
 
     def check_item_in_dag(self, id):
-        return id in self._parent_child_map or id in self.get_leaves()
+        return id in self._parent_child_map or id in self._child_parent_map
 
     def add_edge(self, parent_id, child_id, successor_id):
-        self._edge_ids.add(successor_id)
+        self._edge_ids.append(successor_id)
         self.add_to_parent_child_map(parent_id, child_id)
 
     def get_parent(self, child_id):
-        return [key for key in self._parent_child_map if child_id in self._parent_child_map[key]]
+        return list(self._child_parent_map.get(child_id, ()))
+
+    def get_children(self, parent_id):
+        return list(self._parent_child_map.get(parent_id, ()))
 
     def get_parent_child_pairs(self):
-        result = {}
-        for parent in self._parent_child_map.keys():
-            children = self._parent_child_map[parent]
-            for child in children:
-                result[parent] = child
-        return result
+        return {parent: list(children) for parent, children in self._parent_child_map.items() if children}
 
     def get_leaves(self):
-        return set(self._parent_child_map.values()) - set(self._parent_child_map.keys())
+        return set(self._leaves)
+
+    def get_ancestors(self, id):
+        return self._walk(id, self._child_parent_map)
+
+    def get_descendants(self, id):
+        return self._walk(id, self._parent_child_map)
+
+    def get_latest_versions(self):
+        return [id for id in self._parent_child_map if id in self._leaves]
+
+    def get_topological_order(self):
+        # parents always come before their children; ties keep insertion order
+        in_degrees = {id: len(parents) for id, parents in self._child_parent_map.items()}
+        queue = collections.deque(id for id, in_degree in in_degrees.items() if in_degree == 0)
+        order = []
+        while queue:
+            id = queue.popleft()
+            order.append(id)
+            for child_id in self._parent_child_map[id]:
+                in_degrees[child_id] -= 1
+                if in_degrees[child_id] == 0:
+                    queue.append(child_id)
+        return order
+
+    def get_lowest_common_ancestor(self, id, other_id):
+        '''
+        Returns a common ancestor of both versions (either one counts as its own
+        ancestor) that has no descendant which is also a common ancestor, or None if
+        they share no history. When merges leave several, the one nearest to other_id
+        is returned.
+        '''
+        if not self.check_item_in_dag(id) or not self.check_item_in_dag(other_id):
+            return None
+
+        ancestors = set(self.get_ancestors(id))
+        ancestors.add(id)
+        common = [ancestor for ancestor in [other_id] + self.get_ancestors(other_id) if ancestor in ancestors]
+        common_set = set(common)
+        for ancestor in common:
+            if not any(child_id in common_set for child_id in self._parent_child_map[ancestor]):
+                return ancestor
+        return None
+
+    def get_versions_between(self, from_id, to_id):
+        # the versions after from_id up to and including to_id, in topological order
+        descendants = set(self.get_descendants(from_id))
+        if to_id not in descendants:
+            return []
+
+        between = descendants.intersection(self.get_ancestors(to_id))
+        between.add(to_id)
+        return [id for id in self.get_topological_order() if id in between]
 
     def add_to_parent_child_map(self, parent, child):
-        if parent not in self._parent_child_map:
-            self._parent_child_map[parent] = []
-        self._parent_child_map[parent].append(child)
+        self._parent_child_map.setdefault(parent, {})[child] = None
+        self._parent_child_map.setdefault(child, {})
+        self._child_parent_map.setdefault(child, {})[parent] = None
+        self._child_parent_map.setdefault(parent, {})
+
+        self._leaves.pop(parent, None)
+        if not self._parent_child_map[child]:
+            self._leaves[child] = None
+
+    def _walk(self, id, adjacency):
+        # breadth-first, nearest first, not including id itself
+        seen = {id}
+        result = []
+        queue = collections.deque([id])
+        while queue:
+            for next_id in adjacency.get(queue.popleft(), ()):
+                if next_id not in seen:
+                    seen.add(next_id)
+                    result.append(next_id)
+                    queue.append(next_id)
+        return result
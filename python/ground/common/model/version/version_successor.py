@@ -1,5 +1,7 @@
 class VersionSuccessor:
 
+    __slots__ = ('_id', '_from_id', '_to_id')
+
     def __init__(self, id, from_id, to_id):
         self._id = id
         self._from_id = from_id
@@ -0,0 +1,117 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import time
+
+
+_current = contextvars.ContextVar("ground_deadline", default=None)
+
+
+class DeadlineExceeded(RuntimeError):
+    '''
+    Raised when an operation runs out of the time its deadline allowed.
+    '''
+
+
+class Deadline:
+    '''
+    A point in time, timeout seconds after creation, by which an operation has to
+    be done. While one is in effect (see deadline_scope), every request the client
+    sends is given at most the time remaining, and none is started once it has
+    passed.
+    '''
+
+    def __init__(self, timeout, clock=time.monotonic):
+        self._clock = clock
+        self._expires_at = clock() + timeout
+
+    def get_expires_at(self):
+        return self._expires_at
+
+    def get_remaining(self):
+        return max(0.0, self._expires_at - self._clock())
+
+    def is_expired(self):
+        return self._clock() >= self._expires_at
+
+    def check(self):
+        if self.is_expired():
+            raise DeadlineExceeded("The deadline for this operation has passed.")
+
+
+def start_deadline(timeout):
+    # a Deadline timeout seconds from now, or None if timeout is None
+    if timeout is not None:
+        return Deadline(timeout)
+
+
+def get_deadline():
+    return _current.get()
+
+
+def get_remaining():
+    # seconds left before the deadline in effect, or None if there is none
+    deadline = _current.get()
+    if deadline is not None:
+        return deadline.get_remaining()
+
+
+def check_deadline():
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+@contextlib.contextmanager
+def use_deadline(deadline):
+    '''
+    Puts deadline in effect for the enclosed code, unless one that expires sooner
+    already is. Yields the deadline in effect, which may be None.
+    '''
+    current = _current.get()
+    if deadline is None or (current is not None and current.get_expires_at() <= deadline.get_expires_at()):
+        yield current
+        return
+
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def deadline_scope(timeout):
+    # a new deadline timeout seconds from now, or no change if timeout is None
+    with use_deadline(start_deadline(timeout)) as deadline:
+        yield deadline
+
+
+async def wait_within(deadline, awaitable):
+    '''
+    Awaits awaitable with deadline in effect, cancelling it and raising
+    DeadlineExceeded if the deadline passes first. Tasks only see the deadline if
+    they are started from within, so awaitable should be a coroutine that starts
+    them (e.g. one awaiting asyncio.gather), not a gather or task made outside.
+    '''
+    with use_deadline(deadline) as deadline:
+        if deadline is None:
+            return await awaitable
+
+        try:
+            return await asyncio.wait_for(awaitable, deadline.get_remaining())
+        except asyncio.TimeoutError:
+            if deadline.is_expired():
+                raise DeadlineExceeded("The deadline for this operation has passed.")
+            raise
+
+
+class ContextThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    '''
+    A ThreadPoolExecutor that runs each task in a copy of the submitting thread's
+    context, so the deadline in effect there also applies in the worker.
+    '''
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
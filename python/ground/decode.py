@@ -0,0 +1,38 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def get_backend():
+    return "orjson" if orjson is not None else "json"
+
+
+def loads(content):
+    # orjson takes the response bytes as they are and raises a ValueError subclass
+    # on bad input, just like json
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def to_model(model_class, json_payload, tags=True):
+    '''
+    Builds model_class from a decoded payload. With tags=False the payload's tags
+    are dropped before the model sees them, so the model does not keep them; the
+    payload is changed in place, which is fine for one freshly decoded from a
+    response.
+    '''
+    if not tags:
+        json_payload.pop('tags', None)
+    return model_class(json_payload)
+
+
+def decode(model_class, content, tags=True):
+    # response bytes holding one payload or a list of them -> model(s)
+    json_payload = loads(content)
+    if isinstance(json_payload, list):
+        return [to_model(model_class, item, tags) for item in json_payload]
+    return to_model(model_class, json_payload, tags)
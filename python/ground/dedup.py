@@ -0,0 +1,48 @@
+import hashlib
+import json
+
+from ground.history import iter_version_successors
+
+
+# fields that say where a version sits or which version it is, not what it holds
+_POSITION_FIELDS = ("id", "parentIds")
+
+
+def get_content_hash(payload):
+    '''
+    Returns a hash of what a version holds, from either the body it is created
+    with or the payload the server returns for it. Ids and parents are left out,
+    as are unset fields (None, -1 or empty), which the server may send back
+    with defaults, and the ids the server gives tags.
+    '''
+    content = {}
+    for key, value in payload.items():
+        if key in _POSITION_FIELDS or value is None or value == -1 or value == {} or value == []:
+            continue
+        if key == "tags":
+            value = {tag_key: [tag.get("value"), tag.get("type")] for tag_key, tag in value.items()}
+        content[key] = value
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_duplicate_candidates(history, parent_ids):
+    '''
+    Returns the ids of the latest versions in an item's history (a get_*_history
+    response) that a new version with parent_ids would duplicate if it held the
+    same content: the one version it would follow, without parents the item's
+    only latest version, and any latest version that already follows exactly
+    parent_ids.
+    '''
+    parents = {}
+    for successor in iter_version_successors(history):
+        parents.setdefault(successor.get_to_id(), set()).add(successor.get_from_id())
+    followed = set().union(*parents.values())
+    latest = [id for id in parents if id not in followed]
+
+    candidates = []
+    following = parent_ids or latest
+    if len(following) == 1 and following[0] in latest:
+        candidates.append(following[0])
+    if parent_ids:
+        candidates.extend(id for id in latest if parents[id] == set(parent_ids) and id not in candidates)
+    return candidates
@@ -0,0 +1,150 @@
+import array
+
+from ground.common.model.core.edge_version import EdgeVersion
+
+
+COLUMNS = (
+    "id",
+    "edge_id",
+    "from_node_version_start_id",
+    "from_node_version_end_id",
+    "to_node_version_start_id",
+    "to_node_version_end_id",
+)
+
+_JSON_KEYS = {
+    "id": "id",
+    "edge_id": "edgeId",
+    "from_node_version_start_id": "fromNodeVersionStartId",
+    "from_node_version_end_id": "fromNodeVersionEndId",
+    "to_node_version_start_id": "toNodeVersionStartId",
+    "to_node_version_end_id": "toNodeVersionEndId",
+}
+
+
+def _get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class EdgeVersionTable:
+    '''
+    The ids of many edge versions stored column by column, one array('q') per
+    entry of COLUMNS, so a large graph costs 48 bytes per edge version instead of
+    a whole EdgeVersion object each.
+
+    Only ids are kept; tags, references and parameters are dropped. Indexing or
+    iterating builds EdgeVersion objects on the fly, one row at a time. Filters
+    run over whole columns, with NumPy when it is installed, and to_numpy() hands
+    out the columns as arrays that share memory with the table.
+    '''
+
+    def __init__(self):
+        self._columns = {name: array.array('q') for name in COLUMNS}
+
+    @classmethod
+    def from_edge_versions(cls, edge_versions):
+        table = cls()
+        for edge_version in edge_versions:
+            table.append(edge_version)
+        return table
+
+    @classmethod
+    def from_json(cls, json_payloads):
+        table = cls()
+        for json_payload in json_payloads:
+            table.append_json(json_payload)
+        return table
+
+    def append(self, edge_version):
+        self._append_row((
+            edge_version.get_id(),
+            edge_version.get_edge_id(),
+            edge_version.get_from_node_version_start_id(),
+            edge_version.get_from_node_version_end_id(),
+            edge_version.get_to_node_version_start_id(),
+            edge_version.get_to_node_version_end_id(),
+        ))
+
+    def append_json(self, json_payload):
+        # the same defaults as EdgeVersion, without building one
+        row = [json_payload.get(_JSON_KEYS[name]) or 0 for name in COLUMNS]
+        for end_index in (3, 5):
+            if row[end_index] <= 0:
+                row[end_index] = -1
+        self._append_row(row)
+
+    def _append_row(self, row):
+        for name, value in zip(COLUMNS, row):
+            self._columns[name].append(value or 0)
+
+    def get_column(self, name):
+        # the table's own array; changing it changes the table
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self._columns["id"])
+
+    def __getitem__(self, index):
+        return EdgeVersion({_JSON_KEYS[name]: self._columns[name][index] for name in COLUMNS})
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, indices):
+        table = EdgeVersionTable()
+        for name in COLUMNS:
+            column = self._columns[name]
+            table._columns[name] = array.array('q', [column[index] for index in indices])
+        return table
+
+    def get_touching_indices(self, node_version_ids, outgoing=True, incoming=True):
+        '''
+        Returns the row indices, in order, of the edge versions that start at
+        (outgoing) or end at (incoming) any of node_version_ids.
+        '''
+        numpy = _get_numpy()
+        if numpy is not None:
+            ids = numpy.fromiter(node_version_ids, dtype=numpy.int64)
+            columns = self.to_numpy()
+            mask = numpy.zeros(len(self), dtype=bool)
+            if outgoing:
+                mask |= numpy.isin(columns["from_node_version_start_id"], ids)
+            if incoming:
+                mask |= numpy.isin(columns["to_node_version_start_id"], ids)
+            return numpy.flatnonzero(mask).tolist()
+
+        ids = set(node_version_ids)
+        from_ids = self._columns["from_node_version_start_id"]
+        to_ids = self._columns["to_node_version_start_id"]
+        return [index for index in range(len(self))
+                if (outgoing and from_ids[index] in ids) or (incoming and to_ids[index] in ids)]
+
+    def filter_touching(self, node_version_ids, outgoing=True, incoming=True):
+        return self.take(self.get_touching_indices(node_version_ids, outgoing, incoming))
+
+    def get_adjacency_index(self, outgoing=True):
+        '''
+        Returns a dict of node version id -> array('q') of the row indices of its
+        outgoing edge versions, or its incoming ones if outgoing is False.
+        '''
+        column = self._columns["from_node_version_start_id" if outgoing else "to_node_version_start_id"]
+        index = {}
+        for row, node_version_id in enumerate(column):
+            if node_version_id not in index:
+                index[node_version_id] = array.array('q')
+            index[node_version_id].append(row)
+        return index
+
+    def to_numpy(self):
+        numpy = _get_numpy()
+        if numpy is None:
+            raise ImportError("EdgeVersionTable.to_numpy requires numpy: pip install ground-client[numpy]")
+
+        # frombuffer shares the arrays' memory; while any of these are alive, appending
+        # to the table raises BufferError rather than moving the memory under them
+        return {name: numpy.frombuffer(self._columns[name], dtype=numpy.int64) for name in COLUMNS}
@@ -0,0 +1,37 @@
+from ground.common.model.version.version_history_dag import VersionHistoryDag
+from ground.common.model.version.version_successor import VersionSuccessor
+
+
+def iter_version_successors(history):
+    '''
+    Generates a VersionSuccessor for every parent -> child pair in a get_*_history
+    response. The server sends either a dict of parent id -> child id (or list of
+    child ids), where the first version's parent is 0, or a list of successor
+    objects; only the latter carries successor ids.
+    '''
+    if isinstance(history, dict):
+        history = history.items()
+    return iter_entry_successors(history or [])
+
+
+def iter_entry_successors(entries):
+    # entries are (parent id, child id(s)) pairs or successor objects, as generated
+    # from either shape of response by JsonStreamParser
+    for entry in entries:
+        if isinstance(entry, tuple):
+            parent_id, child_ids = entry
+            if not isinstance(child_ids, list):
+                child_ids = [child_ids]
+            for child_id in child_ids:
+                yield VersionSuccessor(None, int(parent_id), int(child_id))
+        else:
+            yield VersionSuccessor(entry.get("id"), entry["fromId"], entry["toId"])
+
+
+def build_version_history_dag(item_id, successors):
+    # successors are added one at a time as they are generated, so the response is
+    # never copied into an intermediate list
+    dag = VersionHistoryDag(item_id, [])
+    for successor in successors:
+        dag.add_edge(successor.get_from_id(), successor.get_to_id(), successor.get_id())
+    return dag
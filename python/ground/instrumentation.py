@@ -0,0 +1,364 @@
+import math
+import threading
+import time
+
+
+def get_endpoint_template(endpoint):
+    '''
+    Returns endpoint with its variable parts replaced by placeholders, e.g.
+    /versions/nodes/12 -> /versions/{type}/{id}, so that timings for every item
+    type, id and source key of one endpoint are kept together.
+    '''
+    parts = endpoint.strip("/").split("/")
+    if parts[0] == "versions":
+        if len(parts) == 2:
+            return "/versions/{type}"
+        if parts[2:4] == ["adjacent", "lineage"]:
+            return "/versions/nodes/adjacent/lineage/{id}"
+        return "/versions/{type}/{id}"
+
+    if len(parts) == 1:
+        return "/{type}"
+    if len(parts) > 2 and parts[-1] in ("latest", "history"):
+        return "/{type}/{source_key}/" + parts[-1]
+    return "/{type}/{source_key}"
+
+
+class RequestEvent:
+    '''
+    One request as seen by request hooks. Before hooks only get method, endpoint
+    and template; after hooks also get the status code (None if no response came
+    back), the size of the response body in bytes, the seconds spent sending the
+    request and reading the response (network_time, retries included) and
+    decoding it (decode_time), and the exception that ended it, if any.
+    '''
+
+    __slots__ = ["method", "endpoint", "template", "status_code", "bytes", "network_time", "decode_time", "error"]
+
+    def __init__(self, method, endpoint):
+        self.method = method
+        self.endpoint = endpoint
+        self.template = get_endpoint_template(endpoint)
+        self.status_code = None
+        self.bytes = 0
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.error = None
+
+    def get_total_time(self):
+        return self.network_time + self.decode_time
+
+
+class ModelEvent:
+    '''
+    One model built from a response, as seen by model hooks: the model class, the
+    template of the endpoint the response came from (None if unknown), the
+    seconds it took (model_time) and the exception that ended it, if any.
+    '''
+
+    __slots__ = ["model_class", "template", "model_time", "error"]
+
+    def __init__(self, model_class, template):
+        self.model_class = model_class
+        self.template = template
+        self.model_time = 0.0
+        self.error = None
+
+
+class _NullTimer:
+    # what the client times requests with when it is not instrumented
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def received(self, status_code, size=0):
+        pass
+
+    def iter_chunks(self, chunks):
+        return chunks
+
+    def decode(self, function, *args):
+        return function(*args)
+
+
+NULL_TIMER = _NullTimer()
+
+
+class RequestTimer(_NullTimer):
+    '''
+    Times one request for Instrumentation. Everything up to received() counts as
+    network time; after that, only the reads of a streamed body (iter_chunks)
+    count as network time and only calls made through decode() as decode time,
+    so time spent by whoever consumes a stream is not counted at all.
+    '''
+
+    def __init__(self, instrumentation, method, endpoint):
+        self._instrumentation = instrumentation
+        self._event = RequestEvent(method, endpoint)
+        self._started = None
+
+    def __enter__(self):
+        self._instrumentation._run_hooks(self._instrumentation._before_request, self._event)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event = self._event
+        if self._started is not None:
+            event.network_time += time.perf_counter() - self._started
+        if isinstance(exc_value, Exception):
+            # a stream closed early by its consumer did not fail
+            event.error = exc_value
+
+        self._instrumentation._run_hooks(self._instrumentation._after_request, event)
+        return False
+
+    def received(self, status_code, size=0):
+        self._event.network_time += time.perf_counter() - self._started
+        self._event.status_code = status_code
+        self._event.bytes += size
+        self._started = None
+
+    def iter_chunks(self, chunks):
+        chunks = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                self._event.network_time += time.perf_counter() - started
+                return
+            self._event.network_time += time.perf_counter() - started
+            self._event.bytes += len(chunk)
+            yield chunk
+
+    def decode(self, function, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self._event.decode_time += time.perf_counter() - started
+
+
+class AsyncRequestTimer(RequestTimer):
+    '''
+    A RequestTimer for AsyncGroundClient, whose streamed bodies are async
+    iterators.
+    '''
+
+    async def iter_chunks(self, chunks):
+        chunks = chunks.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                self._event.network_time += time.perf_counter() - started
+                return
+            self._event.network_time += time.perf_counter() - started
+            self._event.bytes += len(chunk)
+            yield chunk
+
+
+class LatencyHistogram:
+    '''
+    A thread-safe histogram of latencies in seconds. Bucket bounds grow by a factor
+    of growth from min_latency up to max_latency, so percentiles are accurate to
+    within that factor while the histogram stays a fixed size however many
+    latencies it counts.
+    '''
+
+    def __init__(self, min_latency=1e-6, max_latency=100.0, growth=1.1):
+        if min_latency <= 0 or max_latency <= min_latency or growth <= 1:
+            raise ValueError("LatencyHistogram needs 0 < min_latency < max_latency and growth > 1.")
+
+        self._min_latency = min_latency
+        self._log_growth = math.log(growth)
+        self._bounds = [min_latency * growth ** index
+                        for index in range(int(math.ceil(math.log(max_latency / min_latency) / self._log_growth)) + 1)]
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._lock = threading.Lock()
+
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def record(self, latency):
+        if latency <= self._min_latency:
+            index = 0
+        else:
+            index = min(len(self._bounds), int(math.ceil(math.log(latency / self._min_latency) / self._log_growth)))
+
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += latency
+            self._max = max(self._max, latency)
+
+    def get_count(self):
+        return self._count
+
+    def get_percentile(self, percentile):
+        # the upper bound of the bucket holding the given percentile (0-100), or None
+        # if nothing has been recorded
+        with self._lock:
+            if self._count == 0:
+                return None
+
+            rank = max(1, int(math.ceil(percentile / 100.0 * self._count)))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    break
+
+            if index < len(self._bounds):
+                return min(self._bounds[index], self._max)
+            return self._max
+
+    def get_buckets(self):
+        # (upper bound, cumulative count) pairs, as a Prometheus histogram exposes
+        # them, up to the bucket holding the largest latency recorded
+        with self._lock:
+            buckets = []
+            seen = 0
+            for bound, count in zip(self._bounds, self._counts):
+                seen += count
+                buckets.append((bound, seen))
+                if seen == self._count:
+                    break
+            if seen < self._count:
+                buckets.append((float("inf"), self._count))
+            return buckets
+
+    def get_stats(self):
+        with self._lock:
+            count, total, maximum = self._count, self._sum, self._max
+
+        return {
+            "count": count,
+            "sum": total,
+            "max": maximum,
+            "p50": self.get_percentile(50),
+            "p95": self.get_percentile(95),
+            "p99": self.get_percentile(99),
+        }
+
+
+class LatencyHistograms:
+    '''
+    Per-endpoint latency histograms, fed by Instrumentation's after hooks. Each
+    endpoint template gets a histogram per phase: network, decode, model (when
+    the models built from its responses can be attributed to it) and total, the
+    network and decode time together. Model building is also kept per model
+    class.
+    '''
+
+    def __init__(self, **histogram_options):
+        self._histogram_options = histogram_options
+        self._requests = {}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _get(self, histograms, key):
+        histogram = histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(key, LatencyHistogram(**self._histogram_options))
+        return histogram
+
+    def record_request(self, event):
+        self._get(self._requests, (event.template, "network")).record(event.network_time)
+        self._get(self._requests, (event.template, "decode")).record(event.decode_time)
+        self._get(self._requests, (event.template, "total")).record(event.get_total_time())
+
+    def record_model(self, event):
+        if event.template is not None:
+            self._get(self._requests, (event.template, "model")).record(event.model_time)
+        self._get(self._models, event.model_class.__name__).record(event.model_time)
+
+    def get_histogram(self, template, phase="total"):
+        return self._requests.get((template, phase))
+
+    def get_model_histogram(self, model_class):
+        return self._models.get(model_class.__name__)
+
+    def get_stats(self):
+        # {"requests": {template: {phase: stats}}, "models": {model class name: stats}}
+        with self._lock:
+            requests = list(self._requests.items())
+            models = list(self._models.items())
+
+        stats = {"requests": {}, "models": {}}
+        for (template, phase), histogram in requests:
+            stats["requests"].setdefault(template, {})[phase] = histogram.get_stats()
+        for name, histogram in models:
+            stats["models"][name] = histogram.get_stats()
+        return stats
+
+
+class Instrumentation:
+    '''
+    Hooks around the requests a client sends and the models it builds from their
+    responses. Before hooks are called with a RequestEvent or ModelEvent before
+    the work starts, and after hooks with the same event once it is done, failed
+    or not. Hooks run on whichever thread or task did the work and should be
+    quick.
+
+    With histograms on (the default), every request and model is also counted in
+    LatencyHistograms, available from get_histograms().
+    '''
+
+    def __init__(self, histograms=True):
+        self._before_request = []
+        self._after_request = []
+        self._before_model = []
+        self._after_model = []
+
+        self._histograms = None
+        if histograms:
+            self._histograms = LatencyHistograms()
+            self.add_after_request(self._histograms.record_request)
+            self.add_after_model(self._histograms.record_model)
+
+    def get_histograms(self):
+        return self._histograms
+
+    def add_before_request(self, hook):
+        self._before_request.append(hook)
+
+    def add_after_request(self, hook):
+        self._after_request.append(hook)
+
+    def add_before_model(self, hook):
+        self._before_model.append(hook)
+
+    def add_after_model(self, hook):
+        self._after_model.append(hook)
+
+    def _run_hooks(self, hooks, event):
+        for hook in hooks:
+            hook(event)
+
+    def time_request(self, method, endpoint):
+        return RequestTimer(self, method, endpoint)
+
+    def time_async_request(self, method, endpoint):
+        return AsyncRequestTimer(self, method, endpoint)
+
+    def build_model(self, model_class, template, build, *args):
+        event = ModelEvent(model_class, template)
+        self._run_hooks(self._before_model, event)
+
+        started = time.perf_counter()
+        try:
+            return build(*args)
+        except Exception as error:
+            event.error = error
+            raise
+        finally:
+            event.model_time = time.perf_counter() - started
+            self._run_hooks(self._after_model, event)
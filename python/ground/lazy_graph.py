@@ -0,0 +1,216 @@
+import asyncio
+
+from ground.common.model.core.graph_version import GraphVersion
+
+
+class _LazyGraphVersionBase(GraphVersion):
+
+    def __init__(self, client, graph_version, batch_size, prefetch):
+        super().__init__({
+            'id': graph_version.get_id(),
+            'tags': graph_version.get_tags(),
+            'structureVersionId': graph_version.get_structure_version_id(),
+            'reference': graph_version.get_reference(),
+            'referenceParameters': graph_version.get_parameters(),
+            'graphId': graph_version.get_graph_id(),
+            'edgeVersionIds': graph_version.get_edge_version_ids(),
+        })
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive, got " + str(batch_size) + ".")
+
+        self._client = client
+        self._batch_size = batch_size
+        self._prefetch = prefetch
+        self._edge_versions = {}
+        self._node_versions = {}
+
+    def get_client(self):
+        return self._client
+
+    def get_resolved_edge_versions(self):
+        return dict(self._edge_versions)
+
+    def get_resolved_node_versions(self):
+        return dict(self._node_versions)
+
+    def _get_batches(self):
+        ids = self.get_edge_version_ids()
+        return [ids[start:start + self._batch_size] for start in range(0, len(ids), self._batch_size)]
+
+    def _get_unresolved(self, resolved, ids):
+        return [id for id in dict.fromkeys(ids) if id not in resolved]
+
+    def _get_new_endpoint_ids(self, edge_versions, seen):
+        ids = []
+        for edge_version in edge_versions:
+            if edge_version is None:
+                continue
+            for id in (edge_version.get_from_node_version_start_id(), edge_version.get_to_node_version_start_id()):
+                if id > 0 and id not in seen:
+                    seen.add(id)
+                    ids.append(id)
+        return ids
+
+    def _touches(self, edge_version, node_version_id, outgoing, incoming):
+        return ((outgoing and edge_version.get_from_node_version_start_id() == node_version_id)
+                or (incoming and edge_version.get_to_node_version_start_id() == node_version_id))
+
+
+class LazyGraphVersion(_LazyGraphVersionBase):
+    '''
+    A GraphVersion bound to a GroundClient that fetches its edge versions, and the
+    node versions at their ends, only as the caller walks them.
+
+    Edge versions are fetched batch_size at a time in the order of
+    get_edge_version_ids(); with prefetch on, the next batch is requested while
+    the caller works through the current one. Everything fetched is kept, so
+    walking the graph again costs no requests.
+    '''
+
+    def __init__(self, client, graph_version, batch_size=100, prefetch=True):
+        super().__init__(client, graph_version, batch_size, prefetch)
+        self._in_flight = {}
+
+    def _fetch(self, get_version, resolved, ids):
+        # starts fetching the ids not resolved or in flight yet; the returned callable
+        # waits for all of them. Each id is its own task, so no worker ever blocks
+        # waiting on another, and a prefetch the caller walked away from is reused.
+        executor = self._client._get_executor()
+        ids = self._get_unresolved(resolved, ids)
+        for id in ids:
+            if (get_version, id) not in self._in_flight:
+                self._in_flight[(get_version, id)] = executor.submit(get_version, id)
+
+        def wait():
+            for id in ids:
+                if (get_version, id) in self._in_flight:
+                    resolved[id] = self._in_flight.pop((get_version, id)).result()
+        return wait
+
+    def get_edge_version(self, id):
+        if id not in self._edge_versions:
+            self._edge_versions[id] = self._client.get_edge_version(id)
+        return self._edge_versions[id]
+
+    def _iter_edge_version_batches(self):
+        batches = self._get_batches()
+        if not batches:
+            return
+
+        wait = self._fetch(self._client.get_edge_version, self._edge_versions, batches[0])
+        for index, batch in enumerate(batches):
+            wait()
+            has_next = index + 1 < len(batches)
+
+            if has_next and self._prefetch:
+                wait = self._fetch(self._client.get_edge_version, self._edge_versions, batches[index + 1])
+
+            yield [self._edge_versions[id] for id in batch]
+
+            if has_next and not self._prefetch:
+                wait = self._fetch(self._client.get_edge_version, self._edge_versions, batches[index + 1])
+
+    def iter_edge_versions(self):
+        for batch in self._iter_edge_version_batches():
+            for edge_version in batch:
+                yield edge_version
+
+    def iter_node_versions(self):
+        seen = set()
+        for batch in self._iter_edge_version_batches():
+            ids = self._get_new_endpoint_ids(batch, seen)
+            self._fetch(self._client.get_node_version, self._node_versions, ids)()
+
+            for id in ids:
+                yield self._node_versions[id]
+
+    def iter_adjacent_edge_versions(self, node_version_id, outgoing=True, incoming=True):
+        # the server has no per-node index of a graph's edges, so this walks the edges
+        # lazily and stops fetching as soon as the caller stops iterating
+        for edge_version in self.iter_edge_versions():
+            if edge_version is not None and self._touches(edge_version, node_version_id, outgoing, incoming):
+                yield edge_version
+
+
+class AsyncLazyGraphVersion(_LazyGraphVersionBase):
+    '''
+    The AsyncGroundClient version of LazyGraphVersion, walked with async for.
+    '''
+
+    def __init__(self, client, graph_version, batch_size=100, prefetch=True):
+        super().__init__(client, graph_version, batch_size, prefetch)
+        self._in_flight = {}
+
+    def _fetch(self, get_versions, resolved, ids):
+        # starts fetching the ids not resolved or in flight yet; the returned task waits
+        # for all of them. Fetches run as tasks of their own, so concurrent walks share
+        # them, and cancelling one walk's wait leaves a fetch another walk needs running.
+        unresolved = self._get_unresolved(resolved, ids)
+        missing = [id for id in unresolved if (get_versions, id) not in self._in_flight]
+        if missing:
+            async def fetch():
+                try:
+                    resolved.update(await get_versions(missing))
+                finally:
+                    for id in missing:
+                        del self._in_flight[(get_versions, id)]
+
+            task = asyncio.ensure_future(fetch())
+            # a failed fetch nobody waits for any more does not log a warning
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            for id in missing:
+                self._in_flight[(get_versions, id)] = task
+        tasks = {self._in_flight[(get_versions, id)] for id in unresolved if (get_versions, id) in self._in_flight}
+
+        async def wait():
+            await asyncio.gather(*[asyncio.shield(task) for task in tasks])
+
+        return asyncio.ensure_future(wait())
+
+    async def get_edge_version(self, id):
+        if id not in self._edge_versions:
+            await self._fetch(self._client.get_edge_versions, self._edge_versions, [id])
+        return self._edge_versions[id]
+
+    async def _iter_edge_version_batches(self):
+        batches = self._get_batches()
+        if not batches:
+            return
+
+        pending = self._fetch(self._client.get_edge_versions, self._edge_versions, batches[0])
+        try:
+            for index, batch in enumerate(batches):
+                await pending
+                pending = None
+                has_next = index + 1 < len(batches)
+
+                if has_next and self._prefetch:
+                    pending = self._fetch(self._client.get_edge_versions, self._edge_versions, batches[index + 1])
+
+                yield [self._edge_versions[id] for id in batch]
+
+                if has_next and not self._prefetch:
+                    pending = self._fetch(self._client.get_edge_versions, self._edge_versions, batches[index + 1])
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    async def iter_edge_versions(self):
+        async for batch in self._iter_edge_version_batches():
+            for edge_version in batch:
+                yield edge_version
+
+    async def iter_node_versions(self):
+        seen = set()
+        async for batch in self._iter_edge_version_batches():
+            ids = self._get_new_endpoint_ids(batch, seen)
+            await self._fetch(self._client.get_node_versions, self._node_versions, ids)
+
+            for id in ids:
+                yield self._node_versions[id]
+
+    async def iter_adjacent_edge_versions(self, node_version_id, outgoing=True, incoming=True):
+        async for edge_version in self.iter_edge_versions():
+            if edge_version is not None and self._touches(edge_version, node_version_id, outgoing, incoming):
+                yield edge_version
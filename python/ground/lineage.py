@@ -0,0 +1,234 @@
+import asyncio
+
+from ground.common.model.usage.lineage_edge_version import LineageEdgeVersion
+from ground.deadline import start_deadline, use_deadline, wait_within
+
+
+UPSTREAM = "upstream"
+DOWNSTREAM = "downstream"
+
+
+class _LineageTraversalBase:
+
+    def __init__(self, client, window, deadline):
+        if window <= 0:
+            raise ValueError("window must be positive, got " + str(window) + ".")
+
+        self._client = client
+        self._window = window
+        self._timeout = deadline
+        self._deadline = None
+
+    def _start(self):
+        # the deadline covers one whole traversal or path search, from its first request
+        self._deadline = start_deadline(self._timeout)
+
+    def _get_chunks(self, frontier):
+        return [frontier[start:start + self._window] for start in range(0, len(frontier), self._window)]
+
+    def _get_neighbors(self, id, adjacent_lineage, direction):
+        # one hop from id along every lineage edge pointing in the given direction
+        for lineage_edge_version in map(LineageEdgeVersion, adjacent_lineage or []):
+            if direction == DOWNSTREAM and lineage_edge_version.get_from_id() == id:
+                yield lineage_edge_version.get_to_id(), lineage_edge_version
+            elif direction == UPSTREAM and lineage_edge_version.get_to_id() == id:
+                yield lineage_edge_version.get_from_id(), lineage_edge_version
+
+    def _get_path(self, meeting_id, forward_parents, backward_parents):
+        path = []
+        id = meeting_id
+        while id is not None:
+            path.append(id)
+            id = forward_parents[id]
+        path.reverse()
+
+        id = backward_parents[meeting_id]
+        while id is not None:
+            path.append(id)
+            id = backward_parents[id]
+        return path
+
+
+class LineageTraversal(_LineageTraversalBase):
+    '''
+    Breadth-first walks over the lineage graph of a GroundClient, built on
+    get_node_version_adjacent_lineage.
+
+    Each BFS level is expanded on the client's worker pool, window versions at a
+    time, and every version is visited once. Results are generated as the levels
+    are expanded, as (version id, depth, LineageEdgeVersion it was reached by).
+
+    deadline is in seconds, and bounds each traversal or path search as a whole;
+    DeadlineExceeded is raised once it has passed.
+    '''
+
+    def __init__(self, client, window=64, deadline=None):
+        super().__init__(client, window, deadline)
+
+    def _expand(self, frontier):
+        executor = self._client._get_executor()
+        for chunk in self._get_chunks(frontier):
+            with use_deadline(self._deadline):
+                adjacent = list(executor.map(self._client.get_node_version_adjacent_lineage, chunk))
+            for id, adjacent_lineage in zip(chunk, adjacent):
+                yield id, adjacent_lineage
+
+    def traverse(self, id, direction, depth=None, max_nodes=None):
+        self._start()
+        visited = {id}
+        frontier = [id]
+        level = 0
+        found = 0
+
+        while frontier and (depth is None or level < depth):
+            level += 1
+            next_frontier = []
+
+            for current, adjacent_lineage in self._expand(frontier):
+                for neighbor, lineage_edge_version in self._get_neighbors(current, adjacent_lineage, direction):
+                    if neighbor in visited:
+                        continue
+
+                    visited.add(neighbor)
+                    next_frontier.append(neighbor)
+                    yield neighbor, level, lineage_edge_version
+
+                    found += 1
+                    if max_nodes is not None and found >= max_nodes:
+                        return
+
+            frontier = next_frontier
+
+    def upstream(self, id, depth=None, max_nodes=None):
+        return self.traverse(id, UPSTREAM, depth, max_nodes)
+
+    def downstream(self, id, depth=None, max_nodes=None):
+        return self.traverse(id, DOWNSTREAM, depth, max_nodes)
+
+    def path(self, from_id, to_id, max_depth=None):
+        '''
+        Returns the shortest downstream path of version ids from from_id to to_id, or
+        None if there is none within max_depth hops. Searches from both ends at once,
+        always expanding the smaller frontier.
+        '''
+        if from_id == to_id:
+            return [from_id]
+
+        self._start()
+        forward_parents = {from_id: None}
+        backward_parents = {to_id: None}
+        forward_frontier = [from_id]
+        backward_frontier = [to_id]
+        hops = 0
+
+        while forward_frontier and backward_frontier and (max_depth is None or hops < max_depth):
+            hops += 1
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, others, direction = forward_frontier, forward_parents, backward_parents, DOWNSTREAM
+            else:
+                frontier, parents, others, direction = backward_frontier, backward_parents, forward_parents, UPSTREAM
+
+            next_frontier = []
+            for current, adjacent_lineage in self._expand(frontier):
+                for neighbor, _ in self._get_neighbors(current, adjacent_lineage, direction):
+                    if neighbor in parents:
+                        continue
+
+                    parents[neighbor] = current
+                    if neighbor in others:
+                        return self._get_path(neighbor, forward_parents, backward_parents)
+                    next_frontier.append(neighbor)
+
+            if direction == DOWNSTREAM:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return None
+
+
+class AsyncLineageTraversal(_LineageTraversalBase):
+    '''
+    The AsyncGroundClient version of LineageTraversal; traversals are async
+    generators and path is a coroutine.
+    '''
+
+    def __init__(self, client, window=64, deadline=None):
+        super().__init__(client, window, deadline)
+
+    async def _expand(self, frontier):
+        async def fetch(chunk):
+            return await asyncio.gather(*[self._client.get_node_version_adjacent_lineage(id) for id in chunk])
+
+        for chunk in self._get_chunks(frontier):
+            adjacent = await wait_within(self._deadline, fetch(chunk))
+            for id, adjacent_lineage in zip(chunk, adjacent):
+                yield id, adjacent_lineage
+
+    async def traverse(self, id, direction, depth=None, max_nodes=None):
+        self._start()
+        visited = {id}
+        frontier = [id]
+        level = 0
+        found = 0
+
+        while frontier and (depth is None or level < depth):
+            level += 1
+            next_frontier = []
+
+            async for current, adjacent_lineage in self._expand(frontier):
+                for neighbor, lineage_edge_version in self._get_neighbors(current, adjacent_lineage, direction):
+                    if neighbor in visited:
+                        continue
+
+                    visited.add(neighbor)
+                    next_frontier.append(neighbor)
+                    yield neighbor, level, lineage_edge_version
+
+                    found += 1
+                    if max_nodes is not None and found >= max_nodes:
+                        return
+
+            frontier = next_frontier
+
+    def upstream(self, id, depth=None, max_nodes=None):
+        return self.traverse(id, UPSTREAM, depth, max_nodes)
+
+    def downstream(self, id, depth=None, max_nodes=None):
+        return self.traverse(id, DOWNSTREAM, depth, max_nodes)
+
+    async def path(self, from_id, to_id, max_depth=None):
+        if from_id == to_id:
+            return [from_id]
+
+        self._start()
+        forward_parents = {from_id: None}
+        backward_parents = {to_id: None}
+        forward_frontier = [from_id]
+        backward_frontier = [to_id]
+        hops = 0
+
+        while forward_frontier and backward_frontier and (max_depth is None or hops < max_depth):
+            hops += 1
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, others, direction = forward_frontier, forward_parents, backward_parents, DOWNSTREAM
+            else:
+                frontier, parents, others, direction = backward_frontier, backward_parents, forward_parents, UPSTREAM
+
+            next_frontier = []
+            async for current, adjacent_lineage in self._expand(frontier):
+                for neighbor, _ in self._get_neighbors(current, adjacent_lineage, direction):
+                    if neighbor in parents:
+                        continue
+
+                    parents[neighbor] = current
+                    if neighbor in others:
+                        return self._get_path(neighbor, forward_parents, backward_parents)
+                    next_frontier.append(neighbor)
+
+            if direction == DOWNSTREAM:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return None
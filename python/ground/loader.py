@@ -0,0 +1,199 @@
+import concurrent.futures
+
+from ground.batch import BatchItemError, call_with_item
+
+
+NODE = "node"
+NODE_VERSION = "node_version"
+EDGE = "edge"
+EDGE_VERSION = "edge_version"
+GRAPH = "graph"
+GRAPH_VERSION = "graph_version"
+
+
+class GraphLoadResult:
+    '''
+    The models written by GraphLoader.load, keyed by source_key. Anything that
+    failed, or was skipped because something it depends on failed, is missing
+    from the models and present in get_errors() under (kind, source_key).
+    '''
+
+    def __init__(self, results, errors):
+        self._results = results
+        self._errors = errors
+
+    def _get_kind(self, kind):
+        return {key[1]: value for key, value in self._results.items() if key[0] == kind}
+
+    def get_nodes(self):
+        return self._get_kind(NODE)
+
+    def get_node_versions(self):
+        return self._get_kind(NODE_VERSION)
+
+    def get_edges(self):
+        return self._get_kind(EDGE)
+
+    def get_edge_versions(self):
+        return self._get_kind(EDGE_VERSION)
+
+    def get_graph(self):
+        return next(iter(self._get_kind(GRAPH).values()), None)
+
+    def get_graph_version(self):
+        return next(iter(self._get_kind(GRAPH_VERSION).values()), None)
+
+    def get_errors(self):
+        return self._errors
+
+    def is_successful(self):
+        return not self._errors
+
+
+class GraphLoader:
+    '''
+    Writes a whole graph from a declarative description:
+
+        {
+            "nodes": [{"source_key": ..., "name": ..., "tags": ..., "version": {...}}],
+            "edges": [{"source_key": ..., "name": ..., "from": <node source_key>,
+                       "to": <node source_key>, "tags": ..., "version": {...}}],
+            "graph": {"source_key": ..., "name": ..., "tags": ..., "version": {...}}
+        }
+
+    Every node and edge gets one version, and the graph (optional) gets one version
+    holding all the edge versions. "version" holds extra keyword arguments for the
+    matching create_*_version call (reference, reference_parameters, tags, ...).
+
+    Each write is started as soon as the writes it needs ids from have finished,
+    so the whole graph takes four serial round trips: nodes, node versions, edge
+    versions and the graph version, with items created alongside.
+    '''
+
+    def __init__(self, client):
+        self._client = client
+
+    def load(self, description):
+        return GraphLoadResult(*run_dag(self._client._get_executor(), self._get_tasks(description)))
+
+    def _get_tasks(self, description):
+        client = self._client
+        tasks = {}
+
+        for node in description.get("nodes", []):
+            source_key = node["source_key"]
+            tasks[(NODE, source_key)] = ([], self._item_call(client.create_node, node))
+            tasks[(NODE_VERSION, source_key)] = ([(NODE, source_key)], self._node_version_call(node))
+
+        for edge in description.get("edges", []):
+            source_key = edge["source_key"]
+            for endpoint in (edge["from"], edge["to"]):
+                if (NODE, endpoint) not in tasks:
+                    raise ValueError("Edge " + source_key + " refers to unknown node " + endpoint + ".")
+
+            tasks[(EDGE, source_key)] = ([(NODE, edge["from"]), (NODE, edge["to"])], self._edge_call(edge))
+            tasks[(EDGE_VERSION, source_key)] = (
+                [(EDGE, source_key), (NODE_VERSION, edge["from"]), (NODE_VERSION, edge["to"])],
+                self._edge_version_call(edge)
+            )
+
+        graph = description.get("graph")
+        if graph is not None:
+            source_key = graph["source_key"]
+            edge_version_keys = [(EDGE_VERSION, edge["source_key"]) for edge in description.get("edges", [])]
+
+            tasks[(GRAPH, source_key)] = ([], self._item_call(client.create_graph, graph))
+            tasks[(GRAPH_VERSION, source_key)] = (
+                [(GRAPH, source_key)] + edge_version_keys,
+                self._graph_version_call(graph, edge_version_keys)
+            )
+
+        return tasks
+
+    def _item_call(self, create, item):
+        return lambda results: create(item["source_key"], item.get("name", item["source_key"]), item.get("tags"))
+
+    def _node_version_call(self, node):
+        def call(results):
+            node_id = results[(NODE, node["source_key"])].get_id()
+            return call_with_item(self._client.create_node_version, dict(node.get("version", {}), node_id=node_id))
+        return call
+
+    def _edge_call(self, edge):
+        def call(results):
+            return self._client.create_edge(edge["source_key"],
+                                            edge.get("name", edge["source_key"]),
+                                            results[(NODE, edge["from"])].get_id(),
+                                            results[(NODE, edge["to"])].get_id(),
+                                            edge.get("tags"))
+        return call
+
+    def _edge_version_call(self, edge):
+        def call(results):
+            arguments = dict(edge.get("version", {}),
+                             edge_id=results[(EDGE, edge["source_key"])].get_id(),
+                             from_node_version_start_id=results[(NODE_VERSION, edge["from"])].get_id(),
+                             to_node_version_start_id=results[(NODE_VERSION, edge["to"])].get_id())
+            return call_with_item(self._client.create_edge_version, arguments)
+        return call
+
+    def _graph_version_call(self, graph, edge_version_keys):
+        def call(results):
+            arguments = dict(graph.get("version", {}),
+                             graph_id=results[(GRAPH, graph["source_key"])].get_id(),
+                             edge_version_ids=[results[key].get_id() for key in edge_version_keys])
+            return call_with_item(self._client.create_graph_version, arguments)
+        return call
+
+
+def run_dag(executor, tasks):
+    '''
+    Runs tasks, a dict of key -> (dependency keys, function of the results so far),
+    starting each one on the executor as soon as all of its dependencies succeed.
+    Returns (results, errors), both keyed like tasks.
+    '''
+    waiting_on = {key: set(dependencies) for key, (dependencies, _) in tasks.items()}
+    dependents = {key: [] for key in tasks}
+    for key, remaining in waiting_on.items():
+        for dependency in remaining:
+            dependents[dependency].append(key)
+
+    results = {}
+    errors = {}
+    running = {}
+
+    def start(key):
+        running[executor.submit(tasks[key][1], results)] = key
+
+    def skip(key, cause):
+        errors[key] = BatchItemError("Skipped because " + cause[0] + " " + str(cause[1]) + " failed.")
+        for dependent in dependents[key]:
+            if dependent not in errors:
+                skip(dependent, cause)
+
+    for key, remaining in waiting_on.items():
+        if not remaining:
+            start(key)
+
+    while running:
+        done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            key = running.pop(future)
+            try:
+                result = future.result()
+                if result is None:
+                    raise BatchItemError("Server returned no result for " + key[0] + " " + str(key[1]) + ".")
+            except Exception as e:
+                errors[key] = e
+                for dependent in dependents[key]:
+                    if dependent not in errors:
+                        skip(dependent, key)
+                continue
+
+            results[key] = result
+            for dependent in dependents[key]:
+                waiting_on[dependent].discard(key)
+                if not waiting_on[dependent] and dependent not in errors:
+                    start(dependent)
+
+    return results, errors
@@ -0,0 +1,175 @@
+import random
+import threading
+import time
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    '''
+    Raised instead of sending a request while the client's CircuitBreaker is open.
+    '''
+
+
+class RetriesExhaustedError(RuntimeError):
+    '''
+    Raised when a request still gets a retryable status after the last attempt
+    its RetryPolicy allows.
+    '''
+
+    def __init__(self, method, endpoint, status_code, attempts):
+        super().__init__(method + " " + endpoint + " returned " + str(status_code) + " after " + str(attempts)
+                         + " attempts.")
+        self.status_code = status_code
+        self.attempts = attempts
+
+
+class RetryPolicy:
+    '''
+    When and how long to wait before sending a failed request again.
+
+    GETs are retried on any transport error and on retry_statuses. POSTs are not
+    idempotent, so they are only retried when the request cannot have been acted
+    on: when the connection could not be made, or on post_retry_statuses. Item
+    creates additionally look the item up by source key before each retry, and
+    return it if the failed attempt created it after all.
+
+    Attempt n (from 0) waits a random time between 0 and min(max_backoff,
+    backoff * 2 ** n) before the next one, or exactly that long without jitter.
+    '''
+
+    def __init__(self, max_attempts=3, backoff=0.1, max_backoff=10.0, jitter=True,
+                 retry_statuses=(502, 503, 504), post_retry_statuses=(503,), random=random.random):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1, got " + str(max_attempts) + ".")
+
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._jitter = jitter
+        self._retry_statuses = frozenset(retry_statuses)
+        self._post_retry_statuses = frozenset(post_retry_statuses)
+        self._random = random
+
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._backoff_seconds = 0.0
+        self._exhausted = 0
+        self._reconciled = 0
+
+    def get_max_attempts(self):
+        return self._max_attempts
+
+    def is_retryable_status(self, method, status_code):
+        if method == "GET":
+            return status_code in self._retry_statuses
+        return status_code in self._post_retry_statuses
+
+    def get_delay(self, attempt):
+        delay = min(self._max_backoff, self._backoff * 2 ** attempt)
+        if self._jitter:
+            delay *= self._random()
+        return delay
+
+    def record_retry(self, delay):
+        with self._lock:
+            self._retries += 1
+            self._backoff_seconds += delay
+
+    def record_exhausted(self):
+        with self._lock:
+            self._exhausted += 1
+
+    def record_reconciled(self):
+        with self._lock:
+            self._reconciled += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "max_attempts": self._max_attempts,
+                "retries": self._retries,
+                "backoff_seconds": self._backoff_seconds,
+                "exhausted": self._exhausted,
+                "reconciled": self._reconciled,
+            }
+
+
+class CircuitBreaker:
+    '''
+    Stops requests from being sent while the server looks down, so callers fail
+    fast with CircuitOpenError instead of waiting on timeouts and retries.
+
+    failure_threshold consecutive failures (transport errors or 5xx statuses)
+    open the circuit. After reset_timeout seconds one trial request is let
+    through: if it succeeds the circuit closes again, and if it fails the circuit
+    stays open for another reset_timeout. A trial that ends without either, e.g.
+    because it was cancelled, lets the next request through as a new trial, as
+    does one still out after reset_timeout.
+    '''
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1, got " + str(failure_threshold) + ".")
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+        self._opened = 0
+        self._rejected = 0
+
+    def get_state(self):
+        with self._lock:
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = self._clock()
+            if ((self._state == OPEN and now - self._opened_at >= self._reset_timeout)
+                    or (self._state == HALF_OPEN and now - self._trial_at >= self._reset_timeout)):
+                self._state = HALF_OPEN
+                self._trial_at = now
+                return True
+
+            # open, or half open with the trial request still out
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self._failure_threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._opened += 1
+
+    def record_abandoned(self):
+        # the request let through ended without a success or failure to go by
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = OPEN
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,492 @@
+import json
+import os
+import threading
+import zlib
+
+
+# provisional ids are handed out from here up, far above any id the server assigns,
+# so they pass every "id > 0" check the client makes and never collide with real ids
+PROVISIONAL_ID_BASE = 2 ** 62
+
+# responses that mean the write was not acted on and should be sent again later
+TRANSIENT_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".log"
+_IDS_FILE = "ids.log"
+_CHECKPOINT_FILE = "checkpoint"
+
+
+class SpoolFullError(RuntimeError):
+    '''
+    Raised when a write cannot be spooled because the spool already uses max_bytes
+    of disk.
+    '''
+
+
+def is_provisional_id(id):
+    return isinstance(id, int) and id >= PROVISIONAL_ID_BASE
+
+
+def _is_id_field(key):
+    return key.endswith("Id") or key.endswith("Ids")
+
+
+def _get_referenced_seqs(body):
+    # the sequence numbers of the spooled writes whose provisional ids body refers to
+    for key, value in body.items():
+        if _is_id_field(key):
+            for id in value if isinstance(value, list) else [value]:
+                if is_provisional_id(id):
+                    yield id - PROVISIONAL_ID_BASE
+
+
+def _is_os_error(error):
+    # what the drainer backs off from unless it is told otherwise: the errors the
+    # default Transport considers transient
+    return isinstance(error, OSError)
+
+
+def _frame(record):
+    # one record per line, behind the CRC of its JSON, so a line torn by a crash is
+    # recognized and dropped on recovery
+    data = json.dumps(record, separators=(",", ":")).encode()
+    return b"%08x " % zlib.crc32(data) + data + b"\n"
+
+
+def _unframe(line):
+    if not line.endswith(b"\n") or len(line) < 10:
+        return None
+    data = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(data):
+            return None
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _write_file(path, data, fsync):
+    # replaces path with data all at once, so a crash leaves either the old or the new file
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as new_file:
+        new_file.write(data)
+        new_file.flush()
+        if fsync:
+            os.fsync(new_file.fileno())
+    os.replace(temporary, path)
+
+
+def _read_records(path):
+    # the intact records of a log file and the offset just past the last of them; a
+    # damaged last line was torn by a crash and is cut off, damaged lines before it
+    # are kept for the drainer to skip
+    records = []
+    offset = 0
+    with open(path, "rb") as log:
+        lines = log.readlines()
+    for index, line in enumerate(lines):
+        record = _unframe(line)
+        if record is None and index == len(lines) - 1:
+            break
+        offset += len(line)
+        if record is not None:
+            records.append((record, offset))
+    return records, offset
+
+
+class Spool:
+    '''
+    A durable, append-only local log of writes a GroundClient could not send,
+    replayed to the server in order by a background drainer once it is back.
+
+    Writes are appended to segment files in directory and fsynced before the
+    client returns, as a model whose id is provisional (see is_provisional_id).
+    Provisional ids can be used in later writes like any other id: the drainer
+    replaces them with the ids the server assigned before sending those. Use
+    get_server_id to look one up once the write has been replayed; it is known
+    until the segment holding the write, and every write referring to it, have
+    been replayed and deleted.
+
+    The drainer sends up to batch_size writes at a time, and backs off from
+    retry_interval up to max_retry_interval seconds while the server is
+    unreachable or answers with a transient status. Writes the server rejects
+    outright, or that fail any other way, are dropped and counted as rejected,
+    along with any write that referred to them; so are records that cannot be
+    read back.
+    Replay is at least once: a write sent just before a crash may be sent again.
+
+    Segments are deleted once every write in them has been replayed, and the map
+    of provisional to server ids is compacted to the ids later writes can still
+    refer to, so it is bounded by the segments left. Segments stay within
+    max_bytes; appending beyond that raises SpoolFullError.
+    '''
+
+    def __init__(self, directory, segment_size=4 * 2 ** 20, max_bytes=256 * 2 ** 20, fsync=True, batch_size=100,
+                 retry_interval=1.0, max_retry_interval=60.0):
+        self._directory = directory
+        self._segment_size = segment_size
+        self._max_bytes = max_bytes
+        self._fsync = fsync
+        self._batch_size = batch_size
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._thread = None
+        self._stopped = False
+
+        self._replayed = 0
+        self._rejected = 0
+        self._last_error = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _path(self, name):
+        return os.path.join(self._directory, name)
+
+    def _segment_path(self, start_seq):
+        return self._path(_SEGMENT_PREFIX + "%020d" % start_seq + _SEGMENT_SUFFIX)
+
+    def _sync(self, log):
+        log.flush()
+        if self._fsync:
+            os.fsync(log.fileno())
+
+    def _recover(self):
+        # everything up to the checkpoint was replayed; a torn record at the end of a
+        # log is cut off, so appends continue from the last intact one
+        self._acked = 0
+        self._cursor = None
+        try:
+            with open(self._path(_CHECKPOINT_FILE)) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            self._acked = checkpoint["acked"]
+            self._cursor = (checkpoint["segment"], checkpoint["offset"])
+        except (OSError, ValueError):
+            pass
+
+        self._server_ids = {}
+        ids_path = self._path(_IDS_FILE)
+        if os.path.exists(ids_path):
+            records, offset = _read_records(ids_path)
+            self._server_ids.update((record["seq"], record["id"]) for record, _ in records)
+            os.truncate(ids_path, offset)
+        self._ids_file = open(ids_path, "ab")
+
+        # each segment is kept as [first seq, size, oldest seq its writes refer to]
+        self._segments = []
+        self._last_seq = self._acked
+        for name in sorted(os.listdir(self._directory)):
+            if not (name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)):
+                continue
+            start_seq = int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+            records, offset = _read_records(self._path(name))
+            os.truncate(self._path(name), offset)
+            referenced = [seq for record, _ in records for seq in _get_referenced_seqs(record["body"])]
+            oldest = min([start_seq] + referenced)
+            self._segments.append([start_seq, offset, oldest])
+            if records:
+                self._last_seq = max(self._last_seq, records[-1][0]["seq"])
+
+        if self._cursor is None or not any(segment[0] == self._cursor[0] for segment in self._segments):
+            self._cursor = (self._segments[0][0], 0) if self._segments else None
+        self._segment_file = None
+
+        self._horizon = self._get_horizon()
+        self._server_ids = {seq: id for seq, id in self._server_ids.items() if seq >= self._horizon}
+
+    def get_directory(self):
+        return self._directory
+
+    def get_pending_count(self):
+        with self._lock:
+            return self._last_seq - self._acked
+
+    def is_empty(self):
+        with self._lock:
+            return self._last_seq == self._acked
+
+    def get_disk_usage(self):
+        with self._lock:
+            return self._get_disk_usage()
+
+    def _get_disk_usage(self):
+        return self._get_segments_size() + self._ids_file.tell()
+
+    def _get_segments_size(self):
+        return sum(segment[1] for segment in self._segments)
+
+    def _get_horizon(self):
+        # the oldest seq whose server id a write still in the spool may need
+        if not self._segments:
+            return self._last_seq + 1
+        return min(segment[2] for segment in self._segments)
+
+    def get_server_id(self, id):
+        # the server's id for a provisional one, None until its write has been replayed
+        # (or if it was rejected or has been forgotten); any other id is returned as it is
+        if not is_provisional_id(id):
+            return id
+        with self._lock:
+            return self._server_ids.get(id - PROVISIONAL_ID_BASE)
+
+    def _resolve_id(self, id):
+        # the server's id for id once its write has been replayed, id itself until then
+        if not is_provisional_id(id):
+            return id
+        seq = id - PROVISIONAL_ID_BASE
+        if seq < self._horizon and seq not in self._server_ids:
+            raise ValueError("Provisional id " + str(id) + " is no longer known to the spool in "
+                             + self._directory + ".")
+        server_id = self._server_ids.get(seq)
+        return id if server_id is None else server_id
+
+    def _resolve(self, body):
+        resolved = dict(body)
+        for key, value in body.items():
+            if _is_id_field(key):
+                if isinstance(value, list):
+                    resolved[key] = [self._resolve_id(id) for id in value]
+                else:
+                    resolved[key] = self._resolve_id(value)
+        return resolved
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "pending": self._last_seq - self._acked,
+                "replayed": self._replayed,
+                "rejected": self._rejected,
+                "disk_usage": self._get_disk_usage(),
+                "segments": len(self._segments),
+                "last_error": repr(self._last_error) if self._last_error is not None else None,
+            }
+
+    def resolve_body(self, body):
+        '''
+        Returns body with every provisional id in its id fields replaced by the
+        server's, or None if one of them has no server id (yet). Raises ValueError
+        for a provisional id the spool has forgotten.
+        '''
+        with self._lock:
+            resolved = self._resolve(body)
+        if any(True for _ in _get_referenced_seqs(resolved)):
+            return None
+        return resolved
+
+    def append(self, endpoint, body, reconcile=None):
+        '''
+        Durably appends a POST of body to endpoint, and returns the provisional id of
+        what it creates. reconcile is the endpoint looked up before the replay, in
+        case an earlier attempt created it after all.
+        '''
+        with self._lock:
+            # ids already known are filled in now, so the write only refers to ones still
+            # pending and the id map can forget the rest
+            body = self._resolve(body)
+            seq = self._last_seq + 1
+            line = _frame({"seq": seq, "endpoint": endpoint, "body": body, "reconcile": reconcile})
+            if self._get_segments_size() + len(line) > self._max_bytes:
+                raise SpoolFullError("The spool in " + self._directory + " is full (" + str(self._max_bytes)
+                                     + " bytes).")
+
+            if not self._segments or self._segments[-1][1] + len(line) > self._segment_size:
+                self._start_segment(seq)
+            elif self._segment_file is None:
+                self._segment_file = open(self._segment_path(self._segments[-1][0]), "ab")
+
+            self._segment_file.write(line)
+            self._sync(self._segment_file)
+            self._segments[-1][1] += len(line)
+            self._segments[-1][2] = min([self._segments[-1][2]] + list(_get_referenced_seqs(body)))
+            self._last_seq = seq
+            self._condition.notify_all()
+        return PROVISIONAL_ID_BASE + seq
+
+    def _start_segment(self, start_seq):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_file = open(self._segment_path(start_seq), "ab")
+        self._segments.append([start_seq, 0, start_seq])
+        if self._cursor is None:
+            self._cursor = (start_seq, 0)
+
+        # the new file's directory entry has to be durable too
+        if self._fsync and hasattr(os, "O_DIRECTORY"):
+            directory = os.open(self._directory, os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+    '''
+    REPLAY
+    '''
+
+    def _read_batch(self):
+        # up to batch_size unreplayed records, each with the cursor just past it
+        batch = []
+        with self._lock:
+            if self._cursor is None:
+                return batch
+            start_seq, offset = self._cursor
+            index = [segment[0] for segment in self._segments].index(start_seq)
+
+            while len(batch) < self._batch_size and index < len(self._segments):
+                start_seq, size, _ = self._segments[index]
+                if offset < size:
+                    with open(self._segment_path(start_seq), "rb") as segment:
+                        segment.seek(offset)
+                        while len(batch) < self._batch_size and offset < size:
+                            line = segment.readline()
+                            offset += len(line)
+                            batch.append((_unframe(line), (start_seq, offset)))
+                if offset >= size and index + 1 < len(self._segments):
+                    # past the end of a finished segment, the cursor moves on to the next
+                    index += 1
+                    offset = 0
+                    if batch:
+                        batch[-1] = (batch[-1][0], (self._segments[index][0], 0))
+                else:
+                    break
+        return batch
+
+    def drain_once(self, send, is_transient_error=_is_os_error):
+        '''
+        Replays one batch through send(endpoint, body, reconcile), which returns the
+        status code and decoded response. Returns False if it had to stop early
+        because the server could not take a write, True otherwise. Only errors
+        from send that is_transient_error accepts stop it early; a write failing
+        with any other error is rejected.
+        '''
+        done = None
+        next_seq = self._acked + 1
+        try:
+            for record, cursor in self._read_batch():
+                if record is None:
+                    # a record corrupted on disk cannot be replayed, only skipped
+                    self._last_error = ValueError("Skipped an unreadable record in the spool in "
+                                                  + self._directory + ".")
+                    self._record_server_id(next_seq, None)
+                    done = (next_seq, cursor)
+                    next_seq += 1
+                    continue
+
+                for seq in range(next_seq, record["seq"]):
+                    # lost along with an unreadable record before this one
+                    self._record_server_id(seq, None)
+                next_seq = record["seq"] + 1
+
+                body = self.resolve_body(record["body"])
+                server_id = None
+                if body is not None:
+                    try:
+                        status_code, payload = send(record["endpoint"], body, record["reconcile"])
+                    except Exception as error:
+                        self._last_error = error
+                        if is_transient_error(error):
+                            return False
+                    else:
+                        if status_code in TRANSIENT_STATUSES:
+                            self._last_error = RuntimeError(record["endpoint"] + " returned " + str(status_code)
+                                                            + ".")
+                            return False
+                        if status_code < 300 and isinstance(payload, dict):
+                            server_id = payload.get("id")
+
+                self._record_server_id(record["seq"], server_id)
+                done = (record["seq"], cursor)
+            return True
+        finally:
+            if done is not None:
+                self._checkpoint(*done)
+
+    def _record_server_id(self, seq, server_id):
+        with self._lock:
+            self._server_ids[seq] = server_id
+            self._ids_file.write(_frame({"seq": seq, "id": server_id}))
+            if server_id is None:
+                self._rejected += 1
+            else:
+                self._replayed += 1
+
+    def _checkpoint(self, acked, cursor):
+        # the ids are made durable before the checkpoint that skips their writes
+        with self._lock:
+            self._sync(self._ids_file)
+
+            checkpoint = {"acked": acked, "segment": cursor[0], "offset": cursor[1]}
+            _write_file(self._path(_CHECKPOINT_FILE), json.dumps(checkpoint).encode(), self._fsync)
+
+            self._acked = acked
+            self._cursor = cursor
+
+            # every segment before the cursor's has been replayed in full
+            while len(self._segments) > 1 and self._segments[0][0] != cursor[0]:
+                os.remove(self._segment_path(self._segments.pop(0)[0]))
+            self._compact_ids()
+            self._condition.notify_all()
+
+    def _compact_ids(self):
+        # drops the ids no write left in the spool can refer to, on disk and in memory
+        horizon = self._get_horizon()
+        if horizon <= self._horizon:
+            return
+        self._horizon = horizon
+        self._server_ids = {seq: id for seq, id in self._server_ids.items() if seq >= horizon}
+
+        self._ids_file.close()
+        data = b"".join(_frame({"seq": seq, "id": id}) for seq, id in self._server_ids.items())
+        _write_file(self._path(_IDS_FILE), data, self._fsync)
+        self._ids_file = open(self._path(_IDS_FILE), "ab")
+
+    def start(self, send, is_transient_error=_is_os_error):
+        # replays in the background through send (see drain_once) until stop()
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, args=(send, is_transient_error), name="ground-spool",
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self, send, is_transient_error):
+        delay = self._retry_interval
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopped or self._last_seq > self._acked)
+                if self._stopped:
+                    return
+
+            if self.drain_once(send, is_transient_error):
+                delay = self._retry_interval
+                continue
+
+            with self._condition:
+                if self._condition.wait_for(lambda: self._stopped, delay):
+                    return
+            delay = min(delay * 2, self._max_retry_interval)
+
+    def flush(self, timeout=None):
+        # waits until everything spooled so far has been replayed; False on timeout
+        with self._condition:
+            return self._condition.wait_for(lambda: self._last_seq == self._acked, timeout)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            self._ids_file.close()
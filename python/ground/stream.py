@@ -0,0 +1,176 @@
+import codecs
+import json
+import json.decoder
+import re
+
+
+_START, _FIRST, _ENTRY, _AFTER, _DONE = range(5)
+
+_CLOSERS = {"[": "]", "{": "}"}
+
+_DELIMITERS = frozenset(",:]} \t\r\n")
+
+# what the scan for the end of an entry stops at, outside and inside strings
+_STRUCTURE = re.compile(r'["\[\]{},]')
+_STRING_END = re.compile(r'["\\]')
+
+
+class JsonStreamParser:
+    '''
+    Parses a JSON array or object that arrives in chunks, generating each array
+    element, or (key, value) pair of an object, as soon as it is complete. Only
+    the entry being parsed is held in memory, never the whole document.
+
+    feed() takes the next chunk of bytes and returns the entries it completed;
+    close() checks that the document ended properly and raises ValueError if not.
+    '''
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _START
+        self._closer = None
+        # how far the scan for the end of an entry that did not parse yet got: the
+        # offset from the entry's start, its nesting depth there and whether it was in
+        # a string; None until an entry fails to parse
+        self._scan = None
+
+    def feed(self, chunk):
+        self._buffer += self._text.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self):
+        self._buffer += self._text.decode(b"", final=True)
+        entries = self._parse(final=True)
+        if self._state != _DONE or self._buffer.strip():
+            raise ValueError("Incomplete JSON stream.")
+        return entries
+
+    def _skip(self, position):
+        return json.decoder.WHITESPACE.match(self._buffer, position).end()
+
+    def _decode(self, position, final):
+        # until the stream ends, a value is only taken once a delimiter follows it, since
+        # a number such as 12 or 1.5 could still continue in the next chunk
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, position)
+        except ValueError:
+            if final:
+                raise
+            return None, None
+        if not final and (end >= len(self._buffer) or self._buffer[end] not in _DELIMITERS):
+            return None, None
+        return value, end
+
+    def _parse(self, final):
+        entries = []
+        buffer = self._buffer
+        position = 0
+
+        while True:
+            position = self._skip(position)
+            if position >= len(buffer):
+                break
+
+            if self._state == _START:
+                if buffer[position] not in _CLOSERS:
+                    raise ValueError("Expected a JSON array or object, got " + repr(buffer[position]) + ".")
+                self._closer = _CLOSERS[buffer[position]]
+                self._state = _FIRST
+                position += 1
+
+            elif self._state == _FIRST and buffer[position] == self._closer:
+                self._state = _DONE
+                position += 1
+
+            elif self._state in (_FIRST, _ENTRY):
+                # an entry spanning many chunks is only parsed again once it can be complete
+                if not final and self._scan is not None and not self._scan_entry(position):
+                    break
+                entry, end = self._decode_entry(position, final)
+                if end is None:
+                    if self._scan is None:
+                        self._scan = (0, 0, False)
+                    break
+                self._scan = None
+                entries.append(entry)
+                self._state = _AFTER
+                position = end
+
+            elif self._state == _AFTER:
+                if buffer[position] == ",":
+                    self._state = _ENTRY
+                elif buffer[position] == self._closer:
+                    self._state = _DONE
+                else:
+                    raise ValueError("Expected ',' or '" + self._closer + "', got " + repr(buffer[position]) + ".")
+                position += 1
+
+            else:
+                raise ValueError("Unexpected data after the end of the JSON stream.")
+
+        self._buffer = buffer[position:]
+        return entries
+
+    def _scan_entry(self, position):
+        # whether the entry starting at position may be complete, i.e. a ',' or the
+        # container's closer follows it; scans on from where the last call stopped
+        buffer = self._buffer
+        offset, depth, in_string = self._scan
+        index = position + offset
+        while True:
+            if in_string:
+                match = _STRING_END.search(buffer, index)
+                if match is None:
+                    index = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # the escaped character has not arrived yet
+                        index = match.start()
+                        break
+                    index = match.end() + 1
+                    continue
+                in_string = False
+                index = match.end()
+                continue
+
+            match = _STRUCTURE.search(buffer, index)
+            if match is None:
+                index = len(buffer)
+                break
+            char = match.group()
+            index = match.end()
+            if char == '"':
+                in_string = True
+            elif char in "[{":
+                depth += 1
+            elif depth == 0:
+                return True
+            elif char != ",":
+                depth -= 1
+
+        self._scan = (index - position, depth, in_string)
+        return False
+
+    def _decode_entry(self, position, final):
+        if self._closer == "]":
+            return self._decode(position, final)
+
+        key, end = self._decode(position, final)
+        if end is None:
+            return None, None
+        if not isinstance(key, str):
+            raise ValueError("Expected an object key, got " + repr(key) + ".")
+
+        end = self._skip(end)
+        if end >= len(self._buffer):
+            return None, None
+        if self._buffer[end] != ":":
+            raise ValueError("Expected ':', got " + repr(self._buffer[end]) + ".")
+
+        value, end = self._decode(self._skip(end + 1), final)
+        if end is None:
+            return None, None
+        return (key, value), end
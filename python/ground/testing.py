@@ -0,0 +1,373 @@
+import asyncio
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from ground.instrumentation import get_endpoint_template
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+# item type -> the key a version of it names its item by
+VERSION_ITEM_KEYS = {
+    "nodes": "nodeId",
+    "edges": "edgeId",
+    "graphs": "graphId",
+    "structures": "structureId",
+    "lineage_edges": "lineageEdgeId",
+    "lineage_graphs": "lineageGraphId",
+}
+
+
+class _Fault:
+
+    def __init__(self, status_code, error, count, method, template, apply):
+        self.status_code = status_code
+        self.error = error
+        self.count = count
+        self.method = method
+        self.template = template
+        self.apply = apply
+
+    def matches(self, method, template):
+        return (self.method is None or self.method == method) and (self.template is None or self.template == template)
+
+
+class FakeGroundServer:
+    '''
+    An in-memory stand-in for a Ground server, implementing the REST endpoints
+    GroundClient uses, for tests and benchmarks that cannot reach a real one.
+    Clients talk to it through FakeTransport, FakeAsyncTransport or, over real
+    HTTP, FakeGroundHTTPServer.
+
+    Every response takes latency seconds, or whatever set_latency gave its
+    endpoint template. inject_error makes the next matching requests fail with
+    a status code or a transport error; error_rate additionally fails that share
+    of all requests with error_status, drawn from a Random seeded with seed so
+    runs repeat exactly.
+    '''
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=503, seed=0):
+        self._lock = threading.Lock()
+        self._latency = latency
+        self._latencies = {}
+        self._error_rate = error_rate
+        self._error_status = error_status
+        self._random = random.Random(seed)
+        self._faults = []
+        self._counts = {}
+
+        self._next_id = 1
+        self._items = {item_type: {} for item_type in VERSION_ITEM_KEYS}
+        self._item_keys = {item_type: {} for item_type in VERSION_ITEM_KEYS}
+        self._versions = {item_type: {} for item_type in VERSION_ITEM_KEYS}
+        self._history = {}
+        self._leaves = {}
+        self._lineage = {}
+
+    '''
+    CONFIGURATION
+    '''
+
+    def set_latency(self, latency, template=None):
+        # template is an endpoint template such as /versions/{type}/{id}; None sets the
+        # latency of every endpoint without one of its own
+        with self._lock:
+            if template is None:
+                self._latency = latency
+            else:
+                self._latencies[template] = latency
+
+    def set_error_rate(self, error_rate, error_status=503):
+        with self._lock:
+            self._error_rate = error_rate
+            self._error_status = error_status
+
+    def inject_error(self, status_code=503, error=None, count=1, method=None, template=None, apply=False):
+        '''
+        Fails the next count requests matching method and endpoint template (None
+        matches any) with status_code, or by raising error from the transport if it
+        is given. With apply the request takes effect before failing, as when a
+        response is lost after the server acted on it.
+        '''
+        with self._lock:
+            self._faults.append(_Fault(status_code, error, count, method, template, apply))
+
+    def get_request_count(self, method=None, template=None):
+        with self._lock:
+            return sum(count for (request_method, request_template), count in self._counts.items()
+                       if (method is None or method == request_method)
+                       and (template is None or template == request_template))
+
+    def reset_request_counts(self):
+        with self._lock:
+            self._counts.clear()
+
+    '''
+    REQUEST HANDLING
+    '''
+
+    def get_latency(self, method, path):
+        template = get_endpoint_template(urllib.parse.urlsplit(path).path)
+        with self._lock:
+            return self._latencies.get(template, self._latency)
+
+    def request(self, method, path, body=None):
+        '''
+        Handles one request, without its latency, and returns the status code and
+        response body as bytes. Raises the error of an injected transport fault.
+        '''
+        path = urllib.parse.urlsplit(path).path
+        template = get_endpoint_template(path)
+
+        with self._lock:
+            self._counts[(method, template)] = self._counts.get((method, template), 0) + 1
+            fault = self._take_fault(method, template)
+            if fault is None or fault.apply:
+                status_code, payload = self._handle(method, path.strip("/").split("/"), body)
+                content = json.dumps(payload).encode()
+
+        if fault is None:
+            return status_code, content
+        if fault.error is not None:
+            raise fault.error
+        return fault.status_code, json.dumps({"message": "Injected error."}).encode()
+
+    def _take_fault(self, method, template):
+        for fault in self._faults:
+            if fault.matches(method, template):
+                fault.count -= 1
+                if fault.count <= 0:
+                    self._faults.remove(fault)
+                return fault
+
+        if self._error_rate and self._random.random() < self._error_rate:
+            return _Fault(self._error_status, None, 1, method, template, False)
+        return None
+
+    def _handle(self, method, parts, body):
+        # the body is copied the way sending it as JSON would, so callers' dicts are
+        # never kept
+        body = json.loads(json.dumps(body))
+        if method == "POST" and not isinstance(body, dict):
+            return 400, {"message": "Expected a JSON object."}
+
+        if parts[0] == "versions":
+            item_type = parts[1] if len(parts) > 1 else None
+            if method == "POST" and len(parts) == 2 and item_type in VERSION_ITEM_KEYS:
+                return self._create_version(item_type, body)
+            if method == "GET" and parts[1:4] == ["nodes", "adjacent", "lineage"] and len(parts) == 5:
+                return 200, self._lineage.get(_to_id(parts[4]), [])
+            if method == "GET" and len(parts) == 3 and item_type in VERSION_ITEM_KEYS:
+                return self._get(self._versions[item_type].get(_to_id(parts[2])))
+            return _not_found()
+
+        item_type = parts[0]
+        if item_type not in VERSION_ITEM_KEYS:
+            return _not_found()
+        if method == "POST" and len(parts) == 1:
+            return self._create_item(item_type, body)
+        if method != "GET" or len(parts) not in (2, 3):
+            return _not_found()
+
+        item = self._items[item_type].get(parts[1])
+        if len(parts) == 2 or item is None:
+            return self._get(item)
+        if parts[2] == "latest":
+            return 200, list(self._leaves[item["id"]])
+        if parts[2] == "history":
+            return 200, {str(parent_id): child_ids for parent_id, child_ids in self._history[item["id"]].items()}
+        return _not_found()
+
+    def _get(self, payload):
+        if payload is None:
+            return _not_found()
+        return 200, payload
+
+    def _allocate_id(self):
+        # items and versions of every type share one id space, as they do in Ground
+        id = self._next_id
+        self._next_id += 1
+        return id
+
+    def _set_tags(self, body, id):
+        tags = body.get("tags") or {}
+        body["tags"] = {key: dict(tag, id=id) for key, tag in tags.items()}
+
+    def _create_item(self, item_type, body):
+        source_key = body.get("sourceKey")
+        if not source_key:
+            return 400, {"message": "Missing sourceKey."}
+        if source_key in self._items[item_type]:
+            return 409, {"message": "Source key " + source_key + " is already in use."}
+
+        id = self._allocate_id()
+        body["id"] = id
+        self._set_tags(body, id)
+
+        self._items[item_type][source_key] = body
+        self._item_keys[item_type][id] = source_key
+        self._history[id] = {}
+        self._leaves[id] = []
+        return 200, body
+
+    def _create_version(self, item_type, body):
+        item_id = body.get(VERSION_ITEM_KEYS[item_type])
+        if item_id not in self._item_keys[item_type]:
+            return 404, {"message": "No " + item_type[:-1] + " with id " + str(item_id) + "."}
+
+        id = self._allocate_id()
+        body["id"] = id
+        self._set_tags(body, id)
+
+        # without explicit parents a new version follows the item's latest ones
+        parent_ids = body.pop("parentIds", None) or self._leaves[item_id] or [0]
+        history = self._history[item_id]
+        for parent_id in parent_ids:
+            history.setdefault(parent_id, []).append(id)
+        self._leaves[item_id] = [leaf for leaf in self._leaves[item_id] if leaf not in parent_ids] + [id]
+
+        if item_type == "lineage_edges":
+            for rich_version_id in {body.get("fromRichVersionId"), body.get("toRichVersionId")}:
+                self._lineage.setdefault(rich_version_id, []).append(body)
+
+        self._versions[item_type][id] = body
+        return 200, body
+
+
+def _not_found():
+    return 404, {"message": "Not found."}
+
+
+def _to_id(text):
+    return int(text) if text.isdigit() else None
+
+
+class FakeTransport(Transport):
+    '''
+    A Transport that hands requests straight to a FakeGroundServer, sleeping for
+    its latency first.
+    '''
+
+    def __init__(self, server, sleep=time.sleep):
+        self._server = server
+        self._sleep = sleep
+
+    def get_server(self):
+        return self._server
+
+    def _request(self, method, url, body=None):
+        latency = self._server.get_latency(method, url)
+        if latency:
+            self._sleep(latency)
+        return BufferedResponse(*self._server.request(method, url, body))
+
+    def get(self, url):
+        return self._request("GET", url)
+
+    def post(self, url, body):
+        return self._request("POST", url, body)
+
+
+class FakeAsyncTransport(AsyncTransport):
+    '''
+    The AsyncTransport version of FakeTransport; latency is waited out with
+    asyncio.sleep, so concurrent requests overlap.
+    '''
+
+    def __init__(self, server):
+        self._server = server
+
+    def get_server(self):
+        return self._server
+
+    async def _request(self, method, url, body=None):
+        latency = self._server.get_latency(method, url)
+        if latency:
+            await asyncio.sleep(latency)
+        return BufferedResponse(*self._server.request(method, url, body))
+
+    async def get(self, url):
+        return await self._request("GET", url)
+
+    async def post(self, url, body):
+        return await self._request("POST", url, body)
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, method, body=None):
+        server = self.server.ground_server
+        latency = server.get_latency(method, self.path)
+        if latency:
+            time.sleep(latency)
+
+        try:
+            status_code, content = server.request(method, self.path, body)
+        except Exception:
+            # an injected transport error: drop the connection without a response
+            self.close_connection = True
+            return
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._respond("POST", json.loads(self.rfile.read(length) or b"null"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGroundHTTPServer:
+    '''
+    Serves a FakeGroundServer over HTTP from a background thread, for exercising
+    the real transports and their connection pools. port=0 picks a free port;
+    point a client at it with GroundClient(get_hostname(), get_port()).
+    '''
+
+    def __init__(self, server=None, hostname="localhost", port=0):
+        self._server = server if server is not None else FakeGroundServer()
+        self._httpd = http.server.ThreadingHTTPServer((hostname, port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.ground_server = self._server
+        self._hostname = hostname
+        self._thread = None
+
+    def get_server(self):
+        return self._server
+
+    def get_hostname(self):
+        return self._hostname
+
+    def get_port(self):
+        return self._httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-ground-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,255 @@
+import asyncio
+import json
+
+import requests
+import requests.adapters
+import urllib3.exceptions
+
+from ground.deadline import DeadlineExceeded, get_remaining
+
+
+def get_timeouts(connect_timeout, read_timeout):
+    '''
+    Returns the connect and read timeouts for a request about to be sent: the
+    configured ones, cut down to whatever is left of the deadline in effect.
+    None means no limit. Raises DeadlineExceeded if no time is left at all.
+    '''
+    remaining = get_remaining()
+    if remaining is None:
+        return connect_timeout, read_timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("The deadline for this operation has passed.")
+
+    connect_timeout = remaining if connect_timeout is None else min(connect_timeout, remaining)
+    read_timeout = remaining if read_timeout is None else min(read_timeout, remaining)
+    return connect_timeout, read_timeout
+
+
+class Transport:
+    '''
+    The HTTP layer underneath GroundClient. Implementations return objects that
+    behave like requests.Response (status_code, content, json()); a response that
+    also has close() is closed when it is dropped to retry the request.
+
+    get_stream returns one whose body is read with iter_content(chunk_size) and
+    that has to be close()d; by default it is just get's response, read whole.
+    '''
+
+    def get(self, url):
+        raise NotImplementedError()
+
+    def get_stream(self, url):
+        return self.get(url)
+
+    def post(self, url, body):
+        raise NotImplementedError()
+
+    def is_transient_error(self, error):
+        # errors worth sending a GET again for
+        return isinstance(error, OSError)
+
+    def is_connect_error(self, error):
+        # errors that mean the request never reached the server, so even a POST can be
+        # sent again
+        return isinstance(error, ConnectionRefusedError)
+
+    def close(self):
+        pass
+
+
+class SessionTransport(Transport):
+    '''
+    A Transport backed by one pooled, keep-alive requests.Session.
+
+    pool_connections is the number of per-host pools kept around, pool_maxsize is
+    the number of connections kept open to any one host, and pool_block makes
+    pool_maxsize a hard per-host limit instead of a keep-alive limit.
+
+    connect_timeout and read_timeout are in seconds, None meaning no limit; the
+    read timeout bounds each wait for data, not the whole response.
+    '''
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, pool_block=False, keep_alive=True, connect_timeout=None,
+                 read_timeout=None):
+        self._session = requests.Session()
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections,
+                                                pool_maxsize=pool_maxsize,
+                                                pool_block=pool_block)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
+
+    def get_session(self):
+        return self._session
+
+    def _get_timeout(self):
+        timeouts = get_timeouts(self._connect_timeout, self._read_timeout)
+        if timeouts != (None, None):
+            return timeouts
+
+    def get(self, url):
+        return self._session.get(url, timeout=self._get_timeout())
+
+    def get_stream(self, url):
+        return self._session.get(url, stream=True, timeout=self._get_timeout())
+
+    def post(self, url, body):
+        return self._session.post(url, json=body, timeout=self._get_timeout())
+
+    def is_connect_error(self, error):
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            # requests wraps urllib3's MaxRetryError, whose reason says what failed
+            return isinstance(getattr(error.args[0], "reason", None), urllib3.exceptions.NewConnectionError)
+        return False
+
+    def close(self):
+        self._session.close()
+
+
+class BufferedResponse:
+    '''
+    A fully read response, for transports whose native response objects do not
+    outlive the connection they were read from.
+    '''
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class AsyncStreamedResponse:
+    '''
+    An AsyncTransport.get_stream response. iter_content(chunk_size) returns an
+    async iterator over the body, and close() is a coroutine that releases the
+    connection.
+    '''
+
+    def __init__(self, status_code, iter_chunks, release=None):
+        self.status_code = status_code
+        self._iter_chunks = iter_chunks
+        self._release = release
+
+    def iter_content(self, chunk_size):
+        return self._iter_chunks(chunk_size)
+
+    async def close(self):
+        if self._release is not None:
+            await self._release()
+
+
+class AsyncTransport:
+    '''
+    The asyncio counterpart of Transport, used by AsyncGroundClient. get_stream
+    returns an AsyncStreamedResponse; by default it wraps get's whole response.
+    '''
+
+    async def get(self, url):
+        raise NotImplementedError()
+
+    async def get_stream(self, url):
+        response = await self.get(url)
+
+        async def iter_chunks(chunk_size):
+            for chunk in response.iter_content(chunk_size):
+                yield chunk
+
+        return AsyncStreamedResponse(response.status_code, iter_chunks)
+
+    async def post(self, url, body):
+        raise NotImplementedError()
+
+    def is_transient_error(self, error):
+        return isinstance(error, (OSError, asyncio.TimeoutError))
+
+    def is_connect_error(self, error):
+        return isinstance(error, ConnectionRefusedError)
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(AsyncTransport):
+    '''
+    An AsyncTransport backed by one pooled aiohttp.ClientSession. Requires the
+    optional aiohttp dependency (pip install ground-client[async]).
+
+    pool_size caps the total number of open connections and pool_size_per_host
+    the number open to any one host (0 means no limit). connect_timeout and
+    read_timeout are in seconds, None meaning no limit; a deadline in effect
+    also caps the total time of each request.
+    '''
+
+    def __init__(self, pool_size=100, pool_size_per_host=0, keep_alive=True, connect_timeout=None, read_timeout=None):
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("AiohttpTransport requires aiohttp: pip install ground-client[async]")
+
+        self._aiohttp = aiohttp
+        self._pool_size = pool_size
+        self._pool_size_per_host = pool_size_per_host
+        self._keep_alive = keep_alive
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._session = None
+
+    def _get_session(self):
+        # the session binds to the running event loop, so it is created on first use
+        if self._session is None:
+            connector = self._aiohttp.TCPConnector(limit=self._pool_size,
+                                                   limit_per_host=self._pool_size_per_host,
+                                                   force_close=not self._keep_alive)
+            self._session = self._aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _get_options(self):
+        # aiohttp's own default timeout is left alone unless something limits this request
+        connect_timeout, read_timeout = get_timeouts(self._connect_timeout, self._read_timeout)
+        if connect_timeout is None and read_timeout is None:
+            return {}
+        return {"timeout": self._aiohttp.ClientTimeout(total=get_remaining(), sock_connect=connect_timeout,
+                                                       sock_read=read_timeout)}
+
+    async def get(self, url):
+        async with self._get_session().get(url, **self._get_options()) as response:
+            return BufferedResponse(response.status, await response.read())
+
+    async def get_stream(self, url):
+        response = await self._get_session().get(url, **self._get_options())
+
+        async def release():
+            response.release()
+
+        return AsyncStreamedResponse(response.status, response.content.iter_chunked, release)
+
+    async def post(self, url, body):
+        async with self._get_session().post(url, json=body, **self._get_options()) as response:
+            return BufferedResponse(response.status, await response.read())
+
+    def is_transient_error(self, error):
+        return isinstance(error, (OSError, asyncio.TimeoutError, self._aiohttp.ClientError))
+
+    def is_connect_error(self, error):
+        return isinstance(error, (ConnectionRefusedError, self._aiohttp.ClientConnectorError))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,342 @@
+import collections
+import concurrent.futures
+import threading
+import time
+
+from ground.batch import BatchItemError
+
+
+CREATE_METHODS = (
+    "create_edge", "create_edge_version", "create_graph", "create_graph_version", "create_node",
+    "create_node_version", "create_structure", "create_structure_version", "create_lineage_edge",
+    "create_lineage_edge_version", "create_lineage_graph", "create_lineage_graph_version",
+)
+
+
+# the argument naming the item a version is created for; without explicit parents the
+# server makes a new version follow the item's latest ones, so versions of one item
+# have to be sent in the order they were queued
+VERSION_ITEM_ARGUMENTS = {
+    "create_edge_version": "edge_id",
+    "create_graph_version": "graph_id",
+    "create_node_version": "node_id",
+    "create_structure_version": "structure_id",
+    "create_lineage_edge_version": "edge_id",
+    "create_lineage_graph_version": "lineage_graph_id",
+}
+
+
+class BufferFullError(RuntimeError):
+    '''
+    Raised when a write cannot be queued because the BufferedWriter already
+    holds max_pending writes and the caller would not wait (longer) for room.
+    '''
+
+
+class _Write:
+
+    __slots__ = ("method", "args", "kwargs", "future", "queued_at", "route")
+
+    def __init__(self, method, args, kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future = concurrent.futures.Future()
+        self.queued_at = time.monotonic()
+        self.route = None
+
+    def get_item(self):
+        # the item (id or future) this write creates a version of, None for an item
+        argument = VERSION_ITEM_ARGUMENTS.get(self.method)
+        if argument is None:
+            return None
+        item = self.args[0] if self.args else self.kwargs.get(argument)
+        if isinstance(item, concurrent.futures.Future) and item.done() and not item.cancelled():
+            if item.exception() is None:
+                return item.result().get_id()
+        return item
+
+
+class _Route:
+    # the queue the versions of one item go to, kept while any of them are pending,
+    # under every key (the item's future, its id) they have been queued with
+
+    __slots__ = ("queue", "pending", "keys")
+
+    def __init__(self, queue, key):
+        self.queue = queue
+        self.pending = 0
+        self.keys = [key]
+
+
+def _resolve(value):
+    # a future from an earlier write stands for the id of what that write created
+    if isinstance(value, concurrent.futures.Future):
+        return value.result().get_id()
+    if isinstance(value, list):
+        return [_resolve(item) for item in value]
+    return value
+
+
+class BufferedWriter:
+    '''
+    Write-behind for a GroundClient's create methods. Each create_* call queues
+    the write and returns at once with a concurrent.futures.Future, which is
+    resolved with the created model (its get_id() is the server-assigned id) or
+    fails with the error the write ran into, BatchItemError if the server
+    returned nothing.
+
+    Futures can be passed as arguments to later writes in place of the ids they
+    stand for, e.g. create_node_version(writer.create_node(...)); the later
+    write waits for them when it is sent.
+
+    Each of the background workers has its own queue. Versions of the same item
+    always go to the same worker, whether the item is given by its id or by the
+    future of the write creating it, so they are sent in the order they were
+    queued; other writes are spread over the workers, and are only ordered
+    against the writes whose futures they were given. A worker takes up to
+    batch_size queued writes at a time, as soon as that many are queued or the
+    oldest has waited flush_interval seconds, and sends each batch in order.
+
+    At most max_pending writes are held; once that many are, create_* calls
+    block until there is room, or raise BufferFullError if block is False or
+    timeout seconds pass. flush() waits for everything queued so far to be
+    sent, and close() drains the queues before stopping the workers.
+    '''
+
+    def __init__(self, client, max_pending=10000, batch_size=100, flush_interval=0.05, workers=4, block=True,
+                 timeout=None):
+        if max_pending <= 0 or batch_size <= 0 or workers <= 0:
+            raise ValueError("max_pending, batch_size and workers must be positive.")
+
+        self._client = client
+        self._max_pending = max_pending
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._block = block
+        self._timeout = timeout
+
+        self._queues = [collections.deque() for _ in range(workers)]
+        self._pending = 0
+        self._next_queue = 0
+        self._routes = {}
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._flushing = 0
+        self._closed = False
+
+        self._submitted = 0
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._blocked = 0
+
+        self._workers = [threading.Thread(target=self._run, args=(self._queues[index],),
+                                          name="ground-writer-" + str(index), daemon=True)
+                         for index in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def get_client(self):
+        return self._client
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                "pending": self._pending,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "written": self._written,
+                "failed": self._failed,
+                "batches": self._batches,
+                "blocked": self._blocked,
+            }
+
+    def submit(self, method, *args, **kwargs):
+        # queues client.method(*args, **kwargs) and returns its future
+        if method not in CREATE_METHODS:
+            raise ValueError("BufferedWriter only queues create methods, not " + method + ".")
+
+        write = _Write(method, args, kwargs)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("This BufferedWriter is closed.")
+
+            if self._pending >= self._max_pending:
+                self._wait_for_room()
+
+            queue = self._get_queue(write)
+            queue.append(write)
+            self._pending += 1
+            self._submitted += 1
+            # its worker is woken to start the flush timer, then again once a batch is full
+            if len(queue) == 1 or len(queue) == self._batch_size:
+                self._condition.notify_all()
+        return write.future
+
+    def _get_queue(self, write):
+        item = write.get_item()
+        if item is not None:
+            route = self._routes.get(item)
+            if route is None:
+                route = self._routes[item] = _Route(self._queues[hash(item) % len(self._queues)], item)
+            route.pending += 1
+            write.route = route
+            return route.queue
+
+        self._next_queue = (self._next_queue + 1) % len(self._queues)
+        return self._queues[self._next_queue]
+
+    def _wait_for_room(self):
+        if not self._block:
+            raise BufferFullError("BufferedWriter already holds " + str(self._max_pending) + " pending writes.")
+
+        self._blocked += 1
+        if not self._condition.wait_for(lambda: self._pending < self._max_pending or self._closed, self._timeout):
+            raise BufferFullError("Timed out waiting for room in the BufferedWriter.")
+        if self._closed:
+            raise RuntimeError("This BufferedWriter is closed.")
+
+    def flush(self, timeout=None):
+        '''
+        Sends everything queued so far without waiting for flush_interval, and waits
+        until it has been sent. Returns False if timeout seconds passed first.
+        '''
+        with self._condition:
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        # queued writes are still sent; new ones are refused
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _next_batch(self, queue):
+        with self._condition:
+            while True:
+                if queue:
+                    waited = time.monotonic() - queue[0].queued_at
+                    if (self._closed or self._flushing or len(queue) >= self._batch_size
+                            or waited >= self._flush_interval):
+                        break
+                    self._condition.wait(self._flush_interval - waited)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+
+            batch = [queue.popleft() for _ in range(min(self._batch_size, len(queue)))]
+            self._pending -= len(batch)
+            self._in_flight += len(batch)
+            self._batches += 1
+            # room was made for blocked callers, and the rest may make up another batch
+            self._condition.notify_all()
+            return batch
+
+    def _run(self, queue):
+        while True:
+            batch = self._next_batch(queue)
+            if batch is None:
+                return
+
+            written = 0
+            for write in batch:
+                written += self._send(write)
+
+            with self._condition:
+                for write in batch:
+                    self._release_route(write.route)
+                self._in_flight -= len(batch)
+                self._written += written
+                self._failed += len(batch) - written
+                self._condition.notify_all()
+
+    def _release_route(self, route):
+        if route is not None:
+            route.pending -= 1
+            if not route.pending:
+                for key in route.keys:
+                    del self._routes[key]
+
+    def _route_created(self, future, result):
+        # versions queued from now on under the new item's id go where those queued
+        # under its future went; done before anyone can see the id
+        with self._condition:
+            route = self._routes.get(future)
+            if route is not None and result.get_id() not in self._routes:
+                self._routes[result.get_id()] = route
+                route.keys.append(result.get_id())
+
+    def _send(self, write):
+        if not write.future.set_running_or_notify_cancel():
+            return False
+
+        try:
+            args = [_resolve(arg) for arg in write.args]
+            kwargs = {key: _resolve(value) for key, value in write.kwargs.items()}
+            result = getattr(self._client, write.method)(*args, **kwargs)
+            if result is None:
+                raise BatchItemError("Server returned no result for " + write.method + ".")
+        except Exception as error:
+            write.future.set_exception(error)
+            return False
+
+        self._route_created(write.future, result)
+        write.future.set_result(result)
+        return True
+
+    '''
+    CREATE METHODS
+    '''
+
+    def create_edge(self, *args, **kwargs):
+        return self.submit("create_edge", *args, **kwargs)
+
+    def create_edge_version(self, *args, **kwargs):
+        return self.submit("create_edge_version", *args, **kwargs)
+
+    def create_graph(self, *args, **kwargs):
+        return self.submit("create_graph", *args, **kwargs)
+
+    def create_graph_version(self, *args, **kwargs):
+        return self.submit("create_graph_version", *args, **kwargs)
+
+    def create_node(self, *args, **kwargs):
+        return self.submit("create_node", *args, **kwargs)
+
+    def create_node_version(self, *args, **kwargs):
+        return self.submit("create_node_version", *args, **kwargs)
+
+    def create_structure(self, *args, **kwargs):
+        return self.submit("create_structure", *args, **kwargs)
+
+    def create_structure_version(self, *args, **kwargs):
+        return self.submit("create_structure_version", *args, **kwargs)
+
+    def create_lineage_edge(self, *args, **kwargs):
+        return self.submit("create_lineage_edge", *args, **kwargs)
+
+    def create_lineage_edge_version(self, *args, **kwargs):
+        return self.submit("create_lineage_edge_version", *args, **kwargs)
+
+    def create_lineage_graph(self, *args, **kwargs):
+        return self.submit("create_lineage_graph", *args, **kwargs)
+
+    def create_lineage_graph_version(self, *args, **kwargs):
+        return self.submit("create_lineage_graph_version", *args, **kwargs)
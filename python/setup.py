@@ -3,6 +3,7 @@ from setuptools import setup, find_packages
 NAME = "ground-client"
 VERSION = "0.1.2"
 REQUIRES = ["requests >= 2.17.0"]
+EXTRAS = {"async": ["aiohttp >= 3.0"], "numpy": ["numpy"], "orjson": ["orjson"]}
 
 setup(
     name=NAME,
@@ -10,5 +11,6 @@ setup(
     description="Python Ground API client",
     packages=find_packages(),
     install_requires=REQUIRES,
+    extras_require=EXTRAS,
     include_package_date=True
 )
@@ -0,0 +1,89 @@
+import asyncio
+import inspect
+import json
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.transport import AsyncTransport, BufferedResponse
+
+
+class StubAsyncTransport(AsyncTransport):
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _respond(self, payload):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return BufferedResponse(200, json.dumps(payload).encode())
+
+    async def get(self, url):
+        self.calls.append(("GET", url, None))
+        return await self._respond({"id": int(url.rsplit("/", 1)[1]), "nodeId": 1})
+
+    async def post(self, url, body):
+        self.calls.append(("POST", url, body))
+        return await self._respond(dict(body, id=2))
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def test_mirrors_sync_client(self):
+        """
+        Tests that every public GroundClient method has a coroutine counterpart
+        """
+        sync_only = ("get_spool", "load_graph", "resolve_id")
+        for name, method in inspect.getmembers(client.GroundClient, inspect.isfunction):
+            if not name.startswith("_"):
+                self.assertEqual(hasattr(AsyncGroundClient, name), name not in sync_only, msg=name)
+
+            # accessors like get_transport() do no I/O and stay plain methods
+            if (name.startswith(("create_", "get_")) and name not in sync_only
+                    and not hasattr(client.BaseGroundClient, name)
+                    and len(inspect.signature(method).parameters) > 1):
+                self.assertTrue(
+                    inspect.iscoroutinefunction(getattr(AsyncGroundClient, name, None)),
+                    msg="AsyncGroundClient is missing coroutine {}".format(name)
+                )
+
+    def test_requests(self):
+        """
+        Tests that the async client builds the same requests as the sync client
+        """
+        async def run():
+            transport = StubAsyncTransport()
+            async with AsyncGroundClient(transport=transport) as ground_client:
+                node_version = await ground_client.create_node_version(1, tags={"a": {"key": "a"}})
+                retrieved = await ground_client.get_node_version(7)
+            return transport, node_version, retrieved
+
+        transport, node_version, retrieved = asyncio.run(run())
+        self.assertEqual(
+            transport.calls[0],
+            ("POST", "http://localhost:9000/versions/nodes", {"nodeId": 1, "tags": {"a": {"key": "a"}}})
+        )
+        self.assertEqual(node_version.get_id(), 2)
+        self.assertEqual(retrieved.get_id(), 7)
+
+    def test_concurrency_limit(self):
+        """
+        Tests that max_concurrency bounds the requests in flight
+        """
+        async def run():
+            transport = StubAsyncTransport()
+            ground_client = AsyncGroundClient(transport=transport, max_concurrency=3)
+            await asyncio.gather(*[ground_client.get_node_version(i) for i in range(20)])
+            return transport
+
+        transport = asyncio.run(run())
+        self.assertEqual(len(transport.calls), 20)
+        self.assertEqual(transport.max_in_flight, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.batch import BatchItemError
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+def respond(body):
+    # source keys starting with "bad" are rejected, "boom" breaks the connection
+    source_key = body.get("sourceKey", "")
+    if source_key.startswith("boom"):
+        raise ConnectionError(source_key)
+    if source_key.startswith("bad"):
+        return BufferedResponse(400, b"{}")
+    return BufferedResponse(200, json.dumps(dict(body, id=int(source_key.split("-")[1]))).encode())
+
+
+class SlowTransport(Transport):
+
+    def __init__(self):
+        self.threads = set()
+
+    def post(self, url, body):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return respond(body)
+
+
+class StubAsyncTransport(AsyncTransport):
+
+    async def post(self, url, body):
+        await asyncio.sleep(0)
+        return respond(body)
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_create_nodes(self):
+        """
+        Tests that bulk creates run in parallel and keep input order
+        """
+        transport = SlowTransport()
+        with client.GroundClient(transport=transport, workers=8) as ground_client:
+            result = ground_client.create_nodes([("node-" + str(i), "node") for i in range(40)])
+
+        self.assertTrue(result.is_successful())
+        self.assertEqual([node.get_id() for node in result], list(range(40)))
+        self.assertGreater(len(transport.threads), 1)
+
+    def test_errors_per_item(self):
+        """
+        Tests that a failed item does not fail the rest of the batch
+        """
+        with client.GroundClient(transport=SlowTransport()) as ground_client:
+            result = ground_client.create_nodes([
+                {"source_key": "node-1", "name": "a"},
+                {"source_key": "bad-2", "name": "b"},
+                {"source_key": "boom-3", "name": "c"},
+                {"source_key": "node-4", "name": "d", "tags": {"k": {"key": "k", "value": 1}}},
+            ])
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(result[0].get_id(), 1)
+        self.assertIsNone(result[1])
+        self.assertIsNone(result[2])
+        self.assertEqual(result[3].get_tags()["k"].get_value(), 1)
+        self.assertIsInstance(result.get_errors()[1], BatchItemError)
+        self.assertIsInstance(result.get_errors()[2], ConnectionError)
+
+    def test_async_create_nodes(self):
+        """
+        Tests the async bulk creates
+        """
+        async def run():
+            ground_client = AsyncGroundClient(transport=StubAsyncTransport())
+            return await ground_client.create_nodes([("node-1", "a"), ("bad-2", "b")])
+
+        result = asyncio.run(run())
+        self.assertEqual(result[0].get_id(), 1)
+        self.assertEqual(list(result.get_errors()), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
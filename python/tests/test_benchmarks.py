@@ -0,0 +1,90 @@
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def load_suite():
+    spec = importlib.util.spec_from_file_location("suite", os.path.join(BENCHMARKS, "suite.py"))
+    suite = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(suite)
+    return suite
+
+
+suite = load_suite()
+
+
+def results(**metrics):
+    return {"results": {name: suite.metric(value, "x", higher_is_better)
+                        for name, (value, higher_is_better) in metrics.items()}}
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_threshold(self):
+        """
+        Tests that only changes for the worse beyond the threshold are regressions
+        """
+        rows = suite.compare(results(a=(100, True), b=(100, True), c=(100, True)),
+                             results(a=(91, True), b=(89, True), c=(150, True)), 0.1)
+        self.assertEqual([(name, round(change, 2), regressed) for name, _, _, change, regressed in rows],
+                         [("a", -0.09, False), ("b", -0.11, True), ("c", 0.5, False)])
+
+    def test_lower_is_better(self):
+        """
+        Tests that a metric where lower is better regresses when it goes up
+        """
+        rows = suite.compare(results(latency=(10, False), memory=(10, False)),
+                             results(latency=(12, False), memory=(5, False)), 0.1)
+        self.assertEqual([(name, change, regressed) for name, _, _, change, regressed in rows],
+                         [("latency", -0.2, True), ("memory", 0.5, False)])
+
+    def test_skipped(self):
+        """
+        Tests that metrics with a zero baseline, or missing from either run, are left out
+        """
+        rows = suite.compare(results(zero=(0, False), old=(1, True), both=(1, True)),
+                             results(zero=(5, False), new=(1, True), both=(1, True)), 0.1)
+        self.assertEqual([row[0] for row in rows], ["both"])
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_quick_run(self):
+        """
+        Tests a quick run of the suite script from outside its directory, and comparing it with itself
+        """
+        output = os.path.join(self.directory, "results.json")
+        environment = dict(os.environ, PYTHONPATH=os.path.dirname(BENCHMARKS))
+        subprocess.run([sys.executable, os.path.join(BENCHMARKS, "suite.py"), "run", "--quick", "--only", "create",
+                        "get_latency", "--output", output], cwd=self.directory, env=environment, check=True,
+                       stderr=subprocess.DEVNULL)
+
+        with open(output) as output_file:
+            run = json.load(output_file)
+        self.assertTrue(run["meta"]["quick"])
+        self.assertIn("create_node.throughput", run["results"])
+        self.assertIn("get_edge_version.p99", run["results"])
+
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            self.assertEqual(suite.main(["compare", output, output]), 0)
+        self.assertNotIn("REGRESSION", printed.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import unittest
+
+import ground.client as client
+from ground.cache import LRUCache, TTLCache
+from ground.transport import BufferedResponse, Transport
+
+
+class CountingTransport(Transport):
+
+    def __init__(self):
+        self.gets = []
+
+    def get(self, url):
+        self.gets.append(url)
+        if url.endswith("/latest"):
+            return BufferedResponse(200, json.dumps([len(self.gets)]).encode())
+        if "/versions/" not in url:
+            return BufferedResponse(200, json.dumps({"id": 1, "sourceKey": url.rsplit("/", 1)[1]}).encode())
+        return BufferedResponse(200, json.dumps({"id": int(url.rsplit("/", 1)[1]), "nodeId": 1}).encode())
+
+    def post(self, url, body):
+        return BufferedResponse(200, json.dumps(dict(body, id=100)).encode())
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_eviction(self):
+        """
+        Tests that the least recently used entry is evicted first
+        """
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.get_stats(), {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "evictions": 1})
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_expiry(self):
+        """
+        Tests that entries expire after the ttl
+        """
+        now = [0]
+        cache = TTLCache(10, clock=lambda: now[0])
+        cache.put("a", 1)
+
+        now[0] = 9
+        self.assertEqual(cache.get("a"), 1)
+        now[0] = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+
+
+class TestVersionCache(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        """
+        Tests that versions are not cached unless asked for
+        """
+        transport = CountingTransport()
+        ground_client = client.GroundClient(transport=transport)
+        ground_client.get_node_version(1)
+        ground_client.get_node_version(1)
+
+        self.assertIsNone(ground_client.get_version_cache())
+        self.assertEqual(len(transport.gets), 2)
+
+    def test_read_through(self):
+        """
+        Tests that get_*_version and create_*_version fill the cache
+        """
+        transport = CountingTransport()
+        ground_client = client.GroundClient(transport=transport, version_cache_size=10)
+
+        first = ground_client.get_node_version(1)
+        self.assertIs(ground_client.get_node_version(1), first)
+        self.assertIsNone(ground_client.get_edge_version(1).get_edge_id())
+
+        created = ground_client.create_node_version(1)
+        self.assertIs(ground_client.get_node_version(100), created)
+
+        self.assertEqual(len(transport.gets), 2)
+        stats = ground_client.get_version_cache().get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+
+class TestLookupCache(unittest.TestCase):
+
+    def test_per_type_ttl(self):
+        """
+        Tests that only item types given a ttl are cached
+        """
+        transport = CountingTransport()
+        ground_client = client.GroundClient(transport=transport, lookup_cache_ttl={"nodes": 60})
+
+        node = ground_client.get_node("a")
+        self.assertIs(ground_client.get_node("a"), node)
+        ground_client.get_edge("a")
+        ground_client.get_edge("a")
+
+        self.assertIsNone(ground_client.get_lookup_cache("edges"))
+        self.assertEqual(len(transport.gets), 3)
+
+    def test_invalidated_by_own_write(self):
+        """
+        Tests that creating a version drops the cached latest versions of its item
+        """
+        transport = CountingTransport()
+        ground_client = client.GroundClient(transport=transport, lookup_cache_ttl=60)
+
+        node = ground_client.get_node("a")
+        latest = ground_client.get_node_latest_versions("a")
+        self.assertEqual(ground_client.get_node_latest_versions("a"), latest)
+
+        ground_client.create_node_version(node.get_id())
+        self.assertNotEqual(ground_client.get_node_latest_versions("a"), latest)
+
+        # an item this client has not seen invalidates every latest lookup of its type
+        latest = ground_client.get_node_latest_versions("a")
+        ground_client.create_node_version(2)
+        self.assertNotEqual(ground_client.get_node_latest_versions("a"), latest)
+        self.assertEqual(len(transport.gets), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,26 @@
+import os
 import unittest
 import uuid
 
 import ground.client as client
+from ground.testing import FakeGroundServer, FakeTransport
 
 
 class TestClient(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.client = client.GroundClient()
+        # GROUND_SERVER=hostname:port runs these against a real server instead of the fake
+        server = os.environ.get("GROUND_SERVER")
+        if server:
+            hostname, port = server.rsplit(":", 1)
+            cls.client = client.GroundClient(hostname, int(port))
+        else:
+            cls.client = client.GroundClient(transport=FakeTransport(FakeGroundServer()))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
 
     def test_node(self):
         """
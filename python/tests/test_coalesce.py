@@ -0,0 +1,191 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.coalesce import AsyncSingleFlight, SingleFlight
+from ground.deadline import DeadlineExceeded, check_deadline, deadline_scope, get_remaining
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+def node_version(url):
+    return BufferedResponse(200, json.dumps({"id": int(url.rsplit("/", 1)[1]), "nodeId": 1}).encode())
+
+
+class GatedTransport(Transport):
+
+    def __init__(self):
+        self.gets = []
+        self.release = threading.Event()
+
+    def get(self, url):
+        self.gets.append(url)
+        self.release.wait(5)
+        return node_version(url)
+
+
+class GatedAsyncTransport(AsyncTransport):
+
+    def __init__(self):
+        self.gets = []
+
+    async def get(self, url):
+        self.gets.append(url)
+        await asyncio.sleep(0.01)
+        return node_version(url)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_error_shared(self):
+        """
+        Tests that waiters see the exception of the call they waited on
+        """
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise ValueError("down")
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(single_flight.do, "k", fail)
+            started.wait(5)
+            follower = executor.submit(single_flight.do, "k", fail)
+            while single_flight.get_shared_count() == 0:
+                pass
+            release.set()
+
+            self.assertRaises(ValueError, leader.result)
+            self.assertRaises(ValueError, follower.result)
+
+    def test_leader_deadline(self):
+        """
+        Tests that a waiter runs the call again when the first caller's own deadline
+        passes, bounded only by its own deadline
+        """
+        single_flight = SingleFlight()
+        remaining = []
+
+        def call():
+            remaining.append(get_remaining())
+            time.sleep(0.1)
+            check_deadline()
+            return len(remaining)
+
+        def lead():
+            with deadline_scope(0.05):
+                return single_flight.do("k", call)
+
+        def wait():
+            with deadline_scope(5):
+                return single_flight.do("k", call)
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(lead)
+            while not remaining:
+                time.sleep(0.001)
+            waiter = executor.submit(wait)
+
+            self.assertRaises(DeadlineExceeded, leader.result)
+            self.assertEqual(waiter.result(), 2)
+
+        self.assertLessEqual(remaining[0], 0.05)
+        self.assertGreater(remaining[1], 1)
+
+    def test_async_leader_deadline(self):
+        """
+        Tests that async waiters run the call again when the first caller's deadline passes
+        """
+        single_flight = AsyncSingleFlight()
+        remaining = []
+
+        async def call():
+            remaining.append(get_remaining())
+            await asyncio.sleep(0.1)
+            check_deadline()
+            return len(remaining)
+
+        async def lead():
+            with deadline_scope(0.05):
+                return await single_flight.do("k", call)
+
+        async def run():
+            leader = asyncio.ensure_future(lead())
+            await asyncio.sleep(0)
+            results = await asyncio.gather(leader, single_flight.do("k", call), return_exceptions=True)
+            return [type(result) if isinstance(result, Exception) else result for result in results]
+
+        self.assertEqual(asyncio.run(run()), [DeadlineExceeded, 2])
+        self.assertIsNone(remaining[1])
+
+    def test_async_leader_cancelled(self):
+        """
+        Tests that cancelling the first caller does not cancel the call for the others
+        """
+        single_flight = AsyncSingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            return 7
+
+        async def run():
+            leader = asyncio.ensure_future(single_flight.do("k", call))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(single_flight.do("k", call))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower, leader.cancelled()
+
+        self.assertEqual(asyncio.run(run()), (7, True))
+        self.assertEqual(single_flight.get_shared_count(), 1)
+
+
+class TestCoalescing(unittest.TestCase):
+
+    def test_threads(self):
+        """
+        Tests that concurrent identical GETs from threads share one request
+        """
+        transport = GatedTransport()
+        ground_client = client.GroundClient(transport=transport, coalesce_gets=True)
+
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(ground_client.get_node_version, 7) for _ in range(8)]
+            while ground_client.get_single_flight().get_shared_count() < 7:
+                pass
+            transport.release.set()
+            versions = [future.result() for future in futures]
+
+        self.assertEqual(transport.gets, ["http://localhost:9000/versions/nodes/7"])
+        self.assertTrue(all(version.get_id() == 7 for version in versions))
+
+        # once the call has finished, the next one goes to the server again
+        ground_client.get_node_version(7)
+        self.assertEqual(len(transport.gets), 2)
+
+    def test_async(self):
+        """
+        Tests that concurrent identical GETs from tasks share one request
+        """
+        async def run():
+            transport = GatedAsyncTransport()
+            ground_client = AsyncGroundClient(transport=transport, coalesce_gets=True)
+            versions = await asyncio.gather(*[ground_client.get_node_version(i % 2) for i in range(10)])
+            return transport, versions
+
+        transport, versions = asyncio.run(run())
+        self.assertEqual(sorted(transport.gets), [
+            "http://localhost:9000/versions/nodes/0", "http://localhost:9000/versions/nodes/1"
+        ])
+        self.assertEqual([version.get_id() for version in versions], [i % 2 for i in range(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
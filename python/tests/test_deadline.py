@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.deadline import (ContextThreadPoolExecutor, Deadline, DeadlineExceeded, deadline_scope, get_deadline,
+                             get_remaining, use_deadline, wait_within)
+from ground.retry import RetryPolicy
+from ground.transport import AsyncTransport, BufferedResponse, Transport, get_timeouts
+
+
+NODE_VERSION = {"id": 1, "nodeId": 2}
+
+
+class SlowTransport(Transport):
+    '''
+    Answers every GET with NODE_VERSION after delay seconds, remembering the
+    deadline time left when each request was sent.
+    '''
+
+    def __init__(self, delay, status_code=200):
+        self.remaining = []
+        self._delay = delay
+        self._status_code = status_code
+
+    def get(self, url):
+        self.remaining.append(get_remaining())
+        time.sleep(self._delay)
+        return BufferedResponse(self._status_code, json.dumps(NODE_VERSION).encode())
+
+
+class SlowAsyncTransport(AsyncTransport):
+
+    def __init__(self, delay):
+        self.remaining = []
+        self._delay = delay
+
+    async def get(self, url):
+        self.remaining.append(get_remaining())
+        await asyncio.sleep(self._delay)
+        return BufferedResponse(200, json.dumps(NODE_VERSION).encode())
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_deadline(self):
+        """
+        Tests the time remaining and expiry of a Deadline
+        """
+        clock = FakeClock()
+        deadline = Deadline(2.0, clock)
+        self.assertEqual(deadline.get_remaining(), 2.0)
+        deadline.check()
+
+        clock.now = 3.0
+        self.assertEqual(deadline.get_remaining(), 0.0)
+        self.assertTrue(deadline.is_expired())
+        self.assertRaises(DeadlineExceeded, deadline.check)
+
+    def test_nesting(self):
+        """
+        Tests that the sooner of two nested deadlines is the one in effect
+        """
+        self.assertIsNone(get_deadline())
+        with deadline_scope(None) as outer:
+            self.assertIsNone(outer)
+
+        with deadline_scope(10) as outer:
+            with deadline_scope(60) as inner:
+                self.assertIs(inner, outer)
+            with deadline_scope(1) as inner:
+                self.assertIsNot(inner, outer)
+                self.assertLessEqual(get_remaining(), 1)
+            self.assertIs(get_deadline(), outer)
+        self.assertIsNone(get_deadline())
+
+    def test_executor(self):
+        """
+        Tests that executor tasks see the deadline of the thread that submitted them
+        """
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            with deadline_scope(10) as deadline:
+                self.assertIs(executor.submit(get_deadline).result(), deadline)
+            self.assertIsNone(executor.submit(get_deadline).result())
+
+    def test_timeouts(self):
+        """
+        Tests that transport timeouts are capped by the time remaining
+        """
+        self.assertEqual(get_timeouts(1.0, None), (1.0, None))
+        with use_deadline(Deadline(0.5)):
+            connect_timeout, read_timeout = get_timeouts(1.0, None)
+            self.assertLessEqual(connect_timeout, 0.5)
+            self.assertLessEqual(read_timeout, 0.5)
+
+        with use_deadline(Deadline(0)):
+            self.assertRaises(DeadlineExceeded, get_timeouts, 1.0, 1.0)
+
+    def test_versions(self):
+        """
+        Tests that a multi-get stops sending requests once its deadline has passed
+        """
+        transport = SlowTransport(0.05)
+        with client.GroundClient(transport=transport, workers=1) as ground_client:
+            self.assertEqual(len(ground_client.get_node_versions([1, 2], deadline=1)), 2)
+            self.assertTrue(all(remaining <= 1 for remaining in transport.remaining))
+
+            with self.assertRaises(DeadlineExceeded):
+                ground_client.get_node_versions(list(range(3, 23)), deadline=0.2)
+            self.assertLess(len(transport.remaining), 20)
+
+            # the deadline only applied to that call
+            self.assertEqual(ground_client.get_node_version(30).get_id(), 1)
+            self.assertIsNone(transport.remaining[-1])
+
+    def test_backoff(self):
+        """
+        Tests that a retry is not waited for when the deadline would pass first
+        """
+        transport = SlowTransport(0, status_code=503)
+        policy = RetryPolicy(backoff=10.0, jitter=False)
+        with client.GroundClient(transport=transport, retry_policy=policy) as ground_client:
+            with deadline_scope(1):
+                self.assertRaises(DeadlineExceeded, ground_client.get_node_version, 1)
+
+        self.assertEqual(len(transport.remaining), 1)
+        self.assertEqual(policy.get_stats()["retries"], 0)
+
+    def test_async(self):
+        """
+        Tests that an async multi-get is cancelled once its deadline has passed
+        """
+        transport = SlowAsyncTransport(0.5)
+
+        async def run():
+            async with AsyncGroundClient(transport=transport) as ground_client:
+                with self.assertRaises(DeadlineExceeded):
+                    await ground_client.get_node_versions([1, 2], deadline=0.05)
+                return await wait_within(Deadline(5), ground_client.get_node_version(3))
+
+        self.assertEqual(asyncio.run(run()).get_id(), 1)
+        # the deadline reached the requests of the multi-get, as well as the single get
+        self.assertTrue(all(remaining is not None and remaining <= 5 for remaining in transport.remaining))
+
+    def test_coalesced_wait(self):
+        """
+        Tests that a caller waiting on a coalesced call gives up at its own deadline
+        """
+        transport = SlowTransport(0.5)
+        with client.GroundClient(transport=transport, coalesce_gets=True) as ground_client:
+            with ContextThreadPoolExecutor(1) as executor:
+                leader = executor.submit(ground_client.get_node_version, 1)
+                while not transport.remaining:
+                    time.sleep(0.001)
+
+                started = time.monotonic()
+                with deadline_scope(0.05):
+                    self.assertRaises(DeadlineExceeded, ground_client.get_node_version, 1)
+                self.assertLess(time.monotonic() - started, 0.4)
+                self.assertEqual(leader.result().get_id(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import unittest
+from unittest import mock
+
+import ground.client as client
+import ground.common.model as model
+import ground.decode as decode
+from ground.transport import BufferedResponse, Transport
+
+
+NODE_VERSION = {"id": 1, "nodeId": 2, "tags": {"k": {"key": "k", "value": 1, "type": "integer"}}}
+NODE = {"id": 2, "name": "n", "sourceKey": "n", "tags": {"k": {"key": "k", "value": 1, "type": "integer"}}}
+
+
+class DecodeTransport(Transport):
+
+    def get(self, url):
+        payload = NODE_VERSION if "/versions/" in url else NODE
+        return BufferedResponse(200, json.dumps(payload).encode())
+
+
+class TestDecode(unittest.TestCase):
+
+    def test_decode(self):
+        """
+        Tests decoding one payload and a list of them, with both backends
+        """
+        content = json.dumps(NODE_VERSION).encode()
+        for orjson in (decode.orjson, None):
+            with mock.patch.object(decode, "orjson", orjson):
+                node_version = decode.decode(model.core.node_version.NodeVersion, content)
+                self.assertEqual(node_version, model.core.node_version.NodeVersion(json.loads(content)))
+
+                nodes = decode.decode(model.core.node.Node, json.dumps([NODE, NODE]).encode())
+                self.assertEqual([node.get_tags()["k"].get_value() for node in nodes], [1, 1])
+
+                self.assertRaises(ValueError, decode.loads, b"{")
+
+    def test_skip_tags(self):
+        """
+        Tests that no tags are built when they are not asked for
+        """
+        node = decode.decode(model.core.node.Node, json.dumps(NODE).encode(), tags=False)
+        self.assertEqual(node.get_tags(), {})
+        self.assertEqual(node.get_source_key(), "n")
+
+        with client.GroundClient(transport=DecodeTransport(), decode_tags=False) as ground_client:
+            self.assertEqual(ground_client.get_node_version(1).get_tags(), {})
+            self.assertEqual(ground_client.get_node("n").get_tags(), {})
+
+        with client.GroundClient(transport=DecodeTransport()) as ground_client:
+            self.assertEqual(ground_client.get_node_version(1).get_tags(), NODE_VERSION["tags"])
+
+
+if __name__ == '__main__':
+    unittest.main()
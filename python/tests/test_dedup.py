@@ -0,0 +1,171 @@
+import asyncio
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.dedup import get_content_hash, get_duplicate_candidates
+from ground.testing import FakeAsyncTransport, FakeGroundServer, FakeTransport
+
+
+TAGS = {"run": {"key": "run", "value": 1, "type": "integer"}}
+
+
+class TestGetOrCreate(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeGroundServer()
+
+    def get_client(self, **kwargs):
+        return client.GroundClient(transport=FakeTransport(self.server), **kwargs)
+
+    def test_round_trips(self):
+        """
+        Tests that get_or_create_* only asks the server about source keys it has not seen
+        """
+        with self.get_client() as ground_client:
+            node = ground_client.get_or_create_node("n", "n")
+            self.assertEqual(self.server.get_request_count("GET"), 1)
+            self.assertEqual(self.server.get_request_count("POST"), 1)
+
+            self.server.reset_request_counts()
+            self.assertEqual(ground_client.get_or_create_node("n", "n"), node)
+            self.assertEqual(self.server.get_request_count(), 0)
+
+        with self.get_client() as ground_client:
+            self.assertEqual(ground_client.get_or_create_node("n", "n").get_id(), node.get_id())
+            self.assertEqual(self.server.get_request_count(), 1)
+
+    def test_item_types(self):
+        """
+        Tests get_or_create_* for every item type
+        """
+        with self.get_client() as ground_client:
+            node = ground_client.get_or_create_node("n", "n")
+            edge = ground_client.get_or_create_edge("e", "e", node.get_id(), node.get_id())
+            self.assertEqual(edge.get_from_node_id(), node.get_id())
+
+            for get_or_create in (ground_client.get_or_create_graph, ground_client.get_or_create_structure,
+                                  ground_client.get_or_create_lineage_edge, ground_client.get_or_create_lineage_graph):
+                item = get_or_create("i", "i")
+                self.assertEqual(get_or_create("i", "i"), item)
+
+    def test_created_elsewhere(self):
+        """
+        Tests that an item created between the lookup and the create is returned
+        """
+        class RacingTransport(FakeTransport):
+            def post(self, url, body):
+                self.get_server().request("POST", url, body)
+                return super().post(url, body)
+
+        with client.GroundClient(transport=RacingTransport(self.server)) as ground_client:
+            node = ground_client.get_or_create_node("n", "n")
+        self.assertEqual(node.get_source_key(), "n")
+
+
+class TestVersionDedup(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeGroundServer()
+        with client.GroundClient(transport=FakeTransport(self.server)) as ground_client:
+            self.node = ground_client.create_node("n", "n")
+            self.version = ground_client.create_node_version(self.node.get_id(), reference="r", tags=TAGS)
+
+    def get_client(self):
+        return client.GroundClient(transport=FakeTransport(self.server), version_cache_size=10, dedup_versions=True)
+
+    def test_rerun(self):
+        """
+        Tests that a version identical to the latest one is not written again
+        """
+        with self.get_client() as ground_client:
+            node = ground_client.get_or_create_node("n", "n")
+            version = ground_client.create_node_version(node.get_id(), reference="r", tags=TAGS)
+            self.assertEqual(version.get_id(), self.version.get_id())
+
+            changed = ground_client.create_node_version(node.get_id(), reference="s", tags=TAGS)
+            self.assertNotEqual(changed.get_id(), self.version.get_id())
+
+            # its hash is known and it is cached, so only the history is looked up
+            self.server.reset_request_counts()
+            self.assertEqual(ground_client.create_node_version(node.get_id(), reference="s", tags=TAGS), changed)
+            self.assertEqual(self.server.get_request_count(), 1)
+        self.assertEqual(self.server.get_request_count("POST"), 0)
+
+    def test_tags_round_trip(self):
+        """
+        Tests that the tags of a version read back can be written again as they are
+        """
+        with self.get_client() as ground_client:
+            ground_client.get_or_create_node("n", "n")
+            tags = ground_client.get_node_version(self.version.get_id()).get_tags()
+            version = ground_client.create_node_version(self.node.get_id(), reference="r", tags=tags)
+            self.assertEqual(version.get_id(), self.version.get_id())
+
+            changed = ground_client.create_node_version(self.node.get_id(), reference="t", tags=tags)
+            self.assertEqual(changed.get_tags()["run"]["value"], 1)
+
+    def test_explicit_parents(self):
+        """
+        Tests dedup against the parent and against a sibling with the same parents
+        """
+        with self.get_client() as ground_client:
+            ground_client.get_or_create_node("n", "n")
+            parent_ids = [self.version.get_id()]
+            same = ground_client.create_node_version(self.node.get_id(), reference="r", tags=TAGS,
+                                                     parent_ids=parent_ids)
+            self.assertEqual(same.get_id(), self.version.get_id())
+
+            child = ground_client.create_node_version(self.node.get_id(), reference="c", parent_ids=parent_ids)
+            self.assertEqual(ground_client.create_node_version(self.node.get_id(), reference="c",
+                                                               parent_ids=parent_ids), child)
+            self.assertEqual(ground_client.get_node_latest_versions("n"), [child.get_id()])
+
+    def test_unknown_item(self):
+        """
+        Tests that versions of items the client has not seen are always written
+        """
+        with self.get_client() as ground_client:
+            version = ground_client.create_node_version(self.node.get_id(), reference="r", tags=TAGS)
+            self.assertNotEqual(version.get_id(), self.version.get_id())
+
+    def test_content_hash(self):
+        """
+        Tests that content hashes ignore ids, parents, unset fields and tag ids
+        """
+        body = {"nodeId": 1, "reference": "r", "tags": TAGS, "parentIds": [2]}
+        payload = {"id": 3, "nodeId": 1, "reference": "r", "referenceParameters": {}, "structureVersionId": -1,
+                   "tags": {"run": dict(TAGS["run"], id=3)}}
+        self.assertEqual(get_content_hash(body), get_content_hash(payload))
+        self.assertNotEqual(get_content_hash(body), get_content_hash(dict(body, nodeId=4)))
+
+    def test_candidates(self):
+        """
+        Tests which latest versions a new version could duplicate
+        """
+        history = {"0": [1], "1": [2, 3], "3": [4]}
+        self.assertEqual(get_duplicate_candidates(history, None), [])
+        self.assertEqual(get_duplicate_candidates({"0": [1], "1": [2]}, None), [2])
+        self.assertEqual(get_duplicate_candidates(history, [4]), [4])
+        self.assertEqual(get_duplicate_candidates(history, [1]), [2])
+        self.assertEqual(get_duplicate_candidates(history, [3]), [4])
+
+    def test_async(self):
+        """
+        Tests get_or_create and version dedup on the async client
+        """
+        async def run():
+            transport = FakeAsyncTransport(self.server)
+            async with AsyncGroundClient(transport=transport, dedup_versions=True) as ground_client:
+                node = await ground_client.get_or_create_node("n", "n")
+                version = await ground_client.create_node_version(node.get_id(), reference="r", tags=TAGS)
+                return node, version
+
+        node, version = asyncio.run(run())
+        self.assertEqual(node.get_id(), self.node.get_id())
+        self.assertEqual(version.get_id(), self.version.get_id())
+        self.assertEqual(self.server.get_request_count("POST"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
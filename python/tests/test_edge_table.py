@@ -0,0 +1,112 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import ground.client as client
+import ground.edge_table as edge_table
+from ground.async_client import AsyncGroundClient
+from ground.common.model.core.edge_version import EdgeVersion
+from ground.edge_table import EdgeVersionTable
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# edge version 100 + i runs from node version i to node version i + 1
+PAYLOADS = [{"id": 100 + id, "edgeId": 1, "fromNodeVersionStartId": id, "toNodeVersionStartId": id + 1}
+            for id in range(1, 6)]
+
+
+class EdgeTransport(Transport):
+
+    def get(self, url):
+        id = int(url.rsplit("/", 1)[1])
+        return BufferedResponse(200, json.dumps(PAYLOADS[id - 101]).encode())
+
+
+class TestEdgeVersionTable(unittest.TestCase):
+
+    def test_rows(self):
+        """
+        Tests that rows come back as EdgeVersions equal to the ones put in
+        """
+        edge_versions = [EdgeVersion(payload) for payload in PAYLOADS]
+        table = EdgeVersionTable.from_edge_versions(edge_versions)
+        self.assertEqual(len(table), 5)
+        self.assertEqual(list(table), edge_versions)
+        self.assertEqual(list(EdgeVersionTable.from_json(PAYLOADS)), edge_versions)
+        self.assertEqual(table[2].get_from_node_version_end_id(), -1)
+        self.assertEqual(list(table.get_column("id")), [101, 102, 103, 104, 105])
+
+    def test_filter_touching(self):
+        """
+        Tests the touching filter with and without NumPy
+        """
+        table = EdgeVersionTable.from_json(PAYLOADS)
+        with mock.patch.object(edge_table, "_get_numpy", return_value=None):
+            self.assertEqual(table.get_touching_indices([3]), [1, 2])
+            self.assertEqual(table.get_touching_indices([3, 5], incoming=False), [2, 4])
+            self.assertRaises(ImportError, table.to_numpy)
+
+        filtered = table.filter_touching({3}, outgoing=False)
+        self.assertEqual([edge_version.get_id() for edge_version in filtered], [102])
+
+    def test_adjacency_index(self):
+        """
+        Tests the outgoing and incoming adjacency indexes
+        """
+        table = EdgeVersionTable.from_json(PAYLOADS + [{"id": 106, "fromNodeVersionStartId": 1,
+                                                        "toNodeVersionStartId": 4}])
+        self.assertEqual(list(table.get_adjacency_index()[1]), [0, 5])
+        self.assertEqual(list(table.get_adjacency_index(outgoing=False)[4]), [2, 5])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_to_numpy(self):
+        """
+        Tests that the NumPy columns share memory with the table
+        """
+        table = EdgeVersionTable.from_json(PAYLOADS)
+        columns = table.to_numpy()
+        self.assertEqual(columns["to_node_version_start_id"].tolist(), [2, 3, 4, 5, 6])
+
+        table.get_column("edge_id")[0] = 9
+        self.assertEqual(columns["edge_id"][0], 9)
+        self.assertRaises(BufferError, table.append_json, PAYLOADS[0])
+
+    def test_client(self):
+        """
+        Tests building a table through the client
+        """
+        with client.GroundClient(transport=EdgeTransport(), version_cache_size=10) as ground_client:
+            cached = ground_client.get_edge_version(102)
+            with mock.patch.object(edge_table, "EdgeVersion") as edge_version:
+                table = ground_client.get_edge_version_table([103, 101, 102])
+
+            # fetched versions go straight from their payloads to the table
+            edge_version.assert_not_called()
+            self.assertIsNone(ground_client.get_version_cache().get(("edges", 103)))
+        self.assertEqual(list(table.get_column("id")), [103, 101, 102])
+        self.assertEqual(table[2], cached)
+
+    def test_async_client(self):
+        """
+        Tests building a table through the async client
+        """
+        class AsyncEdgeTransport(AsyncTransport):
+            async def get(self, url):
+                return EdgeTransport().get(url)
+
+        async def run():
+            async with AsyncGroundClient(transport=AsyncEdgeTransport()) as ground_client:
+                return await ground_client.get_edge_version_table([105, 104])
+
+        table = asyncio.run(run())
+        self.assertEqual(list(table.get_column("to_node_version_start_id")), [6, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import asyncio
+import concurrent.futures
+import json
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.instrumentation import Instrumentation, LatencyHistogram, get_endpoint_template
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+NODE_VERSION = json.dumps({"id": 1, "nodeId": 2}).encode()
+HISTORY = json.dumps({"0": 1, "1": 2}).encode()
+
+
+class StubTransport(Transport):
+
+    def get(self, url):
+        if url.endswith("/history"):
+            return BufferedResponse(200, HISTORY)
+        if url.endswith("/missing"):
+            return BufferedResponse(404, b"")
+        return BufferedResponse(200, NODE_VERSION)
+
+    def post(self, url, body):
+        return BufferedResponse(200, NODE_VERSION)
+
+
+class StubAsyncTransport(AsyncTransport):
+
+    async def get(self, url):
+        await asyncio.sleep(0.01)
+        return BufferedResponse(200, NODE_VERSION)
+
+    async def post(self, url, body):
+        return BufferedResponse(200, NODE_VERSION)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_endpoint_template(self):
+        """
+        Tests that ids, item types and source keys are taken out of endpoints
+        """
+        self.assertEqual(get_endpoint_template("/versions/nodes/12"), "/versions/{type}/{id}")
+        self.assertEqual(get_endpoint_template("/versions/edges"), "/versions/{type}")
+        self.assertEqual(get_endpoint_template("/versions/nodes/adjacent/lineage/3"),
+                         "/versions/nodes/adjacent/lineage/{id}")
+        self.assertEqual(get_endpoint_template("/nodes"), "/{type}")
+        self.assertEqual(get_endpoint_template("/graphs/key"), "/{type}/{source_key}")
+        self.assertEqual(get_endpoint_template("/graphs/key/latest"), "/{type}/{source_key}/latest")
+
+    def test_histogram(self):
+        """
+        Tests histogram percentiles and buckets
+        """
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.get_percentile(50))
+
+        for latency in range(1, 101):
+            histogram.record(latency / 1000.0)
+        self.assertAlmostEqual(histogram.get_percentile(50), 0.05, delta=0.005)
+        self.assertAlmostEqual(histogram.get_percentile(99), 0.099, delta=0.01)
+        self.assertEqual(histogram.get_percentile(100), 0.1)
+
+        stats = histogram.get_stats()
+        self.assertEqual(stats["count"], 100)
+        self.assertAlmostEqual(stats["sum"], 5.05)
+        self.assertEqual(histogram.get_buckets()[-1][1], 100)
+
+        histogram.record(1000.0)
+        self.assertEqual(histogram.get_buckets()[-1], (float("inf"), 101))
+
+    def test_hooks(self):
+        """
+        Tests the events request and model hooks are called with
+        """
+        instrumentation = Instrumentation()
+        before, after, models = [], [], []
+        instrumentation.add_before_request(lambda event: before.append(event.status_code))
+        instrumentation.add_after_request(after.append)
+        instrumentation.add_after_model(models.append)
+
+        with client.GroundClient(transport=StubTransport(), instrumentation=instrumentation) as ground_client:
+            ground_client.get_node_version(1)
+            ground_client.get_node("missing")
+
+        self.assertEqual(before, [None, None])
+        self.assertEqual([(event.method, event.template, event.status_code) for event in after],
+                         [("GET", "/versions/{type}/{id}", 200), ("GET", "/{type}/{source_key}", 404)])
+        self.assertEqual(after[0].bytes, len(NODE_VERSION))
+        self.assertGreater(after[0].network_time, 0)
+        self.assertGreater(after[0].decode_time, 0)
+
+        self.assertEqual(len(models), 1)
+        self.assertEqual(models[0].model_class.__name__, "NodeVersion")
+        self.assertEqual(models[0].template, "/versions/{type}/{id}")
+
+    def test_stream(self):
+        """
+        Tests that a streamed response is timed once it has been read
+        """
+        instrumentation = Instrumentation()
+        with client.GroundClient(transport=StubTransport(), instrumentation=instrumentation) as ground_client:
+            self.assertEqual(len(list(ground_client.iter_node_history("n"))), 2)
+
+        stats = instrumentation.get_histograms().get_stats()["requests"]["/{type}/{source_key}/history"]
+        self.assertEqual(set(stats), {"network", "decode", "total"})
+        self.assertEqual(stats["total"]["count"], 1)
+
+    def test_error(self):
+        """
+        Tests that a request failing in the transport still reaches the after hooks
+        """
+        class FailingTransport(Transport):
+            def get(self, url):
+                raise ConnectionResetError()
+
+        instrumentation = Instrumentation(histograms=False)
+        after = []
+        instrumentation.add_after_request(after.append)
+        with client.GroundClient(transport=FailingTransport(), instrumentation=instrumentation) as ground_client:
+            self.assertRaises(ConnectionResetError, ground_client.get_node_version, 1)
+
+        self.assertIsNone(instrumentation.get_histograms())
+        self.assertIsInstance(after[0].error, ConnectionResetError)
+        self.assertIsNone(after[0].status_code)
+
+    def test_histograms(self):
+        """
+        Tests the per-endpoint histograms exported by the sync and async clients
+        """
+        instrumentation = Instrumentation()
+        with client.GroundClient(transport=StubTransport(), instrumentation=instrumentation) as ground_client:
+            ground_client.get_node_versions([1, 2, 3])
+
+        async def run():
+            transport = StubAsyncTransport()
+            async with AsyncGroundClient(transport=transport, instrumentation=instrumentation) as ground_client:
+                await ground_client.get_node_versions([4, 5])
+
+        asyncio.run(run())
+
+        stats = instrumentation.get_histograms().get_stats()
+        self.assertEqual(set(stats["requests"]["/versions/{type}/{id}"]), {"network", "decode", "model", "total"})
+        for phase in stats["requests"]["/versions/{type}/{id}"].values():
+            self.assertEqual(phase["count"], 5)
+            self.assertLessEqual(phase["p50"], phase["p99"])
+        self.assertEqual(stats["models"]["NodeVersion"]["count"], 5)
+
+    def test_coalesced_models(self):
+        """
+        Tests that models built from a coalesced response are attributed to the endpoint it came from
+        """
+        instrumentation = Instrumentation(histograms=False)
+        models = []
+        instrumentation.add_after_model(lambda event: models.append((event.model_class.__name__, event.template)))
+
+        async def run():
+            transport = StubAsyncTransport()
+            async with AsyncGroundClient(transport=transport, coalesce_gets=True,
+                                         instrumentation=instrumentation) as ground_client:
+                await ground_client.create_node_version(2)
+                await asyncio.gather(ground_client.get_node_version(1), ground_client.get_node_version(1),
+                                     ground_client.get_node("n"), ground_client.get_node("n"))
+
+        asyncio.run(run())
+        with client.GroundClient(transport=StubTransport(), coalesce_gets=True,
+                                 instrumentation=instrumentation) as ground_client:
+            with concurrent.futures.ThreadPoolExecutor(4) as executor:
+                list(executor.map(ground_client.get_node_version, [1] * 4))
+
+        self.assertEqual(models[0], ("NodeVersion", "/versions/{type}"))
+        self.assertEqual(sorted(models[1:5]), [("Node", "/{type}/{source_key}")] * 2 +
+                         [("NodeVersion", "/versions/{type}/{id}")] * 2)
+        self.assertEqual(models[5:], [("NodeVersion", "/versions/{type}/{id}")] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
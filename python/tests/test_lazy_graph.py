@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+# graph version 1 is a chain of 10 edge versions (ids 101-110) over node versions 1-11
+def respond(url):
+    id = int(url.rsplit("/", 1)[1])
+    if "/graphs/" in url:
+        payload = {"id": id, "graphId": 1, "edgeVersionIds": list(range(101, 111))}
+    elif "/edges/" in url:
+        payload = {"id": id, "edgeId": 1, "fromNodeVersionStartId": id - 100, "toNodeVersionStartId": id - 99}
+    else:
+        payload = {"id": id, "nodeId": 1}
+    return BufferedResponse(200, json.dumps(payload).encode())
+
+
+class RecordingTransport(Transport):
+
+    def __init__(self):
+        self.gets = []
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            self.gets.append(url)
+        return respond(url)
+
+    def count(self, kind):
+        return len([url for url in self.gets if "/" + kind + "/" in url])
+
+
+class RecordingAsyncTransport(AsyncTransport):
+
+    def __init__(self, delay=0):
+        self.gets = []
+        self._delay = delay
+
+    async def get(self, url):
+        self.gets.append(url)
+        await asyncio.sleep(self._delay)
+        return respond(url)
+
+
+class TestLazyGraph(unittest.TestCase):
+
+    def test_fetches_only_what_is_touched(self):
+        """
+        Tests that walking part of the graph fetches at most one batch ahead
+        """
+        transport = RecordingTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            graph_version = ground_client.get_lazy_graph_version(1, batch_size=3)
+            self.assertEqual(transport.count("edges"), 0)
+
+            edge_versions = graph_version.iter_edge_versions()
+            first = next(edge_versions)
+            self.assertEqual(first.get_id(), 101)
+            edge_versions.close()
+
+            adjacent = next(graph_version.iter_adjacent_edge_versions(3, outgoing=False))
+            self.assertEqual(adjacent.get_id(), 102)
+
+        # the first batch, and the second one prefetched once
+        self.assertEqual(transport.count("edges"), 6)
+
+    def test_no_prefetch(self):
+        """
+        Tests that without prefetch only the batches reached are fetched
+        """
+        transport = RecordingTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            graph_version = ground_client.get_lazy_graph_version(1, batch_size=3, prefetch=False)
+            edge_versions = graph_version.iter_edge_versions()
+            for _ in range(4):
+                next(edge_versions)
+            edge_versions.close()
+
+        self.assertEqual(transport.count("edges"), 6)
+
+    def test_node_versions(self):
+        """
+        Tests that node versions are resolved once each, and walking again is free
+        """
+        transport = RecordingTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            graph_version = ground_client.get_lazy_graph_version(1, batch_size=4)
+            node_versions = list(graph_version.iter_node_versions())
+            requests = len(transport.gets)
+            list(graph_version.iter_node_versions())
+
+        self.assertEqual([node_version.get_id() for node_version in node_versions], list(range(1, 12)))
+        self.assertEqual(transport.count("nodes"), 11)
+        self.assertEqual(len(transport.gets), requests)
+
+    def test_async(self):
+        """
+        Tests the async lazy graph
+        """
+        async def run():
+            transport = RecordingAsyncTransport()
+            ground_client = AsyncGroundClient(transport=transport)
+            graph_version = await ground_client.get_lazy_graph_version(1, batch_size=5)
+            ids = [edge_version.get_id() async for edge_version in graph_version.iter_edge_versions()]
+            nodes = [node_version.get_id() async for node_version in graph_version.iter_node_versions()]
+            return ids, nodes
+
+        ids, nodes = asyncio.run(run())
+        self.assertEqual(ids, list(range(101, 111)))
+        self.assertEqual(nodes, list(range(1, 12)))
+
+    def test_async_concurrent_walks(self):
+        """
+        Tests that concurrent walks of one async lazy graph share the fetches in flight
+        """
+        async def walk(graph_version):
+            return [edge_version.get_id() async for edge_version in graph_version.iter_edge_versions()]
+
+        async def run():
+            transport = RecordingAsyncTransport(delay=0.01)
+            ground_client = AsyncGroundClient(transport=transport)
+            graph_version = await ground_client.get_lazy_graph_version(1, batch_size=5)
+            results = await asyncio.gather(walk(graph_version), walk(graph_version),
+                                           graph_version.get_edge_version(103))
+            return transport.gets, results
+
+        gets, (first, second, edge_version) = asyncio.run(run())
+        self.assertEqual(first, list(range(101, 111)))
+        self.assertEqual(second, first)
+        self.assertEqual(edge_version.get_id(), 103)
+        self.assertEqual(len([url for url in gets if "/edges/" in url]), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
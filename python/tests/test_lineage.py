@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+# 1 -> 2 -> 4 -> 5, 1 -> 3 -> 4, 6 -> 3, and an unrelated 7 -> 8
+LINEAGE = [(1, 2), (2, 4), (4, 5), (1, 3), (3, 4), (6, 3), (7, 8)]
+
+
+def adjacent_lineage(url):
+    id = int(url.rsplit("/", 1)[1])
+    edges = [
+        {"id": 100 + index, "lineageEdgeId": 1, "fromRichVersionId": from_id, "toRichVersionId": to_id}
+        for index, (from_id, to_id) in enumerate(LINEAGE) if id in (from_id, to_id)
+    ]
+    return BufferedResponse(200, json.dumps(edges).encode())
+
+
+class LineageTransport(Transport):
+
+    def __init__(self):
+        self.gets = []
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            self.gets.append(int(url.rsplit("/", 1)[1]))
+        return adjacent_lineage(url)
+
+
+class LineageAsyncTransport(AsyncTransport):
+
+    async def get(self, url):
+        return adjacent_lineage(url)
+
+
+class TestLineage(unittest.TestCase):
+
+    def test_downstream(self):
+        """
+        Tests that downstream visits every version once, level by level
+        """
+        with client.GroundClient(transport=LineageTransport()) as ground_client:
+            hops = [(id, depth) for id, depth, _ in ground_client.downstream(1)]
+        self.assertEqual(hops, [(2, 1), (3, 1), (4, 2), (5, 3)])
+
+    def test_upstream_limits(self):
+        """
+        Tests the depth and node-count limits
+        """
+        transport = LineageTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            self.assertEqual(sorted(id for id, _, _ in ground_client.upstream(4)), [1, 2, 3, 6])
+            self.assertEqual(sorted(id for id, _, _ in ground_client.upstream(4, depth=1)), [2, 3])
+
+            requests = len(transport.gets)
+            first = next(ground_client.upstream(5, max_nodes=1))
+            self.assertEqual(first[0], 4)
+            self.assertEqual(first[2].get_from_id(), 4)
+            self.assertEqual(len(transport.gets), requests + 1)
+
+    def test_path(self):
+        """
+        Tests the shortest path search
+        """
+        with client.GroundClient(transport=LineageTransport()) as ground_client:
+            self.assertIn(ground_client.path(1, 5), [[1, 2, 4, 5], [1, 3, 4, 5]])
+            self.assertEqual(ground_client.path(6, 4), [6, 3, 4])
+            self.assertIsNone(ground_client.path(5, 1))
+            self.assertIsNone(ground_client.path(1, 8))
+            self.assertIsNone(ground_client.path(1, 5, max_depth=2))
+
+    def test_async(self):
+        """
+        Tests the async traversals
+        """
+        async def run():
+            ground_client = AsyncGroundClient(transport=LineageAsyncTransport())
+            hops = [(id, depth) async for id, depth, _ in ground_client.downstream(1, depth=2)]
+            return hops, await ground_client.path(6, 5)
+
+        hops, path = asyncio.run(run())
+        self.assertEqual(hops, [(2, 1), (3, 1), (4, 2)])
+        self.assertEqual(path, [6, 3, 4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
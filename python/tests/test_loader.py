@@ -0,0 +1,102 @@
+import itertools
+import json
+import threading
+import unittest
+
+import ground.client as client
+from ground.transport import BufferedResponse, Transport
+
+
+class RecordingTransport(Transport):
+
+    def __init__(self, fail_source_key=None):
+        self.posts = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._fail_source_key = fail_source_key
+
+    def post(self, url, body):
+        if self._fail_source_key is not None and body.get("sourceKey") == self._fail_source_key:
+            return BufferedResponse(500, b"{}")
+        with self._lock:
+            response = dict(body, id=next(self._ids))
+            self.posts.append((url[len("http://localhost:9000"):], response))
+        return BufferedResponse(200, json.dumps(response).encode())
+
+    def get_created(self, endpoint, key, value):
+        return [body for url, body in self.posts if url == endpoint and body.get(key) == value]
+
+
+DESCRIPTION = {
+    "nodes": [
+        {"source_key": "a", "version": {"reference": "s3://a"}},
+        {"source_key": "b"},
+        {"source_key": "c"},
+    ],
+    "edges": [
+        {"source_key": "ab", "from": "a", "to": "b"},
+        {"source_key": "bc", "from": "b", "to": "c"},
+    ],
+    "graph": {"source_key": "g", "name": "graph"},
+}
+
+
+class TestLoader(unittest.TestCase):
+
+    def test_load_graph(self):
+        """
+        Tests that the loader writes every model and wires the ids through
+        """
+        transport = RecordingTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            result = ground_client.load_graph(DESCRIPTION)
+
+        self.assertTrue(result.is_successful(), msg=result.get_errors())
+        nodes = result.get_nodes()
+        node_versions = result.get_node_versions()
+        edge_versions = result.get_edge_versions()
+
+        self.assertEqual(node_versions["a"].get_node_id(), nodes["a"].get_id())
+        self.assertEqual(node_versions["a"].get_reference(), "s3://a")
+
+        ab = result.get_edges()["ab"]
+        self.assertEqual(ab.get_from_node_id(), nodes["a"].get_id())
+        self.assertEqual(ab.get_to_node_id(), nodes["b"].get_id())
+        self.assertEqual(edge_versions["ab"].get_edge_id(), ab.get_id())
+        self.assertEqual(edge_versions["ab"].get_from_node_version_start_id(), node_versions["a"].get_id())
+        self.assertEqual(edge_versions["ab"].get_to_node_version_start_id(), node_versions["b"].get_id())
+
+        graph_version = result.get_graph_version()
+        self.assertEqual(graph_version.get_graph_id(), result.get_graph().get_id())
+        self.assertEqual(graph_version.get_edge_version_ids(),
+                         [edge_versions["ab"].get_id(), edge_versions["bc"].get_id()])
+
+    def test_failure_skips_dependents(self):
+        """
+        Tests that a failed write skips only what depends on it
+        """
+        transport = RecordingTransport(fail_source_key="c")
+        with client.GroundClient(transport=transport) as ground_client:
+            result = ground_client.load_graph(DESCRIPTION)
+
+        errors = result.get_errors()
+        self.assertEqual(set(errors), {
+            ("node", "c"), ("node_version", "c"), ("edge", "bc"), ("edge_version", "bc"), ("graph_version", "g")
+        })
+        self.assertIn("ab", result.get_edge_versions())
+        self.assertIsNotNone(result.get_graph())
+        self.assertEqual(transport.get_created("/versions/graphs", "graphId", result.get_graph().get_id()), [])
+
+    def test_unknown_node(self):
+        """
+        Tests that edges to undeclared nodes are rejected before anything is written
+        """
+        transport = RecordingTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            with self.assertRaises(ValueError):
+                ground_client.load_graph({"nodes": [], "edges": [{"source_key": "x", "from": "a", "to": "b"}]})
+        self.assertEqual(transport.posts, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import unittest
+
+import ground.common.model as model
+
+
+class TestModel(unittest.TestCase):
+
+    def test_slots(self):
+        """
+        Tests that model objects carry no per-instance __dict__
+        """
+        objects = [
+            model.core.node.Node({'id': 1}),
+            model.core.node_version.NodeVersion({'id': 1, 'nodeId': 2}),
+            model.core.edge_version.EdgeVersion({'id': 1, 'edgeId': 2}),
+            model.core.structure_version.StructureVersion({'id': 1}),
+            model.usage.lineage_graph_version.LineageGraphVersion({'id': 1}),
+            model.version.tag.Tag({'id': 1, 'key': 'k', 'value': 'v'}),
+        ]
+        for obj in objects:
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+
+    def test_empty_sentinels(self):
+        """
+        Tests that empty tags and parameters are shared rather than allocated per object
+        """
+        first = model.core.node_version.NodeVersion({'id': 1, 'tags': {}})
+        second = model.core.edge_version.EdgeVersion({'id': 2})
+        self.assertIs(first._tags, second._tags)
+        self.assertIs(first._parameters, second._parameters)
+        self.assertIs(model.core.node.Node({'id': 1})._tags, first._tags)
+        self.assertIs(model.core.structure_version.StructureVersion({'id': 4})._attributes, first._tags)
+
+        # the getters return plain dicts, which can be sent back to the server
+        structure_version = model.core.structure_version.StructureVersion({'id': 4})
+        self.assertEqual(json.dumps([first.get_tags(), first.get_parameters(), structure_version.get_attributes()]),
+                         '[{}, {}, {}]')
+
+        tagged = model.core.node_version.NodeVersion({'id': 3, 'tags': {'k': 'v'}})
+        self.assertEqual(tagged.get_tags(), {'k': 'v'})
+
+    def test_lazy_tags(self):
+        """
+        Tests that item tags are decoded into Tags once, without changing the payload
+        """
+        tags = {'k': {'id': 1, 'key': 'k', 'value': 'v'}}
+        for model_class in (model.core.node.Node, model.core.edge.Edge, model.usage.lineage_graph.LineageGraph):
+            obj = model_class({'id': 1, 'tags': tags})
+            self.assertEqual(tags, {'k': {'id': 1, 'key': 'k', 'value': 'v'}})
+
+            self.assertIs(obj.get_tags(), obj.get_tags())
+            self.assertEqual(obj.get_tags()['k'], model.version.tag.Tag(tags['k']))
+            self.assertEqual(tags['k'], {'id': 1, 'key': 'k', 'value': 'v'})
+
+        # a copy made from decoded tags equals one made from the raw payload
+        node = model.core.node.Node({'id': 2, 'tags': tags})
+        self.assertEqual(model.core.node.Node.from_node(2, node), model.core.node.Node({'id': 2, 'tags': tags}))
+
+        # versions keep their tags as the payload had them, so they can be sent back as they are
+        node_version = model.core.node_version.NodeVersion({'id': 2, 'tags': tags})
+        self.assertIs(node_version.get_tags(), tags)
+        self.assertEqual(json.loads(json.dumps(node_version.get_tags())), tags)
+
+    def test_hash(self):
+        """
+        Tests that equal models hash equally and can be used in sets and as dict keys
+        """
+        payload = {'id': 1, 'nodeId': 2, 'reference': 'r'}
+        versions = {model.core.node_version.NodeVersion(payload), model.core.node_version.NodeVersion(payload)}
+        self.assertEqual(len(versions), 1)
+
+        graph_version = model.core.graph_version.GraphVersion({'id': 4, 'edgeVersionIds': [1, 2]})
+        copy = model.core.graph_version.GraphVersion.from_graph_version(4, graph_version)
+        self.assertEqual({graph_version: 'a'}[copy], 'a')
+
+        node = model.core.node.Node({'id': 5, 'name': 'n', 'sourceKey': 'n'})
+        self.assertIn(model.core.node.Node.from_node(5, node), {node})
+        tags = {model.version.tag.Tag({'id': 1, 'key': 'k'}), model.version.tag.Tag({'id': 1, 'key': 'k'})}
+        self.assertEqual(len(tags), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
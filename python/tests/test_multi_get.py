@@ -0,0 +1,83 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+def edge_version(url):
+    id = int(url.rsplit("/", 1)[1])
+    if id < 0:
+        return BufferedResponse(404, b"{}")
+    return BufferedResponse(200, json.dumps({"id": id, "edgeId": 1}).encode())
+
+
+class SlowTransport(Transport):
+
+    def __init__(self):
+        self.gets = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            self.gets.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        return edge_version(url)
+
+
+class StubAsyncTransport(AsyncTransport):
+
+    def __init__(self):
+        self.gets = []
+
+    async def get(self, url):
+        self.gets.append(url)
+        await asyncio.sleep(0)
+        return edge_version(url)
+
+
+class TestMultiGet(unittest.TestCase):
+
+    def test_get_edge_versions(self):
+        """
+        Tests that multi-gets fan out, keep input order and map missing ids to None
+        """
+        transport = SlowTransport()
+        with client.GroundClient(transport=transport, workers=4, version_cache_size=100) as ground_client:
+            ground_client.get_edge_version(3)
+            versions = ground_client.get_edge_versions([5, 3, -1, 4, 5, 2, 1, 0, 6, 7, 8])
+
+        self.assertEqual(list(versions), [5, 3, -1, 4, 2, 1, 0, 6, 7, 8])
+        self.assertIsNone(versions[-1])
+        self.assertEqual(versions[4].get_id(), 4)
+        # 3 was cached and 5 was asked for twice
+        self.assertEqual(len(transport.gets), 10)
+        self.assertEqual(transport.max_in_flight, 4)
+
+    def test_async_get_edge_versions(self):
+        """
+        Tests the async multi-get
+        """
+        async def run():
+            transport = StubAsyncTransport()
+            ground_client = AsyncGroundClient(transport=transport)
+            return transport, await ground_client.get_edge_versions([2, -2, 2])
+
+        transport, versions = asyncio.run(run())
+        self.assertEqual(len(transport.gets), 2)
+        self.assertEqual(versions[2].get_id(), 2)
+        self.assertIsNone(versions[-2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.retry import CircuitBreaker, CircuitOpenError, RetriesExhaustedError, RetryPolicy
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+def respond(outcome):
+    if isinstance(outcome, Exception):
+        raise outcome
+    status_code, payload = outcome
+    return BufferedResponse(status_code, json.dumps(payload).encode())
+
+
+class ScriptedTransport(Transport):
+    '''
+    Plays back a list of outcomes per method: (status code, payload) pairs, or
+    exceptions to raise; the last one repeats.
+    '''
+
+    def __init__(self, gets=(), posts=()):
+        self.requests = []
+        self._outcomes = {"GET": list(gets), "POST": list(posts)}
+
+    def _next(self, method, url):
+        self.requests.append((method, url))
+        outcomes = self._outcomes[method]
+        return respond(outcomes.pop(0) if len(outcomes) > 1 else outcomes[0])
+
+    def get(self, url):
+        return self._next("GET", url)
+
+    def post(self, url, body):
+        return self._next("POST", url)
+
+
+class ScriptedAsyncTransport(AsyncTransport):
+
+    def __init__(self, gets):
+        self.requests = 0
+        self._gets = list(gets)
+
+    async def get(self, url):
+        self.requests += 1
+        return respond(self._gets.pop(0) if len(self._gets) > 1 else self._gets[0])
+
+
+class MinimalResponse:
+    '''
+    Has only what the Transport contract asks of a response, and no close().
+    '''
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class MinimalTransport(Transport):
+
+    def __init__(self, gets):
+        self.requests = 0
+        self._gets = list(gets)
+
+    def get(self, url):
+        self.requests += 1
+        return MinimalResponse(*self._gets.pop(0))
+
+
+class MinimalAsyncTransport(AsyncTransport):
+
+    def __init__(self, gets):
+        self._transport = MinimalTransport(gets)
+
+    async def get(self, url):
+        return self._transport.get(url)
+
+
+NODE = {"id": 1, "name": "n", "sourceKey": "n"}
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_backoff(self):
+        """
+        Tests exponential backoff, its cap, and jitter
+        """
+        policy = RetryPolicy(backoff=1.0, max_backoff=5.0, jitter=False)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(4)], [1.0, 2.0, 4.0, 5.0])
+        self.assertEqual(RetryPolicy(backoff=1.0, random=lambda: 0.25).get_delay(2), 1.0)
+
+    def test_get_retried(self):
+        """
+        Tests that a GET is retried through 503s and transport errors
+        """
+        transport = ScriptedTransport(gets=[(503, None), ConnectionResetError(), (200, NODE)])
+        policy = RetryPolicy(backoff=0)
+        with client.GroundClient(transport=transport, retry_policy=policy) as ground_client:
+            self.assertEqual(ground_client.get_node("n").get_id(), 1)
+        self.assertEqual(len(transport.requests), 3)
+        self.assertEqual(policy.get_stats()["retries"], 2)
+
+    def test_get_exhausted(self):
+        """
+        Tests that retries give up with an error rather than a silent None
+        """
+        transport = ScriptedTransport(gets=[(503, None)])
+        policy = RetryPolicy(max_attempts=2, backoff=0)
+        with client.GroundClient(transport=transport, retry_policy=policy) as ground_client:
+            with self.assertRaises(RetriesExhaustedError) as context:
+                ground_client.get_node("n")
+            self.assertEqual(context.exception.status_code, 503)
+            self.assertEqual(len(transport.requests), 2)
+
+            # not found is an answer, not a failure
+            transport._outcomes["GET"] = [(404, None)]
+            self.assertIsNone(ground_client.get_node("n"))
+        self.assertEqual(policy.get_stats()["exhausted"], 1)
+
+    def test_post_retried_only_when_safe(self):
+        """
+        Tests that version creates are only retried when they cannot have taken effect
+        """
+        transport = ScriptedTransport(posts=[(500, None)])
+        with client.GroundClient(transport=transport, retry_policy=RetryPolicy(backoff=0)) as ground_client:
+            self.assertIsNone(ground_client.create_node_version(1))
+            self.assertEqual(len(transport.requests), 1)
+
+            transport._outcomes["POST"] = [TimeoutError()]
+            self.assertRaises(TimeoutError, ground_client.create_node_version, 1)
+            self.assertEqual(len(transport.requests), 2)
+
+            transport._outcomes["POST"] = [ConnectionRefusedError(), (200, {"id": 5, "nodeId": 1})]
+            self.assertEqual(ground_client.create_node_version(1).get_id(), 5)
+            self.assertEqual(len(transport.requests), 4)
+
+    def test_create_reconciled(self):
+        """
+        Tests that an item create which took effect despite failing is not sent again
+        """
+        transport = ScriptedTransport(gets=[(200, NODE)], posts=[(503, None)])
+        policy = RetryPolicy(backoff=0)
+        with client.GroundClient(transport=transport, retry_policy=policy) as ground_client:
+            self.assertEqual(ground_client.create_node("n", "n").get_id(), 1)
+        self.assertEqual(transport.requests, [("POST", "http://localhost:9000/nodes"),
+                                              ("GET", "http://localhost:9000/nodes/n")])
+        self.assertEqual(policy.get_stats()["reconciled"], 1)
+
+    def test_circuit_breaker(self):
+        """
+        Tests that the breaker opens, fails fast, and closes after a good trial request
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        transport = ScriptedTransport(gets=[(500, None), (500, None), (200, NODE)])
+        with client.GroundClient(transport=transport, circuit_breaker=breaker) as ground_client:
+            self.assertIsNone(ground_client.get_node("n"))
+            self.assertIsNone(ground_client.get_node("n"))
+            self.assertRaises(CircuitOpenError, ground_client.get_node, "n")
+            self.assertEqual(len(transport.requests), 2)
+
+            clock.now = 10
+            self.assertEqual(ground_client.get_node("n").get_id(), 1)
+        self.assertEqual(breaker.get_stats(), {"state": "closed", "failures": 0, "opened": 1, "rejected": 1})
+
+    def test_half_open_failure(self):
+        """
+        Tests that a failed trial request reopens the breaker
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.get_state(), "open")
+        clock.now = 9
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_abandoned(self):
+        """
+        Tests that a cancelled or stuck trial request does not leave the breaker half open
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+
+        class HangingTransport(AsyncTransport):
+            async def get(self, url):
+                await asyncio.sleep(10)
+
+        async def run():
+            transport = HangingTransport()
+            async with AsyncGroundClient(transport=transport, circuit_breaker=breaker) as ground_client:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(ground_client.get_node("n"), 0.01)
+
+        asyncio.run(run())
+        self.assertEqual(breaker.get_state(), "open")
+        self.assertTrue(breaker.allow())
+
+        # a trial that never reports back is replaced once reset_timeout has passed
+        self.assertFalse(breaker.allow())
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+
+    def test_async(self):
+        """
+        Tests async retries
+        """
+        async def run():
+            transport = ScriptedAsyncTransport([(502, None), (200, NODE)])
+            ground_client = AsyncGroundClient(transport=transport, retry_policy=RetryPolicy(backoff=0))
+            return (await ground_client.get_node("n")).get_id(), transport.requests
+
+        self.assertEqual(asyncio.run(run()), (1, 2))
+
+    def test_response_without_close(self):
+        """
+        Tests retrying through responses that have no close()
+        """
+        transport = MinimalTransport([(503, None), (200, NODE)])
+        with client.GroundClient(transport=transport, retry_policy=RetryPolicy(backoff=0)) as ground_client:
+            self.assertEqual(ground_client.get_node("n").get_id(), 1)
+        self.assertEqual(transport.requests, 2)
+
+        async def run():
+            transport = MinimalAsyncTransport([(502, None), (200, NODE)])
+            ground_client = AsyncGroundClient(transport=transport, retry_policy=RetryPolicy(backoff=0))
+            return (await ground_client.get_node("n")).get_id(), transport._transport.requests
+
+        self.assertEqual(asyncio.run(run()), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
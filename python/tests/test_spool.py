@@ -0,0 +1,243 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import ground.client as client
+from ground.spool import Spool, SpoolFullError, is_provisional_id
+from ground.testing import FakeGroundServer, FakeTransport
+from ground.transport import BufferedResponse
+
+
+class TestSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.server = FakeGroundServer()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get_client(self, **kwargs):
+        spool = Spool(self.directory, fsync=False, retry_interval=0.01, **kwargs)
+        return client.GroundClient(transport=FakeTransport(self.server), spool=spool)
+
+    def test_direct(self):
+        """
+        Tests that writes skip the spool while the server takes them
+        """
+        with self.get_client() as ground_client:
+            node = ground_client.create_node("n", "n")
+            self.assertFalse(is_provisional_id(node.get_id()))
+            self.assertEqual(ground_client.resolve_id(node.get_id()), node.get_id())
+            self.assertEqual(os.listdir(self.directory), ["ids.log"])
+
+    def test_replay(self):
+        """
+        Tests that writes spooled while the server is down are replayed in order,
+        with provisional ids replaced in the writes depending on them
+        """
+        self.server.inject_error(503, count=1, method="POST")
+        with self.get_client() as ground_client:
+            spool = ground_client.get_spool()
+            spool.stop()
+
+            node = ground_client.create_node("n", "n")
+            first = ground_client.create_node_version(node.get_id())
+            second = ground_client.create_node_version(node.get_id(), parent_ids=[first.get_id()])
+            edge = ground_client.create_edge("e", "e", node.get_id(), node.get_id())
+            edge_version = ground_client.create_edge_version(edge.get_id(), first.get_id(), second.get_id())
+
+            self.assertTrue(all(is_provisional_id(model.get_id()) for model in (node, first, second, edge_version)))
+            self.assertIsNone(ground_client.resolve_id(first.get_id()))
+            self.assertEqual(spool.get_pending_count(), 5)
+
+            spool.start(ground_client._post)
+            self.assertTrue(spool.flush(timeout=5))
+
+            first_id = ground_client.resolve_id(first.get_id())
+            second_id = ground_client.resolve_id(second.get_id())
+            self.assertEqual(ground_client.get_node_latest_versions("n"), [second_id])
+
+            replayed = ground_client.get_edge_version(ground_client.resolve_id(edge_version.get_id()))
+            self.assertEqual(replayed.get_from_node_version_start_id(), first_id)
+            self.assertEqual(replayed.get_to_node_version_start_id(), second_id)
+            self.assertEqual(spool.get_stats()["replayed"], 5)
+
+            # with the spool drained, writes go straight to the server again
+            self.assertFalse(is_provisional_id(ground_client.create_node_version(node.get_id()).get_id()))
+
+    def test_transient_statuses(self):
+        """
+        Tests that writes the server answers with any transient status are spooled
+        """
+        with self.get_client() as ground_client:
+            spool = ground_client.get_spool()
+            spool.stop()
+            for status_code in (500, 502, 504):
+                self.server.inject_error(status_code, method="POST")
+                self.assertTrue(is_provisional_id(ground_client.create_node(str(status_code), "n").get_id()))
+                spool.start(ground_client._post)
+                self.assertTrue(spool.flush(timeout=5))
+                spool.stop()
+            self.assertEqual(spool.get_stats()["replayed"], 3)
+
+    def test_recovery(self):
+        """
+        Tests that spooled writes survive a crash, minus a torn last record
+        """
+        spool = Spool(self.directory, fsync=False)
+        provisional = [spool.append("/nodes", {"sourceKey": key, "name": key, "tags": {}}, "/nodes/" + key)
+                       for key in ("a", "b", "c")]
+        spool.close()
+
+        segment = os.path.join(self.directory, next(name for name in os.listdir(self.directory)
+                                                    if name.startswith("segment-")))
+        os.truncate(segment, os.path.getsize(segment) - 5)
+
+        spool = Spool(self.directory, fsync=False)
+        self.assertEqual(spool.get_pending_count(), 2)
+        self.assertEqual(spool.append("/nodes", {"sourceKey": "d", "name": "d", "tags": {}}), provisional[2])
+
+        with client.GroundClient(transport=FakeTransport(self.server), spool=spool) as ground_client:
+            self.assertTrue(spool.flush(timeout=5))
+            self.assertIsNotNone(ground_client.get_node("d"))
+            self.assertIsNone(ground_client.get_node("c"))
+
+        # nothing is replayed twice, and the ids are still known
+        spool = Spool(self.directory, fsync=False)
+        self.assertTrue(spool.is_empty())
+        node = json.loads(self.server.request("GET", "/nodes/a")[1])
+        self.assertEqual(spool.get_server_id(provisional[0]), node["id"])
+        spool.close()
+
+    def test_segments(self):
+        """
+        Tests that replayed segments are deleted, and that the spool stays in max_bytes
+        """
+        spool = Spool(self.directory, fsync=False, segment_size=300, max_bytes=2000, batch_size=3)
+        for index in range(8):
+            spool.append("/nodes", {"sourceKey": str(index), "name": "n", "tags": {}})
+        self.assertGreater(spool.get_stats()["segments"], 2)
+        self.assertRaises(SpoolFullError, spool.append, "/nodes", {"sourceKey": "x" * 2000, "name": "n", "tags": {}})
+
+        with client.GroundClient(transport=FakeTransport(self.server), spool=spool):
+            self.assertTrue(spool.flush(timeout=5))
+        self.assertEqual(spool.get_stats()["segments"], 1)
+        self.assertEqual(self.server.get_request_count("POST"), 8)
+        spool.close()
+
+    def test_id_compaction(self):
+        """
+        Tests that the id map is compacted as segments are deleted, so a long-running
+        spool never fills up with nothing pending
+        """
+        spool = Spool(self.directory, fsync=False, segment_size=1000, max_bytes=3000)
+        with client.GroundClient(transport=FakeTransport(self.server), spool=spool):
+            node = spool.append("/nodes", {"sourceKey": "n", "name": "n", "tags": {}})
+            self.assertTrue(spool.flush(timeout=5))
+            node_id = spool.get_server_id(node)
+
+            for _ in range(500):
+                version = spool.append("/versions/nodes", {"nodeId": node_id, "tags": {}})
+                self.assertTrue(spool.flush(timeout=5))
+
+            stats = spool.get_stats()
+            self.assertEqual(stats["replayed"], 501)
+            self.assertLess(stats["disk_usage"], 3000)
+            self.assertLess(len(spool._server_ids), 50)
+
+            # recent ids are still known, and forgotten ones cannot be spooled again
+            self.assertIsNotNone(spool.get_server_id(version))
+            self.assertIsNone(spool.get_server_id(node))
+            self.assertRaises(ValueError, spool.append, "/versions/nodes", {"nodeId": node, "tags": {}})
+        spool.close()
+
+        spool = Spool(self.directory, fsync=False)
+        self.assertIsNotNone(spool.get_server_id(version))
+        spool.close()
+
+    def test_compaction_keeps_referenced_ids(self):
+        """
+        Tests that ids pending writes refer to are kept after their segment is deleted
+        """
+        spool = Spool(self.directory, fsync=False, segment_size=200, batch_size=1)
+        node = spool.append("/nodes", {"sourceKey": "n", "name": "n", "tags": {}})
+        for index in range(10):
+            spool.append("/nodes", {"sourceKey": "m" + str(index), "name": "m", "tags": {}})
+        version = spool.append("/versions/nodes", {"nodeId": node, "tags": {}})
+
+        with client.GroundClient(transport=FakeTransport(self.server), spool=spool) as ground_client:
+            self.assertTrue(spool.flush(timeout=5))
+            node_id = ground_client.get_node("n").get_id()
+            self.assertEqual(ground_client.get_node_version(spool.get_server_id(version)).get_node_id(), node_id)
+        spool.close()
+
+    def test_rejected(self):
+        """
+        Tests that writes the server rejects are dropped with the writes depending on them
+        """
+        spool = Spool(self.directory, fsync=False)
+        missing = spool.append("/nodes", {"sourceKey": "n", "name": "n", "tags": {}})
+        self.server.request("POST", "/nodes", {"sourceKey": "n", "name": "n", "tags": {}})
+        version = spool.append("/versions/nodes", {"nodeId": missing, "tags": {}, "parentIds": []})
+
+        with client.GroundClient(transport=FakeTransport(self.server), spool=spool) as ground_client:
+            self.assertTrue(spool.flush(timeout=5))
+            self.assertIsNone(ground_client.resolve_id(missing))
+            self.assertIsNone(ground_client.resolve_id(version))
+            self.assertEqual(spool.get_stats()["rejected"], 2)
+        self.assertEqual(self.server.get_request_count("POST"), 2)
+
+    def test_permanent_failure(self):
+        """
+        Tests that a write failing for good is rejected rather than retried forever
+        """
+        class GarbledTransport(FakeTransport):
+            def post(self, url, body):
+                if body.get("sourceKey") == "bad":
+                    return BufferedResponse(200, b"<html>")
+                return super().post(url, body)
+
+        spool = Spool(self.directory, fsync=False, retry_interval=0.01)
+        bad = spool.append("/nodes", {"sourceKey": "bad", "name": "n", "tags": {}})
+        good = spool.append("/nodes", {"sourceKey": "good", "name": "n", "tags": {}})
+
+        with client.GroundClient(transport=GarbledTransport(self.server), spool=spool) as ground_client:
+            self.assertTrue(spool.flush(timeout=5))
+            self.assertIsNone(ground_client.resolve_id(bad))
+            self.assertIsNotNone(ground_client.resolve_id(good))
+            self.assertFalse(is_provisional_id(ground_client.create_node("next", "n").get_id()))
+
+            stats = spool.get_stats()
+            self.assertEqual((stats["replayed"], stats["rejected"]), (1, 1))
+            self.assertIn("RuntimeError", stats["last_error"])
+
+    def test_unreadable_record(self):
+        """
+        Tests that a record damaged on disk is skipped, without losing the ones after it
+        """
+        spool = Spool(self.directory, fsync=False)
+        provisional = [spool.append("/nodes", {"sourceKey": key, "name": key, "tags": {}}) for key in ("a", "b", "c")]
+        spool.close()
+
+        segment = os.path.join(self.directory, next(name for name in os.listdir(self.directory)
+                                                    if name.startswith("segment-")))
+        with open(segment, "rb") as segment_file:
+            data = segment_file.read()
+        with open(segment, "wb") as segment_file:
+            segment_file.write(data.replace(b'"sourceKey":"b"', b'"sourceKey":"x"'))
+
+        spool = Spool(self.directory, fsync=False)
+        self.assertEqual(spool.get_pending_count(), 3)
+        with client.GroundClient(transport=FakeTransport(self.server), spool=spool) as ground_client:
+            self.assertTrue(spool.flush(timeout=5))
+            self.assertEqual([ground_client.resolve_id(id) is None for id in provisional], [False, True, False])
+            self.assertIsNone(ground_client.get_node("x"))
+            self.assertIn("unreadable", spool.get_stats()["last_error"])
+        spool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
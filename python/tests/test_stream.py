@@ -0,0 +1,170 @@
+import asyncio
+import json
+import random
+import unittest
+from unittest import mock
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.stream import JsonStreamParser
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+HISTORY = {"0": [1], "1": [2, 3], "2": 4, "3": [4]}
+LATEST = list(range(1, 1001))
+
+
+def get_body(url):
+    if url.endswith("/history"):
+        return json.dumps(HISTORY).encode()
+    return json.dumps(LATEST).encode()
+
+
+class ChunkedResponse:
+
+    def __init__(self, body, sent):
+        self.status_code = 200
+        self.closed = False
+        self._body = body
+        self._sent = sent
+
+    def iter_content(self, chunk_size):
+        # ignores chunk_size and sends a few bytes at a time, counting what went out
+        for start in range(0, len(self._body), 7):
+            self._sent.append(start)
+            yield self._body[start:start + 7]
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingTransport(Transport):
+
+    def __init__(self):
+        self.sent = []
+        self.responses = []
+
+    def get(self, url):
+        return BufferedResponse(200, get_body(url))
+
+    def get_stream(self, url):
+        self.responses.append(ChunkedResponse(get_body(url), self.sent))
+        return self.responses[-1]
+
+
+class BufferedAsyncTransport(AsyncTransport):
+
+    async def get(self, url):
+        if "/nodes/key" == url[-len("/nodes/key"):]:
+            return BufferedResponse(200, json.dumps({"id": 9, "sourceKey": "key"}).encode())
+        return BufferedResponse(200, get_body(url))
+
+
+class TestStream(unittest.TestCase):
+
+    def test_parser(self):
+        """
+        Tests parsing arrays and objects split at arbitrary points
+        """
+        documents = [HISTORY, LATEST, [{"id": 1, "fromId": 0, "toId": 1}, "é", -1.5e3, None], [], {}]
+        for document in documents:
+            content = json.dumps(document, ensure_ascii=False).encode()
+            for _ in range(20):
+                parser = JsonStreamParser()
+                entries = []
+                start = 0
+                while start < len(content):
+                    end = start + random.randint(1, 9)
+                    entries.extend(parser.feed(content[start:end]))
+                    start = end
+                entries.extend(parser.close())
+                self.assertEqual(entries, list(document.items()) if isinstance(document, dict) else document)
+
+    def test_large_entry(self):
+        """
+        Tests that an entry fed in many small chunks is only parsed once it can be complete
+        """
+        children = [{"id": index, "fromId": index, "toId": index + 1, "tags": {"k": "a\\\"]}" + str(index)}}
+                    for index in range(2000)]
+        document = {"1": children, "2": []}
+        content = json.dumps(document).encode()
+
+        parser = JsonStreamParser()
+        decoder = parser._decoder
+        calls = []
+
+        def raw_decode(string, index):
+            calls.append(index)
+            return decoder.raw_decode(string, index)
+
+        parser._decoder = mock.Mock(raw_decode=raw_decode)
+        entries = []
+        for start in range(0, len(content), 16):
+            entries.extend(parser.feed(content[start:start + 16]))
+        entries.extend(parser.close())
+
+        self.assertEqual(entries, list(document.items()))
+        self.assertLess(len(calls), 10)
+
+    def test_parser_errors(self):
+        """
+        Tests that malformed and truncated streams raise ValueError
+        """
+        for content in (b"[1,", b"[1 2]", b"{1: 2}", b"[1]x", b"3", b'{"a" 1}'):
+            parser = JsonStreamParser()
+            with self.assertRaises(ValueError):
+                parser.feed(content)
+                parser.close()
+
+    def test_iter_latest_versions(self):
+        """
+        Tests that entries are generated before the whole response is read
+        """
+        transport = StreamingTransport()
+        with client.GroundClient(transport=transport) as ground_client:
+            latest = ground_client.iter_node_latest_versions("key")
+            self.assertEqual(next(latest), 1)
+            self.assertLess(len(transport.sent), 3)
+
+            self.assertEqual(list(latest), LATEST[1:])
+            self.assertTrue(transport.responses[0].closed)
+
+    def test_iter_history(self):
+        """
+        Tests streaming history into VersionSuccessors
+        """
+        with client.GroundClient(transport=StreamingTransport()) as ground_client:
+            pairs = [(successor.get_from_id(), successor.get_to_id())
+                     for successor in ground_client.iter_graph_history("key")]
+        self.assertEqual(pairs, [(0, 1), (1, 2), (1, 3), (2, 4), (3, 4)])
+
+    def test_cached_latest_versions(self):
+        """
+        Tests that a cached latest versions lookup is iterated without a request
+        """
+        transport = StreamingTransport()
+        with client.GroundClient(transport=transport, lookup_cache_ttl=60) as ground_client:
+            self.assertEqual(ground_client.get_edge_latest_versions("key"), LATEST)
+            self.assertEqual(list(ground_client.iter_edge_latest_versions("key")), LATEST)
+        self.assertEqual(transport.responses, [])
+
+    def test_async(self):
+        """
+        Tests the async iterators over the default, non-streaming get_stream
+        """
+        async def run():
+            ground_client = AsyncGroundClient(transport=BufferedAsyncTransport())
+            latest = [id async for id in ground_client.iter_node_latest_versions("key")]
+            history = [successor.get_to_id() async for successor in ground_client.iter_node_history("key")]
+            dag = await ground_client.get_node_history_dag("key")
+            return latest, history, dag
+
+        latest, history, dag = asyncio.run(run())
+        self.assertEqual(latest, LATEST)
+        self.assertEqual(history, [1, 2, 3, 4, 4])
+        self.assertEqual(dag.get_item_id(), 9)
+        self.assertEqual(dag.get_leaves(), {4})
+
+
+if __name__ == '__main__':
+    unittest.main()
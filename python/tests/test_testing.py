@@ -0,0 +1,138 @@
+import asyncio
+import time
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.retry import RetryPolicy
+from ground.testing import FakeAsyncTransport, FakeGroundHTTPServer, FakeGroundServer, FakeTransport
+
+
+class TestFakeGroundServer(unittest.TestCase):
+
+    def test_versions(self):
+        """
+        Tests latest versions, history and version lookups against the fake
+        """
+        with client.GroundClient(transport=FakeTransport(FakeGroundServer())) as ground_client:
+            node = ground_client.create_node("n", "n", tags={"k": {"key": "k", "value": 1, "type": "integer"}})
+            first = ground_client.create_node_version(node.get_id())
+            second = ground_client.create_node_version(node.get_id())
+            branch = ground_client.create_node_version(node.get_id(), parent_ids=[first.get_id()])
+
+            self.assertEqual(node.get_tags()["k"].get_value(), 1)
+            self.assertEqual(ground_client.get_node_latest_versions("n"), [second.get_id(), branch.get_id()])
+            self.assertEqual(ground_client.get_node_history("n"),
+                             {"0": [first.get_id()], str(first.get_id()): [second.get_id(), branch.get_id()]})
+            self.assertEqual(ground_client.get_node_version(branch.get_id()), branch)
+
+            self.assertIsNone(ground_client.get_node("missing"))
+            self.assertIsNone(ground_client.get_node_version(10 ** 6))
+            self.assertIsNone(ground_client.create_node("n", "n"))
+            self.assertIsNone(ground_client.create_node_version(10 ** 6))
+
+    def test_lineage(self):
+        """
+        Tests the adjacent lineage endpoint through a lineage traversal
+        """
+        with client.GroundClient(transport=FakeTransport(FakeGroundServer())) as ground_client:
+            node = ground_client.create_node("n", "n")
+            ids = [ground_client.create_node_version(node.get_id()).get_id() for _ in range(3)]
+            lineage_edge = ground_client.create_lineage_edge("l", "l")
+            for from_id, to_id in zip(ids, ids[1:]):
+                ground_client.create_lineage_edge_version(lineage_edge.get_id(), to_id, from_id)
+
+            self.assertEqual([id for id, _, _ in ground_client.downstream(ids[0])], ids[1:])
+            self.assertEqual(ground_client.path(ids[0], ids[2]), ids)
+
+    def test_latency(self):
+        """
+        Tests that requests take the configured latency
+        """
+        server = FakeGroundServer(latency=0.05)
+        server.set_latency(0, "/{type}")
+        sleeps = []
+        with client.GroundClient(transport=FakeTransport(server, sleep=sleeps.append)) as ground_client:
+            ground_client.create_node("n", "n")
+            ground_client.get_node("n")
+        self.assertEqual(sleeps, [0.05])
+
+    def test_injected_errors(self):
+        """
+        Tests that injected errors are retried, and reconciled when they took effect
+        """
+        server = FakeGroundServer()
+        server.inject_error(503, method="POST", apply=True)
+
+        policy = RetryPolicy(backoff=0)
+        with client.GroundClient(transport=FakeTransport(server), retry_policy=policy) as ground_client:
+            node = ground_client.create_node("n", "n")
+            server.inject_error(503, count=2, method="GET")
+            self.assertEqual(ground_client.get_node("n"), node)
+
+        self.assertEqual(server.get_request_count("POST"), 1)
+        # one lookup to reconcile the create, then three attempts at get_node
+        self.assertEqual(server.get_request_count("GET", "/{type}/{source_key}"), 4)
+        self.assertEqual(policy.get_stats()["reconciled"], 1)
+
+    def test_error_rate(self):
+        """
+        Tests that random errors repeat exactly for the same seed
+        """
+        def failures(seed):
+            server = FakeGroundServer(error_rate=0.5, seed=seed)
+            return [server.request("GET", "/nodes/n")[0] for _ in range(20)]
+
+        self.assertEqual(failures(1), failures(1))
+        self.assertEqual(set(failures(1)), {404, 503})
+
+    def test_cache_hits(self):
+        """
+        Tests that request counts show what a version cache saves
+        """
+        server = FakeGroundServer()
+        with client.GroundClient(transport=FakeTransport(server), version_cache_size=10) as ground_client:
+            node = ground_client.create_node("n", "n")
+            ids = [ground_client.create_node_version(node.get_id()).get_id() for _ in range(3)]
+            server.reset_request_counts()
+
+            ground_client.get_node_versions(ids)
+            ground_client.get_node_versions(ids)
+        self.assertEqual(server.get_request_count(), 0)
+
+    def test_async(self):
+        """
+        Tests that async requests overlap their latency
+        """
+        server = FakeGroundServer(latency=0.05)
+
+        async def run():
+            async with AsyncGroundClient(transport=FakeAsyncTransport(server)) as ground_client:
+                node = await ground_client.create_node("n", "n")
+                ids = [(await ground_client.create_node_version(node.get_id())).get_id() for _ in range(10)]
+
+                started = time.perf_counter()
+                versions = await ground_client.get_node_versions(ids)
+                return versions, time.perf_counter() - started
+
+        versions, elapsed = asyncio.run(run())
+        self.assertEqual(len(versions), 10)
+        self.assertLess(elapsed, 0.3)
+
+    def test_http(self):
+        """
+        Tests the fake served over HTTP to the default transport
+        """
+        with FakeGroundHTTPServer() as http_server:
+            with client.GroundClient(http_server.get_hostname(), http_server.get_port()) as ground_client:
+                node = ground_client.create_node("n", "n")
+                node_version = ground_client.create_node_version(node.get_id())
+                self.assertEqual(ground_client.get_node_version(node_version.get_id()), node_version)
+                self.assertEqual(list(ground_client.iter_node_latest_versions("n")), [node_version.get_id()])
+
+                http_server.get_server().inject_error(error=ConnectionResetError())
+                self.assertRaises(Exception, ground_client.get_node, "n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import unittest
+
+import ground.client as client
+from ground.transport import SessionTransport, Transport
+
+
+class StubResponse:
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class StubTransport(Transport):
+
+    def __init__(self):
+        self.calls = []
+        self.closed = False
+
+    def get(self, url):
+        self.calls.append(("GET", url, None))
+        return StubResponse(200, {"id": 1, "sourceKey": "a", "name": "a"})
+
+    def post(self, url, body):
+        self.calls.append(("POST", url, body))
+        return StubResponse(200, dict(body, id=2))
+
+    def close(self):
+        self.closed = True
+
+
+class TestTransport(unittest.TestCase):
+
+    def test_client_uses_transport(self):
+        """
+        Tests that every request goes through the configured transport
+        """
+        transport = StubTransport()
+        ground_client = client.GroundClient(transport=transport)
+
+        node = ground_client.get_node("a")
+        node_version = ground_client.create_node_version(node.get_id())
+
+        self.assertEqual(transport.calls[0], ("GET", "http://localhost:9000/nodes/a", None))
+        self.assertEqual(transport.calls[1], ("POST", "http://localhost:9000/versions/nodes", {"nodeId": 1}))
+        self.assertEqual(node_version.get_id(), 2)
+
+    def test_borrowed_transport_not_closed(self):
+        """
+        Tests that a transport passed in by the caller outlives the client
+        """
+        transport = StubTransport()
+        with client.GroundClient(transport=transport):
+            pass
+        self.assertFalse(transport.closed)
+
+    def test_session_transport_pool(self):
+        """
+        Tests that the default transport shares one pooled session
+        """
+        with client.GroundClient(pool_size=32) as ground_client:
+            session = ground_client.get_transport().get_session()
+            adapter = session.get_adapter("http://localhost:9000")
+            self.assertEqual(adapter._pool_maxsize, 32)
+            self.assertIs(session.get_adapter("http://example.com"), adapter)
+
+        transport = SessionTransport(keep_alive=False)
+        self.assertEqual(transport.get_session().headers["Connection"], "close")
+        transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import unittest
+
+import ground.client as client
+from ground.async_client import AsyncGroundClient
+from ground.common.model.version.version_history_dag import VersionHistoryDag
+from ground.common.model.version.version_successor import VersionSuccessor
+from ground.history import iter_version_successors
+from ground.transport import AsyncTransport, BufferedResponse, Transport
+
+
+# 0 -> 1 -> 2 -> 4, 1 -> 3 -> 4, 3 -> 5
+SUCCESSORS = [(10, 0, 1), (11, 1, 2), (12, 1, 3), (13, 2, 4), (14, 3, 4), (15, 3, 5)]
+
+
+def build_dag():
+    return VersionHistoryDag(7, [VersionSuccessor(*successor) for successor in SUCCESSORS])
+
+
+def respond(url):
+    if url.endswith("/history"):
+        payload = {"0": 1, "1": [2, 3], "2": [4], "3": [4, 5]}
+    else:
+        payload = {"id": 7, "sourceKey": "key", "name": "name"}
+    return BufferedResponse(200, json.dumps(payload).encode())
+
+
+class HistoryTransport(Transport):
+
+    def get(self, url):
+        return respond(url)
+
+
+class HistoryAsyncTransport(AsyncTransport):
+
+    async def get(self, url):
+        return respond(url)
+
+
+class TestVersionHistoryDag(unittest.TestCase):
+
+    def test_adjacency(self):
+        """
+        Tests parent, child and pair lookups, including merges and branches
+        """
+        dag = build_dag()
+        self.assertEqual(dag.get_item_id(), 7)
+        self.assertEqual(dag.get_edge_ids(), [10, 11, 12, 13, 14, 15])
+        self.assertEqual(dag.get_parent(4), [2, 3])
+        self.assertEqual(dag.get_parent(0), [])
+        self.assertEqual(dag.get_children(3), [4, 5])
+        self.assertEqual(dag.get_parent_child_pairs(), {0: [1], 1: [2, 3], 2: [4], 3: [4, 5]})
+        self.assertTrue(dag.check_item_in_dag(5))
+        self.assertFalse(dag.check_item_in_dag(6))
+
+    def test_leaves(self):
+        """
+        Tests that the leaf set is kept up to date as edges are added
+        """
+        dag = build_dag()
+        self.assertEqual(dag.get_leaves(), {4, 5})
+
+        dag.add_edge(4, 6, 16)
+        self.assertEqual(dag.get_leaves(), {5, 6})
+        self.assertEqual(dag.get_edge_ids()[-1], 16)
+
+        # an edge into an existing inner version does not make it a leaf
+        dag.add_edge(5, 1, 17)
+        self.assertEqual(dag.get_leaves(), {6})
+
+    def test_ancestors_and_descendants(self):
+        """
+        Tests the ancestor and descendant walks
+        """
+        dag = build_dag()
+        self.assertEqual(dag.get_ancestors(4), [2, 3, 1, 0])
+        self.assertEqual(dag.get_descendants(1), [2, 3, 4, 5])
+        self.assertEqual(dag.get_descendants(5), [])
+        self.assertEqual(dag.get_ancestors(99), [])
+
+    def test_queries(self):
+        """
+        Tests the latest version, topological order, common ancestor and range queries
+        """
+        dag = build_dag()
+        self.assertEqual(dag.get_latest_versions(), [4, 5])
+
+        order = dag.get_topological_order()
+        self.assertEqual(sorted(order), [0, 1, 2, 3, 4, 5])
+        for _, parent_id, child_id in SUCCESSORS:
+            self.assertLess(order.index(parent_id), order.index(child_id))
+
+        self.assertEqual(dag.get_lowest_common_ancestor(4, 5), 3)
+        self.assertEqual(dag.get_lowest_common_ancestor(2, 5), 1)
+        self.assertEqual(dag.get_lowest_common_ancestor(1, 4), 1)
+        self.assertIsNone(dag.get_lowest_common_ancestor(1, 99))
+
+        self.assertEqual(dag.get_versions_between(1, 4), [2, 3, 4])
+        self.assertEqual(dag.get_versions_between(2, 5), [])
+
+    def test_successors(self):
+        """
+        Tests parsing both shapes of history response
+        """
+        pairs = [(successor.get_from_id(), successor.get_to_id())
+                 for successor in iter_version_successors({"0": 1, "1": [2, 3]})]
+        self.assertEqual(pairs, [(0, 1), (1, 2), (1, 3)])
+
+        successor = next(iter_version_successors([{"id": 10, "fromId": 0, "toId": 1}]))
+        self.assertEqual((successor.get_id(), successor.get_from_id(), successor.get_to_id()), (10, 0, 1))
+
+    def test_client(self):
+        """
+        Tests the get_*_history_dag client methods
+        """
+        with client.GroundClient(transport=HistoryTransport()) as ground_client:
+            dag = ground_client.get_node_history_dag("key")
+        self.assertEqual(dag.get_item_id(), 7)
+        self.assertEqual(dag.get_parent_child_pairs(), build_dag().get_parent_child_pairs())
+
+        async def run():
+            return await AsyncGroundClient(transport=HistoryAsyncTransport()).get_graph_history_dag("key")
+
+        self.assertEqual(asyncio.run(run()).get_leaves(), {4, 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
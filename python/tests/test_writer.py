@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+import unittest
+
+import ground.client as client
+from ground.batch import BatchItemError
+from ground.testing import FakeGroundServer, FakeTransport
+from ground.writer import BufferedWriter, BufferFullError
+
+
+class TestBufferedWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeGroundServer()
+        self.client = client.GroundClient(transport=FakeTransport(self.server))
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_writes(self):
+        """
+        Tests that queued writes are sent, with futures standing in for ids
+        """
+        with BufferedWriter(self.client, batch_size=10, flush_interval=10) as writer:
+            node = writer.create_node("n", "n")
+            versions = [writer.create_node_version(node) for _ in range(25)]
+            lineage_edge = writer.create_lineage_edge("l", "l")
+            lineage = writer.create_lineage_edge_version(lineage_edge, versions[1], versions[0])
+
+            self.assertTrue(writer.flush(timeout=5))
+            stats = writer.get_stats()
+
+        self.assertEqual(stats["written"], 28)
+        self.assertEqual(stats["pending"], 0)
+        self.assertGreaterEqual(stats["batches"], 3)
+
+        node_id = node.result().get_id()
+        self.assertTrue(all(version.result().get_node_id() == node_id for version in versions))
+        self.assertEqual(lineage.result().get_from_id(), versions[0].result().get_id())
+        self.assertEqual(self.client.get_node_latest_versions("n"), [versions[-1].result().get_id()])
+
+    def test_item_order(self):
+        """
+        Tests that versions of one item are sent in the order they were queued, across workers
+        """
+        class JitteryTransport(FakeTransport):
+            def post(self, url, body):
+                time.sleep(random.random() / 500)
+                return super().post(url, body)
+
+        jittery_client = client.GroundClient(transport=JitteryTransport(self.server))
+        node_id = jittery_client.create_node("n", "n").get_id()
+        with BufferedWriter(jittery_client, batch_size=2, flush_interval=0, workers=4) as writer:
+            versions = [writer.create_node_version(node_id) for _ in range(40)]
+            others = [writer.create_node("m" + str(index), "m") for index in range(20)]
+            self.assertTrue(writer.flush(timeout=5))
+
+        ids = [version.result().get_id() for version in versions]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(self.client.get_node_latest_versions("n"), [ids[-1]])
+        self.assertTrue(all(other.result().get_name() == "m" for other in others))
+        jittery_client.close()
+
+    def test_item_future_and_id(self):
+        """
+        Tests that versions of one item stay in order when it is given by its future and then by its id
+        """
+        created = threading.Event()
+
+        class GatedTransport(FakeTransport):
+            def post(self, url, body):
+                if url.endswith("/nodes"):
+                    created.wait(5)
+                time.sleep(random.random() / 500)
+                return super().post(url, body)
+
+        gated_client = client.GroundClient(transport=GatedTransport(self.server))
+        with BufferedWriter(gated_client, batch_size=1, flush_interval=0, workers=8) as writer:
+            node = writer.create_node("n", "n")
+            versions = [writer.create_node_version(node) for _ in range(20)]
+            created.set()
+            versions += [writer.create_node_version(node.result(timeout=5).get_id()) for _ in range(20)]
+            self.assertTrue(writer.flush(timeout=5))
+            self.assertEqual(writer._routes, {})
+
+        ids = [version.result().get_id() for version in versions]
+        self.assertEqual(ids, sorted(ids))
+        gated_client.close()
+
+    def test_flush_interval(self):
+        """
+        Tests that a partial batch is sent once it has waited flush_interval
+        """
+        with BufferedWriter(self.client, batch_size=100, flush_interval=0.01) as writer:
+            node = writer.create_node("n", "n")
+            self.assertEqual(node.result(timeout=5).get_source_key(), "n")
+
+    def test_close_drains(self):
+        """
+        Tests that close sends everything still queued, and refuses new writes
+        """
+        writer = BufferedWriter(self.client, batch_size=1000, flush_interval=60)
+        futures = [writer.create_node("n" + str(index), "n") for index in range(50)]
+        writer.close()
+
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.server.get_request_count("POST"), 50)
+        self.assertRaises(RuntimeError, writer.create_node, "m", "m")
+
+    def test_failures(self):
+        """
+        Tests that failed writes, and the writes depending on them, fail their futures
+        """
+        with BufferedWriter(self.client, flush_interval=0) as writer:
+            writer.create_node("n", "n").result(timeout=5)
+            duplicate = writer.create_node("n", "n")
+            version = writer.create_node_version(duplicate)
+
+            self.assertRaises(BatchItemError, duplicate.result, 5)
+            self.assertRaises(BatchItemError, version.result, 5)
+            self.assertEqual(writer.get_stats()["failed"], 2)
+
+        self.assertRaises(ValueError, writer.submit, "get_node", "n")
+
+    def test_backpressure(self):
+        """
+        Tests that writes block or fail while max_pending writes are held
+        """
+        release = threading.Event()
+
+        class SlowTransport(FakeTransport):
+            def post(self, url, body):
+                release.wait(5)
+                return super().post(url, body)
+
+        slow_client = client.GroundClient(transport=SlowTransport(self.server))
+        writer = BufferedWriter(slow_client, max_pending=2, batch_size=1, flush_interval=0, workers=1, timeout=0.05)
+
+        writer.create_node("a", "a")
+        # the worker takes the first write and blocks on it, so two more fill the queue
+        time.sleep(0.05)
+        writer.create_node("b", "b")
+        writer.create_node("c", "c")
+        self.assertRaises(BufferFullError, writer.create_node, "d", "d")
+        self.assertEqual(writer.get_stats()["blocked"], 1)
+
+        release.set()
+        writer.close()
+        slow_client.close()
+        self.assertEqual(writer.get_stats()["written"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()